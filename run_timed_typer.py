@@ -1,36 +1,10 @@
 import sys
 from timed_typer.app import main as app_main
 
-def _teacher_batch() -> None:
-    # Run a short demo for levels 1..5, then export report, print quick advice.
-    from timed_typer.demo import _simulate_run
-    from timed_typer.report import export_report_to_project_root
-    from timed_typer.levels import LEVELS, get_level
-    from timed_typer.storage import get_store
-    print("== Teacher batch: demos + report ==")
-    for lvl in range(1, 6):
-        print(f"-- Demo L{lvl} ({LEVELS[lvl].name}) @1.05x, acc 0.92 --")
-        _simulate_run(level_id=lvl, speed_factor=1.05, acc_target=0.92)
-    path = export_report_to_project_root()
-    print(f"\nReport written: {path}")
-
-    # Quick advice based on PB gaps
-    store = get_store()
-    pbs = store.get("pbs", {})
-    print("\n== Coaching Advice ==")
-    for lvl in range(1, 6):
-        cfg = get_level(lvl)
-        pb = pbs.get(str(lvl))
-        if not pb:
-            print(f"- {cfg.name}: No PB recorded yet.")
-            continue
-        gap_wpm = cfg.target_wpm - pb["wpm"]
-        gap_acc = (cfg.min_accuracy*100) - (pb["accuracy"]*100)
-        need = []
-        if gap_wpm > 0.5: need.append(f"+{gap_wpm:.1f} WPM")
-        if gap_acc > 0.5: need.append(f"+{gap_acc:.0f}% Acc")
-        msg = "OK" if not need else ("Needs " + " & ".join(need))
-        print(f"- {cfg.name}: {msg}")
+def _teacher_batch(argv=None) -> int:
+    # Demos for every level (in parallel, no prompts), report, quick advice.
+    from timed_typer.teacher import main as teacher_main
+    return teacher_main(argv or [])
 
 def _cli():
     if len(sys.argv) <= 1:
@@ -39,16 +13,16 @@ def _cli():
     cmd = sys.argv[1].lower()
 
     if cmd in ("--selftest", "-t"):
-        from timed_typer.state import GameState
-        from timed_typer.selftest import run_self_tests
-        s = GameState()
-        run_self_tests(s)
-        return True
+        from timed_typer.selftest import main as selftest_main
+        sys.exit(selftest_main(sys.argv[2:]))
 
     if cmd in ("--report", "-r"):
-        from timed_typer.report import export_report_to_project_root
-        path = export_report_to_project_root()
-        print(f"Report written to: {path}")
+        from timed_typer.report import export_default_report
+        path, written = export_default_report()
+        if written:
+            print(f"Report written to: {path}")
+        else:
+            print(f"Report unchanged: {path}")
         return True
 
     if cmd in ("--demo", "-d"):
@@ -57,10 +31,10 @@ def _cli():
         try:
             level = int(sys.argv[2])
         except Exception:
-            print("Usage: --demo <level 1-5> [speed=1.0] [acc=0.90]")
+            print("Usage: --demo <level> [speed=1.0] [acc=0.90]")
             return True
         if level not in LEVELS:
-            print("Error: level must be 1..5")
+            print(f"Error: level must be one of {', '.join(map(str, LEVELS))}")
             return True
         speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
         acc = float(sys.argv[4]) if len(sys.argv) > 4 else 0.90
@@ -70,11 +44,118 @@ def _cli():
         return True
 
     if cmd in ("--teacher", "--batch"):
-        _teacher_batch()
+        sys.exit(_teacher_batch(sys.argv[2:]))
+
+    if cmd == "--script":
+        import tempfile
+        import time
+        from pathlib import Path
+        from timed_typer import packs, storage
+        from timed_typer.io_backend import ScriptedIO, read_script
+        from timed_typer.state import GameState
+        usage = "Usage: --script <file> [--echo] [--profile-path FILE | --real-profile]"
+        opts = sys.argv[3:]
+        try:
+            lines = read_script(Path(sys.argv[2]))
+        except (IndexError, OSError):
+            print(usage)
+            return True
+        tmp = None
+        if "--profile-path" in opts:
+            try:
+                storage.DEFAULT_PATH = Path(opts[opts.index("--profile-path") + 1])
+            except IndexError:
+                print(usage)
+                return True
+        elif "--real-profile" not in opts:
+            # a throwaway profile folder: a script must not touch the player's PBs,
+            # leaderboard, typo stats or run history (everything hangs off DEFAULT_PATH)
+            tmp = tempfile.TemporaryDirectory(prefix="timed_typer_script.")
+            storage.DEFAULT_PATH = Path(tmp.name) / "profile.json"
+        packs.reload_if_changed()   # packs now come from the chosen profile folder (+ TIMED_TYPER_PACKS)
+        io = ScriptedIO(lines, echo="--echo" in opts)
+        t0 = time.perf_counter()
+        try:
+            app_main(GameState(io=io))
+        except EOFError:
+            pass  # script ran out of inputs -> same as closing stdin
+        finally:
+            if tmp is not None:
+                try:
+                    tmp.cleanup()
+                except OSError:
+                    pass    # Windows: a file still open somewhere; the OS temp cleaner gets it
+        dt = time.perf_counter() - t0
+        print(f"Script done: {io.inputs_used} inputs in {dt:.3f}s")
         return True
 
+    if cmd == "--analytics":
+        from timed_typer.report import analytics_main
+        sys.exit(analytics_main(sys.argv[2:]))
+
+    if cmd == "--cohort":
+        from timed_typer.cohort import main as cohort_main
+        sys.exit(cohort_main(sys.argv[2:]))
+
+    if cmd == "--serve":
+        from timed_typer.server import serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    if cmd == "--loadtest":
+        from timed_typer.server import loadtest_main
+        sys.exit(loadtest_main(sys.argv[2:]))
+
+    if cmd == "--replay":
+        from timed_typer.recording import main as replay_main
+        sys.exit(replay_main(sys.argv[2:]))
+
+    if cmd == "--leaderboard":
+        from timed_typer.leaderboard import main as leaderboard_main
+        sys.exit(leaderboard_main(sys.argv[2:]))
+
+    if cmd == "--packs":
+        from timed_typer.packs import main as packs_main
+        sys.exit(packs_main(sys.argv[2:]))
+
+    if cmd == "--mine-words":
+        from timed_typer.mining import main as mining_main
+        sys.exit(mining_main(sys.argv[2:]))
+
+    if cmd == "--difficulty":
+        from timed_typer.difficulty import main as difficulty_main
+        sys.exit(difficulty_main(sys.argv[2:]))
+
+    if cmd == "--kiosk":
+        from timed_typer.kiosk import main as kiosk_main
+        sys.exit(kiosk_main(sys.argv[2:]))
+
+    if cmd == "--export-profiles":
+        from timed_typer.transfer import export_main
+        sys.exit(export_main(sys.argv[2:]))
+
+    if cmd == "--import-profiles":
+        from timed_typer.transfer import import_main
+        sys.exit(import_main(sys.argv[2:]))
+
+    if cmd == "--bench":
+        from timed_typer.bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+
+    if cmd == "--fuzz":
+        from timed_typer.fuzz import main as fuzz_main
+        sys.exit(fuzz_main(sys.argv[2:]))
+
+    if cmd == "--calibrate":
+        from timed_typer.calibrate import main as calibrate_main
+        sys.exit(calibrate_main(sys.argv[2:]))
+
     return False
 
 if __name__ == "__main__":
-    if not _cli():
-        app_main()
+    from timed_typer.profiling import session_from_argv
+    from timed_typer.metrics import exporter_from_argv
+    # --profile[=sample|cprofile|both] or TIMED_TYPER_PROFILE; a no-op otherwise
+    # --metrics-port N / --metrics-file F expose usage counters while it runs
+    with exporter_from_argv(sys.argv), session_from_argv(sys.argv):
+        if not _cli():
+            app_main()
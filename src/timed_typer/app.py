@@ -5,7 +5,8 @@ import os, random  # <-- add
 from colorama import init as colorama_init
 from .game import run_game
 
-def main() -> None:
+def main(state=None) -> None:
+    """Seed the RNG and run the menus. *state* lets --script inject a GameState."""
     colorama_init()
     # Fixed seed unless user overrides with TIMED_TYPER_SEED
     seed = os.environ.get("TIMED_TYPER_SEED")
@@ -16,7 +17,7 @@ def main() -> None:
             random.seed(int(seed))
         except ValueError:
             random.seed(seed)
-    run_game()
+    run_game(state)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,345 @@
+"""
+bench.py — micro-benchmarks for the hot paths, with a stored baseline.
+
+Each benchmark registers a setup function with @bench. Setup builds its
+inputs once and returns a zero-argument callable that performs ONE
+operation. The runner picks a loop count so each sample takes ~min_time,
+does a warmup sample, then `repeat` timed samples and reports ops/sec
+(median, min, max, stdev).
+
+Results can be saved as a JSON baseline; later runs compare against it and
+flag anything slower than the threshold (default 10%).
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import storage
+from .io_backend import ScriptedIO
+from .levels import LEVELS, get_level
+
+DEFAULT_THRESHOLD = 0.10
+
+
+@dataclass
+class Bench:
+    name: str
+    setup: Callable[[Path], Callable[[], object]]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    loops: int
+    repeat: int
+    ops_per_s: float        # median over samples
+    ops_min: float
+    ops_max: float
+    stdev_pct: float        # spread of the samples, % of the median
+
+
+BENCHES: List[Bench] = []
+
+
+def bench(name: str):
+    """Register a benchmark. The setup gets a scratch directory."""
+    def deco(setup: Callable[[Path], Callable[[], object]]) -> Callable[[Path], Callable[[], object]]:
+        BENCHES.append(Bench(name, setup))
+        return setup
+    return deco
+
+
+def _baseline_path() -> Path:
+    return storage.DEFAULT_PATH.parent / "bench_baseline.json"
+
+
+# ---------------------------------------------------------------------------
+# The benchmarks
+# ---------------------------------------------------------------------------
+
+def _sample_store() -> dict:
+    store = storage._deepcopy_default()
+    for lvl in LEVELS:
+        storage.record_pb(store, lvl, 20.0 + lvl, 0.9)
+        storage.unlock_next_level(store, lvl)
+    return store
+
+
+@bench("words.words_for_level")
+def _b_words_for_level(tmp: Path) -> Callable[[], object]:
+    from .words import words_for_level
+    cfg = get_level(5)
+    rng = random.Random(1)
+    return lambda: words_for_level(cfg, 60, rng=rng)
+
+
+@bench("sequence.balanced_words_for_level")
+def _b_balanced(tmp: Path) -> Callable[[], object]:
+    from .sequence import balanced_words_for_level
+    cfg = get_level(5)
+    rng = random.Random(1)
+    return lambda: balanced_words_for_level(cfg, 60, rng=rng)
+
+
+@bench("words.check_input")
+def _b_check_input(tmp: Path) -> Callable[[], object]:
+    from .words import check_input
+    cases = itertools.cycle([("allow[udp]", "allow[udp]"), ("allow[udp]", "allow[upd]"),
+                             ("resolve", "res"), ("port=443", "port=4433")])
+    return lambda: check_input(*next(cases))
+
+
+@bench("timing.wpm")
+def _b_wpm(tmp: Path) -> Callable[[], object]:
+    from .timing import wpm
+    return lambda: wpm(187, 44.7)
+
+
+@bench("scoring.update_accuracy")
+def _b_update_accuracy(tmp: Path) -> Callable[[], object]:
+    from .scoring import RunStats, update_accuracy
+    stats = RunStats(words_total=40, words_ok=37, typos=3)
+    return lambda: update_accuracy(stats)
+
+
+@bench("storage.load_store")
+def _b_load_store(tmp: Path) -> Callable[[], object]:
+    path = tmp / "load" / "profile.json"
+    storage.save_store(_sample_store(), path)
+    return lambda: storage.load_store(path)
+
+
+@bench("storage.save_store")
+def _b_save_store(tmp: Path) -> Callable[[], object]:
+    path = tmp / "save" / "profile.json"
+    store = _sample_store()
+    return lambda: storage.save_store(store, path)
+
+
+@bench("kiosk.switch (8 learners, cached)")
+def _b_kiosk_switch(tmp: Path) -> Callable[[], object]:
+    from .kiosk import ProfileCache
+    cache = ProfileCache(tmp / "kiosk", capacity=8)
+    names = [f"learner{i}" for i in range(8)]
+    for n in names:
+        cache.create(n)
+    order = itertools.cycle(names)
+    return lambda: cache.get(next(order))
+
+
+@bench("ui_console.render_hud")
+def _b_render_hud(tmp: Path) -> Callable[[], object]:
+    from .ui_console import render_hud
+    sink = ScriptedIO(())   # output goes nowhere
+    return lambda: render_hud("Firewall", 42, 31.4, 0.93, 4, io=sink)
+
+
+@bench("demo._simulate_run")
+def _b_simulate_run(tmp: Path) -> Callable[[], object]:
+    from .demo import _simulate_run
+    sink = ScriptedIO(itertools.repeat(""))   # answers "Press Enter" forever
+    random.seed(7)
+    return lambda: _simulate_run(level_id=3, speed_factor=1.0, acc_target=0.9, io=sink)
+
+
+@bench("report._build_report_text")
+def _b_build_report(tmp: Path) -> Callable[[], object]:
+    from .report import _build_report_text
+    store = _sample_store()
+    return lambda: _build_report_text(store)
+
+
+@bench("recording.replay (7k events)")
+def _b_replay(tmp: Path) -> Callable[[], object]:
+    from .recording import Recorder, read_recording, replay
+    from .scoring import RunStats
+    from .words import words_for_level
+    rng = random.Random(3)
+    rec = Recorder("play", 5, tmp / "rec")
+    for w in words_for_level(get_level(5), 3400, rng=rng):
+        rec.word(w)
+        if rng.random() < 0.1:
+            rec.input(w[::-1] + "x")
+        rec.input(w)
+    path = rec.finish(RunStats(), 0.0, 1.0, False)
+    loaded = read_recording(path)
+    return lambda: replay(loaded)
+
+
+@bench("srs.next_word+grade (50k words)")
+def _b_srs(tmp: Path) -> Callable[[], object]:
+    from .srs import Scheduler
+    rng = random.Random(5)
+    sched = Scheduler([f"w{i}" for i in range(50_000)])
+    state = {"prev": None}
+
+    def op() -> None:
+        w = sched.next_word(state["prev"])
+        sched.grade(w, rng.random() < 0.8)
+        state["prev"] = w
+    return op
+
+
+@bench("leaderboard.rank (1M runs)")
+def _b_lb_rank(tmp: Path) -> Callable[[], object]:
+    from .leaderboard import LevelBoard
+    rng = random.Random(9)
+    board = LevelBoard(array("d", sorted(rng.gauss(30, 8) for _ in range(1_000_000))))
+    return lambda: (board.rank(31.7), board.percentile(31.7))
+
+
+@bench("leaderboard.add (1M runs)")
+def _b_lb_add(tmp: Path) -> Callable[[], object]:
+    from .leaderboard import LevelBoard
+    rng = random.Random(9)
+    board = LevelBoard(array("d", sorted(rng.gauss(30, 8) for _ in range(1_000_000))))
+    return lambda: board.add(rng.gauss(30, 8))
+
+
+@bench("packs.compile_pack (50 levels, cached)")
+def _b_pack_load(tmp: Path) -> Callable[[], object]:
+    from .packs import compile_pack
+    from .words import BASE_WORDS
+    src = tmp / "pack50.json"
+    levels = [{"id": 100 + i, "name": f"Pack {i}", "min_accuracy": 0.85, "target_wpm": 20 + i % 30,
+               "time_budget_s": 60, "max_word_len": 10, "words": [f"{w}{i}" for w in BASE_WORDS * 4]}
+              for i in range(50)]
+    src.write_text(json.dumps({"name": "bench", "levels": levels}), encoding="utf-8")
+    compile_pack(src, tmp / "cache")        # first load compiles; the timed ones hit the cache
+    return lambda: compile_pack(src, tmp / "cache")
+
+
+@bench("difficulty.band (10k words)")
+def _b_difficulty_band(tmp: Path) -> Callable[[], object]:
+    from .difficulty import DifficultyIndex
+    rng = random.Random(11)
+    idx = DifficultyIndex(["".join(rng.choice("etaoinshrdlu[=/GPT") for _ in range(rng.randint(2, 10)))
+                           for _ in range(10_000)])
+    return lambda: idx.band(35.0, 45.0)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _time_loops(op: Callable[[], object], loops: int) -> float:
+    perf = time.perf_counter
+    t0 = perf()
+    for _ in range(loops):
+        op()
+    return perf() - t0
+
+
+def measure(op: Callable[[], object], repeat: int = 5, min_time: float = 0.05) -> tuple[int, List[float]]:
+    """Return (loops, ops/sec per sample). The first sizing pass doubles as warmup."""
+    loops = 1
+    while True:
+        dt = _time_loops(op, loops)
+        if dt >= min_time / 2 or loops >= 1 << 24:
+            break
+        loops *= 2
+    loops = max(1, int(loops * (min_time / max(dt, 1e-9))))
+    _time_loops(op, loops)  # warmup at the final size
+    samples = [loops / max(_time_loops(op, loops), 1e-12) for _ in range(repeat)]
+    return loops, samples
+
+
+def run_benchmarks(benches: Optional[List[Bench]] = None, repeat: int = 5,
+                   min_time: float = 0.05) -> List[BenchResult]:
+    benches = BENCHES if benches is None else benches
+    out: List[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="timed_typer_bench.") as tmp:
+        for b in benches:
+            op = b.setup(Path(tmp))
+            loops, samples = measure(op, repeat=repeat, min_time=min_time)
+            med = statistics.median(samples)
+            sd = statistics.stdev(samples) if len(samples) > 1 else 0.0
+            out.append(BenchResult(b.name, loops, len(samples), med, min(samples), max(samples),
+                                   (sd / med * 100.0) if med else 0.0))
+    return out
+
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data.get("results", {})
+    except Exception:
+        return {}
+
+
+def save_baseline(results: List[BenchResult], path: Path, keep: Optional[Dict[str, dict]] = None) -> None:
+    """Write *results* as the baseline; entries in *keep* that weren't re-run (a -k run) stay."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    merged = dict(keep or {})
+    merged.update((r.name, asdict(r)) for r in results)
+    data = {
+        "saved": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": merged,
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(results: List[BenchResult], baseline: Dict[str, dict]) -> Dict[str, float]:
+    """name -> change vs baseline (-0.25 = 25% slower). Only benches present in both."""
+    deltas: Dict[str, float] = {}
+    for r in results:
+        old = baseline.get(r.name, {}).get("ops_per_s")
+        if old:
+            deltas[r.name] = r.ops_per_s / old - 1.0
+    return deltas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--bench` entry point. Exit code 1 if any benchmark regressed past the threshold."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --bench", description="Micro-benchmark the hot paths.")
+    ap.add_argument("--baseline", type=Path, default=None, help="baseline JSON (default: next to profile.json)")
+    ap.add_argument("--save", action="store_true", help="store this run as the new baseline")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="flag benches slower than baseline by more than this fraction (default 0.10)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per sample")
+    ap.add_argument("-k", metavar="TEXT", default=None, help="only run benches whose name contains TEXT")
+    args = ap.parse_args(argv)
+
+    benches = [b for b in BENCHES if not args.k or args.k.lower() in b.name.lower()]
+    path = args.baseline or _baseline_path()
+    baseline = load_baseline(path)
+
+    results = run_benchmarks(benches, repeat=max(1, args.repeat), min_time=args.min_time)
+    deltas = compare(results, baseline)
+
+    width = max([28] + [len(r.name) for r in results])
+    print(f"{'benchmark':<{width}} {'ops/sec':>12} {'min':>12} {'max':>12} {'±%':>6} {'vs base':>9}")
+    regressions = []
+    for r in results:
+        d = deltas.get(r.name)
+        flag = ""
+        if d is not None:
+            flag = f"{d*100:+.1f}%"
+            if d < -args.threshold:
+                flag += " REGRESSION"
+                regressions.append(r.name)
+        print(f"{r.name:<{width}} {r.ops_per_s:>12,.0f} {r.ops_min:>12,.0f} {r.ops_max:>12,.0f} "
+              f"{r.stdev_pct:>5.1f}% {flag:>9}")
+
+    # a first, unfiltered run becomes the baseline; a -k run only updates it on --save
+    if args.save or (not baseline and not args.k):
+        save_baseline(results, path, keep=baseline)
+        print(f"\nBaseline saved: {path}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold*100:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
@@ -0,0 +1,354 @@
+"""
+calibrate.py — searches target_wpm / min_accuracy per level so a modelled
+player population passes each level at the rate we want.
+
+The hand-tuned numbers in levels.LEVELS ("# was 18") are the starting point.
+For every candidate LevelConfig we simulate the whole population with the
+same engine the demo uses, and remember the result on disk keyed by
+(config, model, seed). Re-running a search only simulates configs we have
+never seen, so it gets cheaper every time. Keys start with the level id
+("L3:..."), so each worker job is sent just its own level's entries, not
+the whole cache.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import storage
+from .demo import _simulate_core
+from .levels import LEVELS, LevelConfig
+from .scoring import passed_level
+from .sequence import balanced_ids_for_level
+
+# Share of players we want to pass each level (level 1 easy -> level 5 hard)
+DEFAULT_PASS_RATES = {1: 0.90, 2: 0.80, 3: 0.70, 4: 0.60, 5: 0.50}
+
+# Search space for the two knobs
+WPM_RANGE = (5, 90)
+ACC_SPAN = 0.10          # try min_accuracy within ±10 points of the current one...
+ACC_STEP = 0.01          # ...in 1-point steps
+ACC_RANGE = (0.50, 0.99)
+SIM_VERSION = 2          # bump when the simulation changes (2 = balanced word sequences)
+PASS_TOLERANCE = 0.03    # pass rates within ±3 points of the goal count as a hit
+
+
+@dataclass(frozen=True)
+class PlayerModel:
+    """
+    Population of players we calibrate for.
+    Each simulated player gets a base WPM and a per-word hit chance drawn from
+    normal distributions; later levels slow everybody down a little.
+    Note the game's accuracy counts a miss twice (words_ok / (words_total + typos)),
+    so a 0.95 hit chance shows up as ~90% accuracy on the HUD.
+    """
+    name: str = "class-default"
+    wpm_mean: float = 30.0
+    wpm_sd: float = 9.0
+    acc_mean: float = 0.95
+    acc_sd: float = 0.03
+    level_slowdown: float = 0.05   # WPM lost per level step (0.05 = 5%)
+    players: int = 300
+
+
+@dataclass
+class LevelProposal:
+    old: LevelConfig
+    new: LevelConfig
+    desired: float
+    old_stats: Dict[str, float]
+    new_stats: Dict[str, float]
+
+
+def _cache_path() -> Path:
+    # lives next to profile.json so every tool finds the same cache
+    return storage.DEFAULT_PATH.parent / "calibration_cache.json"
+
+
+def _cache_key(cfg: LevelConfig, model: PlayerModel, seed: int) -> str:
+    raw = json.dumps([asdict(cfg), asdict(model), seed, SIM_VERSION], sort_keys=True)
+    return f"{_level_prefix(cfg.id)}{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def _level_prefix(level_id: int) -> str:
+    return f"L{level_id}:"
+
+
+def _for_level(cache: Dict[str, Dict[str, float]], level_id: int) -> Dict[str, Dict[str, float]]:
+    """The cache entries one level's jobs can hit (all a worker needs to be sent)."""
+    prefix = _level_prefix(level_id)
+    return {k: v for k, v in cache.items() if k.startswith(prefix)}
+
+
+def load_cache(path: Optional[Path] = None) -> Dict[str, Dict[str, float]]:
+    """Read the on-disk cache; a missing or corrupt file just means 'empty'."""
+    path = path or _cache_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    # entries from before keys had a level prefix can never match again: drop them
+    return {k: v for k, v in data.items() if k.startswith("L") and ":" in k}
+
+
+def save_cache(cache: Dict[str, Dict[str, float]], path: Optional[Path] = None) -> None:
+    """Atomic write (temp file + replace), same trick as storage.save_store."""
+    path = path or _cache_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_name = tempfile.mkstemp(prefix="calib.", suffix=".json", dir=str(path.parent))
+    try:
+        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+def simulate_population(cfg: LevelConfig, model: PlayerModel, seed: int) -> Dict[str, float]:
+    """
+    Simulate every player in *model* on *cfg* and summarize the outcome.
+
+    Each player has a private RNG derived from (seed, player index), so the
+    same people take part in every candidate config (common random numbers).
+    That keeps pass-rate curves smooth while we search.
+    """
+    minutes = cfg.time_budget_s / 60.0
+    # same word count play_level uses, so fast players can run out of words too
+    n_words = max(20, math.ceil(cfg.target_wpm * minutes * 1.2))
+    slow = max(0.1, 1.0 - model.level_slowdown * (cfg.id - 1))
+
+    passes = 0
+    wpms: List[float] = []
+    accs: List[float] = []
+    for p in range(model.players):
+        rng = random.Random(f"{seed}:{p}")
+        player_wpm = max(5.0, rng.gauss(model.wpm_mean, model.wpm_sd)) * slow
+        player_acc = min(0.995, max(0.30, rng.gauss(model.acc_mean, model.acc_sd)))
+        seq = balanced_ids_for_level(cfg, n_words, rng=rng)   # what play_level deals
+        stats, final_wpm = _simulate_core(cfg, seq, player_wpm, player_acc, rng=rng)
+        if passed_level(cfg, stats, final_wpm):
+            passes += 1
+        wpms.append(final_wpm)
+        accs.append(stats.accuracy)
+
+    wpms.sort()
+    accs.sort()
+    n = max(1, model.players)
+    return {
+        "pass_rate": passes / n,
+        "wpm_p50": _percentile(wpms, 0.5),
+        "wpm_p90": _percentile(wpms, 0.9),
+        "acc_p50": _percentile(accs, 0.5),
+        "n": model.players,
+    }
+
+
+def _evaluate(cfg: LevelConfig, model: PlayerModel, seed: int,
+              cache: Dict[str, Dict[str, float]], fresh: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    key = _cache_key(cfg, model, seed)
+    hit = cache.get(key) or fresh.get(key)
+    if hit is not None:
+        return hit
+    stats = simulate_population(cfg, model, seed)
+    fresh[key] = stats
+    return stats
+
+
+def _search_one(cfg: LevelConfig, min_acc: float, desired: float, model: PlayerModel, seed: int,
+                cache: Dict[str, Dict[str, float]]) -> Tuple[LevelConfig, Dict[str, float], Dict[str, Dict[str, float]]]:
+    """
+    For a fixed min_accuracy, bisect target_wpm for the config whose pass rate
+    is closest to *desired*. Pass rate only goes down as target_wpm goes up,
+    so bisection needs ~7 simulations instead of ~85.
+    Runs in a worker process; returns the newly simulated cache entries.
+    """
+    fresh: Dict[str, Dict[str, float]] = {}
+    base = replace(cfg, min_accuracy=min_acc)
+
+    lo, hi = WPM_RANGE
+    # largest target that still lets >= desired of players through
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _evaluate(replace(base, target_wpm=mid), model, seed, cache, fresh)["pass_rate"] >= desired:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    # the crossing sits between lo and lo+1 — keep whichever lands closer
+    best_cfg, best_stats = None, None
+    for t in (lo, min(lo + 1, WPM_RANGE[1])):
+        cand = replace(base, target_wpm=t)
+        stats = _evaluate(cand, model, seed, cache, fresh)
+        if best_stats is None or abs(stats["pass_rate"] - desired) < abs(best_stats["pass_rate"] - desired):
+            best_cfg, best_stats = cand, stats
+    return best_cfg, best_stats, fresh
+
+
+def _acc_candidates(cfg: LevelConfig) -> List[float]:
+    lo, hi = ACC_RANGE
+    steps = int(round(ACC_SPAN / ACC_STEP))
+    return sorted({round(min(hi, max(lo, cfg.min_accuracy + k * ACC_STEP)), 2) for k in range(-steps, steps + 1)})
+
+
+def _closeness(old: LevelConfig, new: LevelConfig, stats: Dict[str, float], desired: float) -> Tuple[float, float]:
+    # first: hit the pass rate; then: change the hand-tuned numbers as little as possible
+    drift = abs(new.target_wpm - old.target_wpm) + abs(new.min_accuracy - old.min_accuracy) * 100
+    miss = max(0.0, abs(stats["pass_rate"] - desired) - PASS_TOLERANCE)
+    return (round(miss, 3), drift)
+
+
+def _search_baseline(cfg: LevelConfig, model: PlayerModel, seed: int,
+                     cache: Dict[str, Dict[str, float]]) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    fresh: Dict[str, Dict[str, float]] = {}
+    return _evaluate(cfg, model, seed, cache, fresh), fresh
+
+
+def calibrate(model: PlayerModel, pass_rates: Dict[int, float], seed: int = 42,
+              workers: Optional[int] = None, cache_path: Optional[Path] = None) -> Tuple[List[LevelProposal], Dict[str, float]]:
+    """
+    Run the search for every level in *pass_rates*.
+    Returns (proposals, run_info) where run_info has timing and cache counts.
+    """
+    t0 = time.perf_counter()
+    cache = load_cache(cache_path)
+    cached_before = len(cache)
+
+    jobs = []
+    for lvl in sorted(pass_rates):
+        cfg = LEVELS[lvl]
+        for acc in _acc_candidates(cfg):
+            jobs.append((cfg, acc, pass_rates[lvl]))
+
+    # each job pickles its cache argument, so it only gets its own level's slice
+    slices = {lvl: _for_level(cache, lvl) for lvl in pass_rates}
+    best: Dict[int, Tuple[LevelConfig, Dict[str, float]]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_search_one, cfg, acc, want, model, seed, slices[cfg.id])
+                   for cfg, acc, want in jobs]
+        for (cfg, _acc, want), fut in zip(jobs, futures):
+            cand, stats, fresh = fut.result()
+            cache.update(fresh)
+            slices[cfg.id].update(fresh)
+            cur = best.get(cfg.id)
+            if cur is None or _closeness(cfg, cand, stats, want) < _closeness(cfg, cur[0], cur[1], want):
+                best[cfg.id] = (cand, stats)
+
+        # the current (hand-tuned) table, for the before/after comparison
+        old_futs = {lvl: pool.submit(_search_baseline, LEVELS[lvl], model, seed, slices[lvl]) for lvl in best}
+        old_stats = {}
+        for lvl, fut in old_futs.items():
+            stats, fresh = fut.result()
+            cache.update(fresh)
+            old_stats[lvl] = stats
+
+    save_cache(cache, cache_path)
+
+    proposals = [
+        LevelProposal(LEVELS[lvl], best[lvl][0], pass_rates[lvl], old_stats[lvl], best[lvl][1])
+        for lvl in sorted(best)
+    ]
+    info = {
+        "seconds": time.perf_counter() - t0,
+        "simulated": len(cache) - cached_before,
+        "cached": cached_before,
+    }
+    return proposals, info
+
+
+def format_proposal(proposals: List[LevelProposal], model: PlayerModel, seed: int) -> str:
+    """Proposed LEVELS table (paste-ready) followed by the supporting numbers."""
+    lines: List[str] = []
+    lines.append(f"# Calibrated for model '{model.name}' "
+                 f"(WPM {model.wpm_mean:.0f}±{model.wpm_sd:.0f}, acc {model.acc_mean:.2f}±{model.acc_sd:.2f}, "
+                 f"{model.players} players, seed {seed})")
+    lines.append("LEVELS = {")
+    for p in proposals:
+        c = p.new
+        name = f'"{c.name}",'
+        lines.append(
+            f"    {c.id}: LevelConfig({c.id}, {name:<13} {c.min_accuracy:.2f}, {c.target_wpm:>2}, "
+            f"{c.time_budget_s}, {str(c.allow_symbols) + ',':<6} {c.max_word_len}),"
+            f"  # pass {p.new_stats['pass_rate']*100:.0f}% (want {p.desired*100:.0f}%)"
+        )
+    lines.append("}")
+    lines.append("")
+    lines.append("| Level | Want | Old targets | Old pass | New targets | New pass | WPM p50 | WPM p90 | Acc p50 |")
+    lines.append("|-------|------|-------------|----------|-------------|----------|---------|---------|---------|")
+    for p in proposals:
+        s = p.new_stats
+        lines.append(
+            f"| {p.new.id}. {p.new.name} | {p.desired*100:.0f}% "
+            f"| {p.old.target_wpm} WPM / {p.old.min_accuracy*100:.0f}% | {p.old_stats['pass_rate']*100:.1f}% "
+            f"| {p.new.target_wpm} WPM / {p.new.min_accuracy*100:.0f}% | {s['pass_rate']*100:.1f}% "
+            f"| {s['wpm_p50']:.1f} | {s['wpm_p90']:.1f} | {s['acc_p50']*100:.1f}% |"
+        )
+    return "\n".join(lines)
+
+
+def _parse_rates(raw: str) -> Dict[int, float]:
+    """"0.9,0.8" -> {1: 0.9, 2: 0.8}. Raises ValueError on a non-number."""
+    vals = [float(x) for x in raw.split(",") if x.strip()]
+    return {i + 1: max(0.0, min(1.0, v)) for i, v in enumerate(vals) if (i + 1) in LEVELS}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--calibrate` entry point. Prints the proposed table; never edits levels.py."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --calibrate",
+                                 description="Search level targets for desired pass rates.")
+    ap.add_argument("--rates", default=",".join(str(DEFAULT_PASS_RATES[k]) for k in sorted(DEFAULT_PASS_RATES)),
+                    help="desired pass rates for levels 1..5, e.g. 0.9,0.8,0.7,0.6,0.5")
+    ap.add_argument("--players", type=int, default=PlayerModel.players)
+    ap.add_argument("--wpm", type=float, default=PlayerModel.wpm_mean, help="population mean WPM")
+    ap.add_argument("--wpm-sd", type=float, default=PlayerModel.wpm_sd)
+    ap.add_argument("--acc", type=float, default=PlayerModel.acc_mean, help="population mean accuracy (0..1)")
+    ap.add_argument("--acc-sd", type=float, default=PlayerModel.acc_sd)
+    ap.add_argument("--model", default=PlayerModel.name, help="label for this population")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", type=Path, default=None, help="also write the proposal to this file")
+    args = ap.parse_args(argv)
+
+    model = PlayerModel(name=args.model, wpm_mean=args.wpm, wpm_sd=args.wpm_sd,
+                        acc_mean=args.acc, acc_sd=args.acc_sd, players=max(1, args.players))
+    try:
+        rates = _parse_rates(args.rates)
+    except ValueError:
+        print(f"Error: --rates must be numbers separated by commas, e.g. 0.9,0.8,0.7 (got {args.rates!r})")
+        return 2
+    if not rates:
+        print("Error: --rates needs at least one value")
+        return 2
+
+    print("== Calibrating level targets ==")
+    proposals, info = calibrate(model, rates, seed=args.seed, workers=args.workers)
+    text = format_proposal(proposals, model, args.seed)
+    print(text)
+    print(f"\n{info['simulated']} configs simulated, {info['cached']} already cached, "
+          f"{info['seconds']:.2f}s")
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+        print(f"Proposal written to: {args.out}")
+    return 0
@@ -0,0 +1,257 @@
+"""
+cohort.py — one report for a whole class: a directory full of profiles.
+
+`--cohort <dir>` finds every profile.json below <dir> (one folder per
+student), loads them on a process pool and writes COHORT.md with:
+  - the level funnel (how many students unlocked / attempted / cleared each level)
+  - PB distributions per level (WPM and accuracy percentiles)
+  - students stuck below the LevelConfig targets on their current level
+
+Each worker loads a whole chunk of files and hands back one small, mergeable
+partial (the sketches from sketches.py), so only summaries cross the
+process boundary — never the profiles themselves. Corrupt or unreadable
+files are counted and skipped, the same way load_store shrugs them off.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .levels import LEVELS, next_level_id
+from .sketches import Moments, QuantileSketch
+from .storage import normalize_store
+
+# Below this many files a pool costs more than it saves
+_POOL_MIN_FILES = 64
+_QUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+
+class LevelCohort:
+    """Everything the report needs about one level, in constant memory."""
+    __slots__ = ("unlocked", "attempted", "cleared", "wpm", "wpm_q", "acc", "acc_q")
+
+    def __init__(self) -> None:
+        self.unlocked = 0
+        self.attempted = 0          # has a PB
+        self.cleared = 0            # unlocked the next level / met both targets
+        self.wpm = Moments()
+        self.wpm_q = QuantileSketch()
+        self.acc = Moments()
+        self.acc_q = QuantileSketch()
+
+    def merge(self, other: "LevelCohort") -> None:
+        self.unlocked += other.unlocked
+        self.attempted += other.attempted
+        self.cleared += other.cleared
+        self.wpm.merge(other.wpm)
+        self.wpm_q.merge(other.wpm_q)
+        self.acc.merge(other.acc)
+        self.acc_q.merge(other.acc_q)
+
+
+class CohortStats:
+    def __init__(self) -> None:
+        self.students = 0
+        self.corrupt: List[str] = []
+        self.levels: Dict[int, LevelCohort] = {lvl: LevelCohort() for lvl in LEVELS}
+        # (student, level, pb wpm or None, pb acc or None)
+        self.behind: List[Tuple[str, int, Optional[float], Optional[float]]] = []
+
+    def merge(self, other: "CohortStats") -> None:
+        self.students += other.students
+        self.corrupt.extend(other.corrupt)
+        for lvl, lc in other.levels.items():
+            self.levels[lvl].merge(lc)
+        self.behind.extend(other.behind)
+
+
+def student_name(path: Path, root: Path) -> str:
+    """alice/profile.json -> "alice"; bob.json -> "bob"."""
+    rel = path.relative_to(root) if path.is_relative_to(root) else path
+    if rel.name == "profile.json":
+        return rel.parent.as_posix() if rel.parent != Path(".") else "."
+    return rel.with_suffix("").as_posix()
+
+
+def _num(v: object) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _pb_for(pbs: dict, lvl: int) -> Optional[dict]:
+    """The level's PB if both fields are numbers; a hand-edited "90%" counts as no PB."""
+    pb = pbs.get(str(lvl))
+    if isinstance(pb, dict) and _num(pb.get("wpm")) and _num(pb.get("accuracy", 0.0)):
+        return pb
+    return None
+
+
+def _meets(lvl: int, pb: dict) -> bool:
+    cfg = LEVELS[lvl]
+    return pb["wpm"] >= cfg.target_wpm and pb.get("accuracy", 0.0) >= cfg.min_accuracy
+
+
+def _add_profile(agg: CohortStats, name: str, store: dict) -> None:
+    unlocks = store.get("unlocks") if isinstance(store.get("unlocks"), dict) else {}
+    pbs = store.get("pbs") if isinstance(store.get("pbs"), dict) else {}
+    agg.students += 1
+    current = 1
+    for lvl, lc in agg.levels.items():
+        if not unlocks.get(str(lvl)):
+            continue
+        lc.unlocked += 1
+        current = max(current, lvl)
+        pb = _pb_for(pbs, lvl)
+        if pb is not None:
+            wpm_val = float(pb["wpm"])
+            acc_val = float(pb.get("accuracy", 0.0))
+            lc.attempted += 1
+            lc.wpm.add(wpm_val)
+            lc.wpm_q.add(wpm_val)
+            lc.acc.add(acc_val)
+            lc.acc_q.add(acc_val)
+        if unlocks.get(str(next_level_id(lvl))) or (pb is not None and _meets(lvl, pb)):
+            lc.cleared += 1
+
+    # "behind" = has not yet met the targets of the highest level they reached
+    pb = _pb_for(pbs, current)
+    if not (pb is not None and _meets(current, pb)):
+        if pb is not None:
+            agg.behind.append((name, current, pb.get("wpm"), pb.get("accuracy")))
+        else:
+            agg.behind.append((name, current, None, None))
+
+
+def _load_chunk(paths: List[str], root: str) -> CohortStats:
+    """Worker: load and summarise a chunk of profile files."""
+    agg = CohortStats()
+    root_p = Path(root)
+    for p in paths:
+        path = Path(p)
+        name = student_name(path, root_p)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            agg.corrupt.append(name)
+            continue
+        if not isinstance(data, dict):
+            agg.corrupt.append(name)
+            continue
+        _add_profile(agg, name, normalize_store(data))
+    return agg
+
+
+def find_profiles(root: Path, pattern: str = "**/profile.json") -> List[Path]:
+    return sorted(p for p in root.glob(pattern) if p.is_file())
+
+
+def analyze_cohort(root: Path, pattern: str = "**/profile.json",
+                   workers: Optional[int] = None) -> CohortStats:
+    paths = [str(p) for p in find_profiles(root, pattern)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < _POOL_MIN_FILES:
+        return _load_chunk(paths, str(root))
+
+    # a few chunks per worker keeps the pool busy when file sizes differ
+    n_chunks = workers * 4
+    size = -(-len(paths) // n_chunks)
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    total = CohortStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_load_chunk, chunks, [str(root)] * len(chunks)):
+            total.merge(part)
+    return total
+
+
+def _pct(part: int, whole: int) -> str:
+    return f"{part / whole * 100:.0f}%" if whole else "—"
+
+
+def format_cohort(agg: CohortStats, root: Path) -> str:
+    lines: List[str] = []
+    lines.append("# Timed Typer — Cohort Report")
+    lines.append("")
+    lines.append(f"_Generated: {time.strftime('%Y-%m-%d %H:%M')}_  ")
+    lines.append(f"_Source: `{root}`_")
+    lines.append("")
+    lines.append(f"- **Students:** {agg.students}")
+    if agg.corrupt:
+        lines.append(f"- **Unreadable profiles (skipped):** {len(agg.corrupt)} — "
+                     + ", ".join(f"`{n}`" for n in sorted(agg.corrupt)[:20])
+                     + (" …" if len(agg.corrupt) > 20 else ""))
+    lines.append("")
+
+    lines.append("## Level funnel")
+    lines.append("")
+    lines.append("| Level | Target | Unlocked | Attempted | Cleared | Cleared % of class |")
+    lines.append("|-------|--------|----------|-----------|---------|--------------------|")
+    for lvl, lc in agg.levels.items():
+        cfg = LEVELS[lvl]
+        lines.append(f"| {lvl}. {cfg.name} | {cfg.target_wpm} WPM / {cfg.min_accuracy*100:.0f}% "
+                     f"| {lc.unlocked} | {lc.attempted} | {lc.cleared} | {_pct(lc.cleared, agg.students)} |")
+    lines.append("")
+
+    lines.append("## PB distribution per level")
+    lines.append("")
+    qhead = " | ".join(f"p{int(q*100)}" for q in _QUANTILES)
+    lines.append(f"| Level | PBs | WPM mean | WPM {qhead} | Acc mean | Acc p10 | Acc p50 |")
+    lines.append("|-------|-----|----------|" + "|".join("-----" for _ in _QUANTILES) + "|----------|---------|---------|")
+    for lvl, lc in agg.levels.items():
+        if not lc.attempted:
+            lines.append(f"| {lvl}. {LEVELS[lvl].name} | 0 | — | " + " | ".join("—" for _ in _QUANTILES) + " | — | — | — |")
+            continue
+        qs = " | ".join(f"{lc.wpm_q.quantile(q):.1f}" for q in _QUANTILES)
+        lines.append(f"| {lvl}. {LEVELS[lvl].name} | {lc.attempted} | {lc.wpm.mean:.1f} | {qs} "
+                     f"| {lc.acc.mean*100:.1f}% | {lc.acc_q.quantile(0.1)*100:.1f}% "
+                     f"| {lc.acc_q.quantile(0.5)*100:.1f}% |")
+    lines.append("")
+
+    lines.append("## Students below target")
+    lines.append("")
+    if not agg.behind:
+        lines.append("Everyone has met the targets of the highest level they reached. 🎉")
+    else:
+        lines.append(f"{len(agg.behind)} student(s) have not met the targets of their current level yet.")
+        lines.append("")
+        lines.append("| Student | Current level | PB WPM | PB Acc | Needs |")
+        lines.append("|---------|---------------|--------|--------|-------|")
+        for name, lvl, wpm_val, acc_val in sorted(agg.behind, key=lambda b: (b[1], b[0])):
+            cfg = LEVELS[lvl]
+            if wpm_val is None:
+                lines.append(f"| {name} | {lvl}. {cfg.name} | — | — | first attempt |")
+                continue
+            acc_val = acc_val or 0.0
+            need = []
+            if wpm_val < cfg.target_wpm:
+                need.append(f"+{cfg.target_wpm - wpm_val:.1f} WPM")
+            if acc_val < cfg.min_accuracy:
+                need.append(f"+{(cfg.min_accuracy - acc_val) * 100:.0f}% Acc")
+            lines.append(f"| {name} | {lvl}. {cfg.name} | {wpm_val:.1f} | {acc_val*100:.0f}% | {' & '.join(need)} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--cohort <dir>` entry point."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --cohort", description="Class report over many profiles.")
+    ap.add_argument("dir", type=Path, help="directory with one folder (profile.json) per student")
+    ap.add_argument("--glob", default="**/profile.json", help="which files are profiles (default **/profile.json)")
+    ap.add_argument("--out", type=Path, default=Path("COHORT.md"))
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = ap.parse_args(argv)
+
+    if not args.dir.is_dir():
+        print(f"Error: not a directory: {args.dir}")
+        return 2
+    t0 = time.perf_counter()
+    agg = analyze_cohort(args.dir, args.glob, args.workers)
+    args.out.write_text(format_cohort(agg, args.dir), encoding="utf-8")
+    dt = time.perf_counter() - t0
+    print(f"{agg.students} profiles ({len(agg.corrupt)} unreadable) in {dt:.2f}s")
+    print(f"{len(agg.behind)} student(s) below target")
+    print(f"Cohort report written to: {args.out}")
+    return 0
@@ -0,0 +1,161 @@
+"""
+difficulty.py — how hard a word is to type, on a 0..100 scale.
+
+Four things make a word slow on a QWERTY keyboard, plus plain length:
+
+  travel     average distance the fingers jump between keys (in key widths)
+  same hand  share of key-to-key moves that stay on one hand (no alternation)
+  shift/sym  share of characters needing Shift or a symbol key (GET, =, [, /)
+  rare pairs share of letter pairs that are uncommon in English ("kx", "pf")
+  length     longer words give more chances to slip
+
+  score = 100 * (0.25 travel + 0.15 same hand + 0.25 shift/sym + 0.20 rare + 0.15 length)
+
+Scores are memoised per word for the whole process. A DifficultyIndex sorts
+one vocabulary by score once (two parallel lists), after which
+
+  index.band(30, 55)     words scoring 30..55          O(log n) + the slice
+  index.bucket(2, 5)     the 3rd of 5 equal-size buckets, easiest first
+
+Indexes are cached per word pool (index_for), so levels and practice can
+narrow their pool to a difficulty band every run without re-scoring.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FULL_BAND = (0.0, 100.0)
+
+_ROWS = (
+    # (unshifted, shifted, x offset of the first key)
+    ("`1234567890-=", "~!@#$%^&*()_+", 0.0),
+    ("qwertyuiop[]\\", "QWERTYUIOP{}|", 1.5),
+    ("asdfghjkl;'", 'ASDFGHJKL:"', 1.75),
+    ("zxcvbnm,./", "ZXCVBNM<>?", 2.25),
+)
+# last column typed by the left hand in each row (` 1-5 / q-t / a-g / z-b)
+_LEFT_LAST = (5, 4, 4, 4)
+
+# key -> (x, y, left_hand, shifted)
+_KEYS: Dict[str, Tuple[float, float, bool, bool]] = {}
+for _y, (_plain, _shift, _off) in enumerate(_ROWS):
+    for _i, (_a, _b) in enumerate(zip(_plain, _shift)):
+        _KEYS[_a] = (_off + _i, float(_y), _i <= _LEFT_LAST[_y], False)
+        _KEYS[_b] = (_off + _i, float(_y), _i <= _LEFT_LAST[_y], True)
+
+COMMON_BIGRAMS = frozenset("""
+th he in er an re on at en nd ti es or te of ed is it al ar st to nt ng se ha as ou io le
+ve co me de hi ri ro ic ne ea ra ce li ch ll be ma si om ur ca el ta la ns di fo ho pe ec
+pr no ct us ac ot il tr ly nc et ut ss so rs un lo wa ge ie wh ee wi em ad ol rt po we na
+ul ni ts mo ow pa im mi ai sh
+""".split())
+
+_W_TRAVEL, _W_HAND, _W_SHIFT, _W_RARE, _W_LEN = 0.25, 0.15, 0.25, 0.20, 0.15
+_MAX_TRAVEL = 4.0           # key widths; a jump this long (or longer) counts as 1.0
+
+
+def components(word: str) -> Dict[str, float]:
+    """The five 0..1 ingredients of the score (handy for tuning and --difficulty)."""
+    keys = [_KEYS.get(ch) for ch in word]
+    n = len(word)
+    shifted = sum(1 for ch, k in zip(word, keys) if k is None or k[3] or not ch.isalpha())
+    moves = same_hand = rare = 0
+    dist = 0.0
+    for (a, ka), (b, kb) in zip(zip(word, keys), zip(word[1:], keys[1:])):
+        moves += 1
+        if ka is None or kb is None:
+            rare += 1
+            continue
+        dist += math.hypot(ka[0] - kb[0], ka[1] - kb[1])
+        same_hand += ka[2] == kb[2]
+        pair = (a + b).lower()
+        if not pair.isalpha() or pair not in COMMON_BIGRAMS:
+            rare += 1
+    return {
+        "travel": min(1.0, dist / moves / _MAX_TRAVEL) if moves else 0.0,
+        "same_hand": same_hand / moves if moves else 0.0,
+        "shift_sym": shifted / n if n else 0.0,
+        "rare": rare / moves if moves else 0.0,
+        "length": min(1.0, max(0, n - 2) / 10),
+    }
+
+
+@lru_cache(maxsize=None)
+def score(word: str) -> float:
+    """0 (trivial) .. 100 (brutal). Memoised: each word is scored once per process."""
+    c = components(word)
+    s = (_W_TRAVEL * c["travel"] + _W_HAND * c["same_hand"] + _W_SHIFT * c["shift_sym"]
+         + _W_RARE * c["rare"] + _W_LEN * c["length"])
+    return round(100.0 * s, 1)
+
+
+class DifficultyIndex:
+    """One vocabulary sorted by score, for O(log n) band queries."""
+    __slots__ = ("scores", "words")
+
+    def __init__(self, words: Sequence[str]) -> None:
+        pairs = sorted((score(w), w) for w in dict.fromkeys(words))
+        self.scores: List[float] = [s for s, _ in pairs]
+        self.words: List[str] = [w for _, w in pairs]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def band(self, lo: float, hi: float) -> List[str]:
+        """Words with lo <= score <= hi, easiest first."""
+        return self.words[bisect_left(self.scores, lo):bisect_right(self.scores, hi)]
+
+    def bucket(self, i: int, n: int) -> List[str]:
+        """Bucket i of n equal-size slices by rank (0 = easiest)."""
+        size = len(self.words)
+        return self.words[i * size // n:(i + 1) * size // n]
+
+
+@lru_cache(maxsize=256)
+def index_for(pool: Tuple[str, ...]) -> DifficultyIndex:
+    """Cached index per pool (a tuple, so it can be the cache key)."""
+    return DifficultyIndex(pool)
+
+
+def filter_band(pool: List[str], band: Optional[Sequence[float]], min_keep: int = 4) -> List[str]:
+    """
+    *pool* narrowed to the words in *band* (lo, hi), in the pool's own order
+    so seeded runs stay reproducible. A band that would leave fewer than
+    *min_keep* words is ignored — a level must never run out of words.
+    """
+    if not band or tuple(band) == FULL_BAND:
+        return pool
+    keep = set(index_for(tuple(pool)).band(band[0], band[1]))
+    if len(keep) < min_keep:
+        return pool
+    return [w for w in pool if w in keep]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--difficulty [level]` entry point: every word of a level (or all levels) by score."""
+    from .levels import LEVELS
+    from .words import _pool_for_level
+
+    ap = argparse.ArgumentParser(prog="TimedTyper --difficulty", description="Word difficulty scores.")
+    ap.add_argument("level", nargs="?", type=int, default=None)
+    ap.add_argument("--buckets", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    levels = [args.level] if args.level else list(LEVELS)
+    for lvl in levels:
+        if lvl not in LEVELS:
+            print(f"Error: no level {lvl}")
+            return 2
+        cfg = LEVELS[lvl]
+        idx = index_for(tuple(_pool_for_level(cfg, band=FULL_BAND)))
+        band = "" if cfg.difficulty == FULL_BAND else f"  (plays band {cfg.difficulty[0]:g}–{cfg.difficulty[1]:g})"
+        print(f"\n== L{lvl} {cfg.name}: {len(idx)} words{band} ==")
+        for b in range(args.buckets):
+            words = idx.bucket(b, args.buckets)
+            if words:
+                print(f"  {score(words[0]):>5.1f}–{score(words[-1]):<5.1f} " + " ".join(words))
+    return 0
@@ -0,0 +1,405 @@
+"""
+fuzz.py — randomized property checks for words + scoring (stdlib only).
+
+Each property has a generator (random.Random -> args tuple) and a checker
+(args -> None when fine, or a message when the property is broken).
+The runner pushes many cases through every property, reports cases/sec,
+and when something fails it shrinks the arguments to the smallest input
+that still fails, so the printout is a ready-made reproduction.
+
+Run it with:  --fuzz [--cases 1000000] [--seed 1] [--workers 4]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import words as words_mod
+from .levels import LEVELS, LevelConfig
+from .difficulty import DifficultyIndex, score
+from .words import words_for_level, check_input, _pool_for_level
+from .sequence import balanced_words_for_level
+from .vocab import Vocab
+from .transfer import merge_profiles
+from . import storage
+from .play import _evaluate_attempt
+from .scoring import RunStats, update_accuracy, passed_level
+from .timing import wpm
+
+# Characters we fuzz with: what the word banks use, plus things they don't
+# (accents, a combining mark, emoji, space) to make sure nothing chokes.
+_ALPHABET = string.ascii_letters + string.digits + "[]=/._-" + "éßüñ" + "́" + "🙂" + " "
+_VOCAB = sorted({w for lst in (words_mod.BASE_WORDS, words_mod.L1_PING, words_mod.L2_TRACEROUTE,
+                               words_mod.L3_DNS, words_mod.L4_HTTP, words_mod.L5_FIREWALL,
+                               words_mod.SYMBOL_TOKENS) for w in lst})
+
+
+@dataclass
+class Property:
+    name: str
+    gen: Callable[[random.Random], Tuple[Any, ...]]
+    check: Callable[..., Optional[str]]
+    weight: float = 1.0      # share of --cases this property runs (slow ones run fewer)
+
+
+PROPERTIES: List[Property] = []
+
+
+def prop(name: str, gen: Callable[[random.Random], Tuple[Any, ...]], weight: float = 1.0):
+    """Register a property checker."""
+    def deco(fn: Callable[..., Optional[str]]) -> Callable[..., Optional[str]]:
+        PROPERTIES.append(Property(name, gen, fn, weight))
+        return fn
+    return deco
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+def _rand_text(rng: random.Random, lo: int = 0, hi: int = 12) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(lo, hi)))
+
+
+def _gen_input_pair(rng: random.Random) -> Tuple[str, str]:
+    target = rng.choice(_VOCAB) if rng.random() < 0.5 else _rand_text(rng)
+    r = rng.random()
+    if r < 0.2:
+        typed = target                                        # exact
+    elif r < 0.4:
+        typed = target[:rng.randint(0, len(target))]          # prefix / empty
+    elif r < 0.6:
+        typed = target + _rand_text(rng, 1, 3)                # typed too much
+    elif r < 0.8 and target:
+        i = rng.randrange(len(target))                        # one wrong char
+        typed = target[:i] + rng.choice(_ALPHABET) + target[i + 1:]
+    else:
+        typed = _rand_text(rng)
+    return (target, typed)
+
+
+def _gen_level(rng: random.Random) -> Tuple[LevelConfig, int, int]:
+    base = LEVELS[rng.choice(sorted(LEVELS))]
+    lo = rng.uniform(0, 100)
+    band = (lo, rng.uniform(lo, 100)) if rng.random() < 0.5 else (0.0, 100.0)
+    cfg = replace(base, allow_symbols=rng.random() < 0.5, max_word_len=rng.randint(1, 12), difficulty=band)
+    return (cfg, rng.randint(0, 80), rng.getrandbits(32))
+
+
+def _gen_stats(rng: random.Random) -> Tuple[int, int, int]:
+    hi = 10 ** rng.randint(0, 6)
+    total = rng.randint(0, hi)
+    return (total, rng.randint(0, total), rng.randint(0, hi))
+
+
+def _gen_wpm(rng: random.Random) -> Tuple[int, float]:
+    return (rng.randint(0, 10 ** rng.randint(0, 6)), rng.choice((0.0, -1.0, 1e-9, rng.uniform(0, 600))))
+
+
+def _gen_pass(rng: random.Random) -> Tuple[int, float, float]:
+    return (rng.randint(1, 5), rng.random(), rng.uniform(0, 80))
+
+
+def _gen_band(rng: random.Random) -> Tuple[List[str], float, float]:
+    words = [_rand_text(rng) or "x" for _ in range(rng.randint(0, 40))]
+    lo = rng.uniform(-5, 105)
+    return (words, lo, lo + rng.uniform(-10, 60))
+
+
+def _gen_vocab(rng: random.Random) -> Tuple[List[str], str]:
+    # few distinct words, many repeats — like level pools and sequences
+    distinct = [_rand_text(rng) for _ in range(rng.randint(1, 12))]
+    return ([rng.choice(distinct) for _ in range(rng.randint(0, 80))], _rand_text(rng))
+
+
+# ---------------------------------------------------------------------------
+# Properties
+# ---------------------------------------------------------------------------
+
+def _oracle(target: str, typed: str) -> Tuple[bool, int]:
+    """Spec for check_input, written the slow and obvious way."""
+    if typed == target:
+        return (True, -1)
+    if target.startswith(typed):
+        return (False, -1)          # still typing: nothing wrong yet
+    for i in range(min(len(target), len(typed))):
+        if target[i] != typed[i]:
+            return (False, i)
+    return (False, len(target))     # typed past the end
+
+
+@prop("words.check_input", _gen_input_pair)
+def _p_check_input(target: str, typed: str) -> Optional[str]:
+    got, want = check_input(target, typed), _oracle(target, typed)
+    if got != want:
+        return f"check_input({target!r}, {typed!r}) = {got}, expected {want}"
+    return None
+
+
+@prop("play._evaluate_attempt", _gen_input_pair)
+def _p_evaluate(target: str, typed: str) -> Optional[str]:
+    complete, err = _evaluate_attempt(target, typed)
+    if complete != (typed == target):
+        return f"_evaluate_attempt({target!r}, {typed!r}) complete={complete}"
+    if not complete and err >= 0 and err > len(target):
+        return f"_evaluate_attempt({target!r}, {typed!r}) error index {err} past the word"
+    return None
+
+
+@prop("difficulty.band", _gen_band, weight=0.2)
+def _p_band(words: List[str], lo: float, hi: float) -> Optional[str]:
+    got = DifficultyIndex(words).band(lo, hi)
+    want = sorted({w for w in words if lo <= score(w) <= hi}, key=lambda w: (score(w), w))
+    if got != want:
+        return f"band({lo:.1f}, {hi:.1f}) over {words!r} = {got!r}, expected {want!r}"
+    return None
+
+
+@prop("vocab.encode_decode", _gen_vocab, weight=0.5)
+def _p_vocab(words: List[str], probe: str) -> Optional[str]:
+    v = Vocab()
+    ids = v.encode(words)
+    if v.decode(ids) != words:
+        return f"decode(encode({words!r})) = {v.decode(ids)!r}"
+    seen: Dict[str, int] = {}
+    for w, i in zip(words, ids):
+        if seen.setdefault(w, i) != i or v.lens[i] != len(w):
+            return f"{w!r} got id {i} (len {v.lens[i]}), first seen as {seen[w]}"
+    if len(v) != len(seen):
+        return f"{len(v)} ids for {len(seen)} distinct words"
+    if (v.get(probe) >= 0) != (probe in seen):
+        return f"get({probe!r}) = {v.get(probe)} but the word was {'' if probe in seen else 'never '}added"
+    return None
+
+
+def _gen_profiles(rng: random.Random) -> Tuple[dict, dict]:
+    def one() -> dict:
+        levels = rng.sample(range(1, 8), rng.randint(0, 5))
+        acc_key = rng.choice(("accuracy", "acc"))       # legacy saves too
+        return {"pbs": {str(l): {"wpm": round(rng.uniform(0, 90), 1), acc_key: round(rng.random(), 3)} for l in levels},
+                "unlocks": {str(l): True for l in rng.sample(range(1, 8), rng.randint(0, 4))}}
+    return (one(), one())
+
+
+@prop("transfer.merge_profiles", _gen_profiles, weight=0.5)
+def _p_merge(a: dict, b: dict) -> Optional[str]:
+    na, nb = storage.normalize_store(a), storage.normalize_store(b)
+    merged = merge_profiles(storage.normalize_store(a), nb)
+    for src in (na, nb):
+        for lvl, pb in src["pbs"].items():
+            got = merged["pbs"].get(lvl)
+            if got is None or got["wpm"] < pb["wpm"] or got["accuracy"] < pb["accuracy"]:
+                return f"merge lost PB L{lvl}: {pb} -> {got}"
+        for lvl, on in src["unlocks"].items():
+            if on and not merged["unlocks"].get(lvl):
+                return f"merge lost unlock L{lvl}"
+    again = merge_profiles(storage.normalize_store(merged), nb)
+    if again != merged:
+        return "merging the same profile twice changed the result"
+    return None
+
+
+@prop("words.words_for_level", _gen_level, weight=0.02)
+def _p_words_for_level(cfg: LevelConfig, n: int, seed: int) -> Optional[str]:
+    before = [list(x) for x in (words_mod.L1_PING, words_mod.SYMBOL_TOKENS, words_mod.BASE_WORDS)]
+    pool = _pool_for_level(cfg)
+    seq = words_for_level(cfg, n, rng=random.Random(seed))
+    after = [list(x) for x in (words_mod.L1_PING, words_mod.SYMBOL_TOKENS, words_mod.BASE_WORDS)]
+    if before != after:
+        return f"_pool_for_level({cfg}) modified the module word lists"
+    if len(seq) != n:
+        return f"words_for_level(n={n}) returned {len(seq)} words"
+    if any(w not in pool for w in seq):
+        return f"words_for_level({cfg}) returned a word outside its pool"
+    if len(set(pool)) > 1:
+        for i in range(1, len(seq)):
+            if seq[i] == seq[i - 1]:
+                return f"words_for_level({cfg}, {n}, seed={seed}) repeats {seq[i]!r} at {i}"
+    return None
+
+
+@prop("sequence.balanced_words_for_level", _gen_level, weight=0.05)
+def _p_balanced(cfg: LevelConfig, n: int, seed: int) -> Optional[str]:
+    pool = _pool_for_level(cfg)
+    seq = balanced_words_for_level(cfg, n, rng=random.Random(seed))
+    if len(seq) != n:
+        return f"balanced_words_for_level(n={n}) returned {len(seq)} words"
+    if any(w not in pool for w in seq):
+        return f"balanced_words_for_level({cfg}) returned a word outside its pool"
+    if len(set(pool)) > 1:
+        for i in range(1, len(seq)):
+            if seq[i] == seq[i - 1]:
+                return f"balanced_words_for_level({cfg}, {n}, seed={seed}) repeats {seq[i]!r} at {i}"
+    return None
+
+
+@prop("scoring.update_accuracy", _gen_stats)
+def _p_accuracy(words_total: int, words_ok: int, typos: int) -> Optional[str]:
+    stats = RunStats(words_total=words_total, words_ok=words_ok, typos=typos)
+    update_accuracy(stats)
+    acc = stats.accuracy
+    if not (0.0 <= acc <= 1.0):
+        return f"accuracy {acc} out of range for {stats}"
+    if words_total + typos == 0 and acc != 1.0:
+        return f"no attempts should mean 100% accuracy, got {acc}"
+    worse = RunStats(words_total=words_total, words_ok=words_ok, typos=typos + 1)
+    update_accuracy(worse)
+    if worse.accuracy > acc:
+        return f"one more typo raised accuracy ({acc} -> {worse.accuracy}) for {stats}"
+    return None
+
+
+@prop("timing.wpm", _gen_wpm)
+def _p_wpm(chars: int, seconds: float) -> Optional[str]:
+    val = wpm(chars, seconds)
+    if not math.isfinite(val) or val < 0:
+        return f"wpm({chars}, {seconds}) = {val}"
+    if seconds <= 0 and val != 0.0:
+        return f"wpm({chars}, {seconds}) should be 0 for non-positive time"
+    if seconds > 0 and not math.isclose(wpm(chars * 2, seconds), 2 * val, rel_tol=1e-9, abs_tol=1e-9):
+        return f"wpm not linear in chars at ({chars}, {seconds})"
+    return None
+
+
+@prop("scoring.passed_level", _gen_pass)
+def _p_passed(level_id: int, acc: float, wpm_final: float) -> Optional[str]:
+    cfg = LEVELS[level_id]
+    got = passed_level(cfg, RunStats(accuracy=acc), wpm_final)
+    want = acc >= cfg.min_accuracy and wpm_final >= cfg.target_wpm
+    if got != want:
+        return f"passed_level(L{level_id}, acc={acc}, wpm={wpm_final}) = {got}"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Shrinking
+# ---------------------------------------------------------------------------
+
+def _shrink_value(v: Any) -> List[Any]:
+    """Smaller candidates for one argument, most aggressive first."""
+    if isinstance(v, bool):
+        return [False] if v else []
+    if isinstance(v, int):
+        return [x for x in dict.fromkeys((0, v // 2, v - 1 if v > 0 else v + 1)) if abs(x) < abs(v)]
+    if isinstance(v, float):
+        return [x for x in (0.0, float(int(v)), v / 2) if abs(x) < abs(v) or (x != v and x == int(v))]
+    if isinstance(v, str):
+        out = [""] if v else []
+        out += [v[:len(v) // 2], v[len(v) // 2:]] if len(v) > 1 else []
+        out += [v[:i] + v[i + 1:] for i in range(len(v))]
+        out += [v[:i] + "a" + v[i + 1:] for i in range(len(v)) if v[i] != "a"]
+        return out
+    if isinstance(v, LevelConfig):
+        out = []
+        for f in fields(v):
+            for smaller in _shrink_value(getattr(v, f.name)) if f.name in ("max_word_len", "allow_symbols") else []:
+                out.append(replace(v, **{f.name: smaller}))
+        return out
+    return []
+
+
+def shrink(check: Callable[..., Optional[str]], args: Tuple[Any, ...], budget: int = 2000) -> Tuple[Tuple[Any, ...], str]:
+    """Greedy shrink: keep taking the first smaller candidate that still fails."""
+    msg = check(*args) or ""
+    improved = True
+    while improved and budget > 0:
+        improved = False
+        for i, v in enumerate(args):
+            for cand in _shrink_value(v):
+                budget -= 1
+                trial = args[:i] + (cand,) + args[i + 1:]
+                try:
+                    m = check(*trial)
+                except Exception as e:
+                    m = f"raised {e!r}"
+                if m:
+                    args, msg, improved = trial, m, True
+                    break
+            if improved or budget <= 0:
+                break
+    return args, msg
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _run_property(name: str, cases: int, seed: int) -> Tuple[str, int, float, Optional[Tuple[str, str]]]:
+    """Worker: run *cases* of one property. Returns (name, ran, seconds, failure)."""
+    p = next(p for p in PROPERTIES if p.name == name)
+    rng = random.Random(f"{seed}:{name}")
+    gen, check = p.gen, p.check
+    t0 = time.perf_counter()
+    for n in range(cases):
+        args = gen(rng)
+        try:
+            bad = check(*args)
+        except Exception as e:
+            bad = f"raised {e!r}"
+        if bad:
+            small, msg = shrink(check, args)
+            return name, n + 1, time.perf_counter() - t0, (repr(small), msg)
+    return name, cases, time.perf_counter() - t0, None
+
+
+def run_fuzz(cases: int, seed: int = 1, workers: int = 1,
+             only: Optional[str] = None) -> List[Tuple[str, int, float, Optional[Tuple[str, str]]]]:
+    """
+    Run every property. With workers > 1 each property's cases are split into
+    chunks with their own seeds and spread over a process pool.
+    """
+    props = [p for p in PROPERTIES if not only or only in p.name]
+    jobs = []
+    for p in props:
+        n = max(1, int(cases * p.weight))
+        chunks = max(1, workers)
+        for c in range(chunks):
+            jobs.append((p.name, n // chunks + (1 if c < n % chunks else 0), seed * 1000 + c))
+
+    merged: Dict[str, List[Any]] = {p.name: [0, 0.0, None] for p in props}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_property, *zip(*jobs)))
+    else:
+        results = [_run_property(*j) for j in jobs]
+    for name, ran, secs, fail in results:
+        m = merged[name]
+        m[0] += ran
+        m[1] = max(m[1], secs) if workers > 1 else m[1] + secs   # wall time when parallel
+        m[2] = m[2] or fail
+    return [(name, m[0], m[1], m[2]) for name, m in merged.items()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--fuzz` entry point. Exit code 1 if any property fails."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --fuzz", description="Randomized property checks.")
+    ap.add_argument("--cases", type=int, default=200_000, help="cases per property (slow ones run fewer)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("-k", metavar="TEXT", default=None, help="only properties whose name contains TEXT")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    results = run_fuzz(max(1, args.cases), seed=args.seed, workers=max(1, args.workers), only=args.k)
+    total = time.perf_counter() - t0
+
+    print(f"{'property':<26} {'cases':>11} {'cases/s':>11}  result")
+    failed = 0
+    all_cases = 0
+    for name, ran, secs, fail in results:
+        all_cases += ran
+        rate = ran / secs if secs > 0 else 0.0
+        print(f"{name:<26} {ran:>11,} {rate:>11,.0f}  {'FAIL' if fail else 'ok'}")
+        if fail:
+            failed += 1
+            print(f"    minimal case: {fail[0]}")
+            print(f"    {fail[1]}")
+    print(f"\n{all_cases:,} cases in {total:.2f}s ({all_cases / max(total, 1e-9):,.0f}/s), "
+          f"{failed} failing propert{'y' if failed == 1 else 'ies'}")
+    return 1 if failed else 0
@@ -1,7 +1,7 @@
 """
 Game loop orchestrator: transitions, timers, word dispatch.
 """
-import path
+from __future__ import annotations
 
 from .state import GameState, Screen
 from .menu import title_menu, level_select
@@ -11,13 +11,27 @@ from .practice_level import practice_level
 from .selftest import run_self_tests
 from .demo import run_demo
 from .about import about_screen
+from .packs import reload_if_changed
+from .kiosk import profile_picker
 
 
 
-def run_game() -> None:
-    state = GameState()
+def run_game(state: GameState | None = None) -> None:
+    """
+    Main screen loop. Pass a prepared GameState (e.g. one with a scripted
+    io backend) to drive the real screens without a keyboard.
+    """
+    state = state or GameState()
+    try:
+        _loop(state)
+    finally:
+        state.close()   # kiosk mode: batch-write the learners still in the cache
+
+
+def _loop(state: GameState) -> None:
     while state.running:
         if state.screen == Screen.MENU:
+            reload_if_changed()   # pick up edited level packs between runs
             title_menu(state)
         elif state.screen == Screen.LEVEL_SELECT:
             level_select(state)
@@ -33,14 +47,16 @@ def run_game() -> None:
             run_demo(state)
         elif state.screen == Screen.REPORT:
             from .report import export_report_to_project_root
-            export_report_to_project_root()
-            print(f"\nReport written to: {path}")
-            print("(Press Enter to return to menu)")
-            try: input()
+            path = export_report_to_project_root(state.store, state.profile_path)
+            state.io.print(f"\nReport written to: {path}")
+            state.io.print("(Press Enter to return to menu)")
+            try: state.io.input()
             except (KeyboardInterrupt, EOFError): pass
             state.set_screen(Screen.MENU)
         elif state.screen == Screen.ABOUT:        # <-- handle About
             about_screen(state)
+        elif state.screen == Screen.PROFILES:
+            profile_picker(state)
         elif state.screen == Screen.RESULTS:
             state.set_screen(Screen.MENU)
         elif state.screen == Screen.QUIT:
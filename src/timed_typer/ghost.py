@@ -0,0 +1,107 @@
+"""
+ghost.py — race against your own best run.
+
+While a level is played we note (ms since start, total correct chars) after
+every correct word. When the run is the fastest one so far for that level,
+the timeline is saved in the profile under "ghosts" next to "pbs":
+
+  "ghosts": { "3": {"wpm": 31.2, "t": "<base64>", "c": "<base64>"} }
+
+  t = per-word time deltas in ms  (array('I'), little-endian, base64)
+  c = per-word char counts        (array('B'))
+
+Loading turns the deltas into cumulative arrays once, so "where was the
+ghost at time T?" is one bisect — O(log n), no rescanning per HUD frame.
+"""
+from __future__ import annotations
+
+import base64
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Optional
+
+
+def _pack(a: array) -> str:
+    if sys.byteorder == "big" and a.itemsize > 1:
+        a = array(a.typecode, a)
+        a.byteswap()
+    return base64.b64encode(a.tobytes()).decode("ascii")
+
+
+def _unpack(typecode: str, s: str) -> array:
+    a = array(typecode)
+    a.frombytes(base64.b64decode(s))
+    if sys.byteorder == "big" and a.itemsize > 1:
+        a.byteswap()
+    return a
+
+
+class GhostTimeline:
+    """Cumulative (time, chars) points of one run."""
+    __slots__ = ("wpm", "times_ms", "chars")
+
+    def __init__(self, wpm: float, times_ms: list, chars: list) -> None:
+        self.wpm = wpm
+        self.times_ms = times_ms        # ascending
+        self.chars = chars              # chars[i] = correct chars after word i
+
+    def chars_at(self, ms: int) -> int:
+        """Correct chars the ghost had typed by *ms* into its run."""
+        i = bisect_right(self.times_ms, ms)
+        return self.chars[i - 1] if i else 0
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "GhostTimeline":
+        dt = _unpack("I", d["t"])
+        dc = _unpack("B", d["c"])
+        return cls(float(d["wpm"]), list(accumulate(dt)), list(accumulate(dc)))
+
+
+class GhostRecorder:
+    """Builds the timeline of the run in progress (two array appends per word)."""
+    __slots__ = ("_dt", "_dc", "_last_ms")
+
+    def __init__(self) -> None:
+        self._dt = array("I")
+        self._dc = array("B")
+        self._last_ms = 0
+
+    def word_done(self, ms: int, word_len: int) -> None:
+        self._dt.append(max(0, ms - self._last_ms))
+        self._dc.append(min(word_len, 255))
+        self._last_ms = ms
+
+    def to_dict(self, wpm: float) -> Dict[str, Any]:
+        return {"wpm": round(wpm, 2), "t": _pack(self._dt), "c": _pack(self._dc)}
+
+    def __len__(self) -> int:
+        return len(self._dt)
+
+
+def load_ghost(store: Dict[str, Any], level_id: int) -> Optional[GhostTimeline]:
+    """The saved ghost for a level, or None (missing / ghosts off / unreadable)."""
+    if not store.get("settings", {}).get("ghost", True):
+        return None
+    d = store.get("ghosts", {}).get(str(level_id))
+    if not isinstance(d, dict):
+        return None
+    try:
+        g = GhostTimeline.from_dict(d)
+    except (KeyError, ValueError, TypeError):
+        return None
+    return g if g.times_ms else None
+
+
+def maybe_save_ghost(store: Dict[str, Any], level_id: int, rec: GhostRecorder,
+                     final_wpm: float) -> bool:
+    """Keep this run as the ghost if it beat the current one. Caller saves the store."""
+    if not len(rec):
+        return False
+    ghosts = store.setdefault("ghosts", {})
+    old = ghosts.get(str(level_id))
+    if isinstance(old, dict) and float(old.get("wpm", 0.0)) >= final_wpm:
+        return False
+    ghosts[str(level_id)] = rec.to_dict(final_wpm)
+    return True
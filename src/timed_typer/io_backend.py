@@ -0,0 +1,85 @@
+"""
+io_backend.py — where screens read input from and write output to.
+
+Every screen talks to `state.io` instead of calling input()/print() directly:
+  - ConsoleIO:  the real terminal (default)
+  - ScriptedIO: feeds inputs from any iterable; output is dropped (or echoed)
+  - RecorderIO: like ScriptedIO, but keeps every output line in memory
+
+When a scripted backend runs out of inputs it raises EOFError, exactly like
+input() does when stdin closes, so screens need no special handling.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+
+class ConsoleIO:
+    """Plain terminal I/O (what the game always used)."""
+
+    def input(self, prompt: str = "") -> str:
+        return input(prompt)
+
+    def print(self, *args: object, sep: str = " ", end: str = "\n") -> None:
+        print(*args, sep=sep, end=end)
+
+
+class ScriptedIO:
+    """
+    Inputs come from an iterable (list, generator, file lines...).
+    Output is discarded unless echo=True, in which case prompts, inputs and
+    output are written to stdout so a replay can be watched.
+    """
+
+    def __init__(self, inputs: Iterable[str], echo: bool = False) -> None:
+        self._inputs: Iterator[str] = iter(inputs)
+        self.echo = echo
+        self.inputs_used = 0
+
+    def input(self, prompt: str = "") -> str:
+        try:
+            line = next(self._inputs)
+        except StopIteration:
+            raise EOFError("script exhausted") from None
+        self.inputs_used += 1
+        if self.echo:
+            sys.stdout.write(f"{prompt}{line}\n")
+        self._write(prompt)
+        return line
+
+    def print(self, *args: object, sep: str = " ", end: str = "\n") -> None:
+        text = sep.join(str(a) for a in args) + end
+        if self.echo:
+            sys.stdout.write(text)
+        self._write(text)
+
+    def _write(self, text: str) -> None:
+        # hook for RecorderIO; plain scripts throw output away
+        pass
+
+
+class RecorderIO(ScriptedIO):
+    """ScriptedIO that also keeps everything the screens printed (prompts included)."""
+
+    def __init__(self, inputs: Iterable[str] = (), echo: bool = False) -> None:
+        super().__init__(inputs, echo)
+        self.chunks: List[str] = []
+
+    def _write(self, text: str) -> None:
+        if text:
+            self.chunks.append(text)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+
+def read_script(path: Path) -> List[str]:
+    """
+    One input per line. Blank lines are kept (they mean "press Enter");
+    lines starting with '#' are comments.
+    """
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [ln for ln in lines if not ln.startswith("#")]
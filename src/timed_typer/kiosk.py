@@ -0,0 +1,300 @@
+"""
+kiosk.py — many learners on one shared PC.
+
+  python run_timed_typer.py --kiosk [--root DIR] [--cache 8]
+
+Normally the game has exactly one profile per OS user (storage.DEFAULT_PATH).
+In kiosk mode the title menu first asks "who's typing?": pick a learner or
+create a new one. Every learner gets a folder of their own,
+
+  <profile dir>/kiosk/<name>/profile.json     PBs, unlocks, ghosts, srs...
+  <profile dir>/kiosk/<name>/runs.jsonl       their run history
+  <profile dir>/kiosk/index.json              names + created / last used
+
+Three things keep switching cheap on a lab PC with hundreds of learners:
+
+  index     the picker lists names from index.json only — the kiosk folder
+            is scanned just once, to rebuild a missing or broken index
+  LRU cache the last --cache profiles stay loaded; switching back to one of
+            them is a dict lookup, no disk read
+  write-back finished runs mark the profile dirty instead of saving it; a
+            dirty profile is written when it falls out of the cache, and all
+            of them are written in one batch when the game exits
+
+The run history (runs.jsonl) is still appended at the end of every run, so
+a crash loses at most the unsaved PBs of the learners in the cache.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import storage
+
+DEFAULT_CAPACITY = 8
+SHOW_RECENT = 20            # the picker lists this many; older learners type their name
+INDEX_NAME = "index.json"
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,31}$")
+# names Windows won't give a folder, with or without an extension ("con", "COM1.txt")
+_RESERVED_RE = re.compile(r"^(con|prn|aux|nul|com[1-9]|lpt[1-9])(\..*)?$", re.IGNORECASE)
+
+
+class KioskError(ValueError):
+    """A learner name that can't be used (bad characters, taken, unknown)."""
+
+
+def _valid_name(name: str) -> bool:
+    # a trailing "." is dropped by Windows too, so "amy." would be amy's folder
+    return bool(_NAME_RE.match(name)) and not _RESERVED_RE.match(name) and not name.endswith(".")
+
+
+def default_root() -> Path:
+    return storage.DEFAULT_PATH.parent / "kiosk"
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    """Temp file + replace, same as storage.save_store."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class ProfileIndex:
+    """name -> {"created": ts, "last_used": ts}, kept in one small JSON file."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.path = root / INDEX_NAME
+        self.entries: Dict[str, Dict[str, float]] = {}
+        self._lower: Dict[str, str] = {}        # lower-case name -> stored spelling
+        self.dirty = False
+        self.rebuilt = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            entries = data["profiles"]
+            if not isinstance(entries, dict):
+                raise ValueError("profiles must be an object")
+            self.entries = {n: e for n, e in entries.items() if isinstance(e, dict) and _valid_name(n)}
+        except (OSError, ValueError, KeyError, TypeError):
+            self._rebuild()
+        self._lower = {n.lower(): n for n in self.entries}
+
+    def _rebuild(self) -> None:
+        # the one and only directory scan: first run, or the index was lost
+        self.entries = {}
+        if self.root.is_dir():
+            for d in self.root.iterdir():
+                prof = d / "profile.json"
+                if _valid_name(d.name) and prof.is_file():
+                    mtime = prof.stat().st_mtime
+                    self.entries[d.name] = {"created": mtime, "last_used": mtime}
+        self.rebuilt = True
+        self.dirty = True
+
+    def find(self, name: str) -> Optional[str]:
+        """The stored spelling of *name*, matched case-insensitively (None = unknown)."""
+        if name in self.entries:
+            return name
+        return self._lower.get(name.lower())
+
+    def add(self, name: str) -> None:
+        now = time.time()
+        self.entries[name] = {"created": now, "last_used": now}
+        self._lower[name.lower()] = name
+        self.dirty = True
+
+    def touch(self, name: str) -> None:
+        self.entries.setdefault(name, {"created": time.time()})["last_used"] = time.time()
+        self.dirty = True
+
+    def recent(self, limit: int = 0) -> List[str]:
+        """Names, most recently used first."""
+        names = sorted(self.entries, key=lambda n: -self.entries[n].get("last_used", 0.0))
+        return names[:limit] if limit else names
+
+    def save(self) -> None:
+        if self.dirty:
+            _atomic_write_json(self.path, {"profiles": self.entries})
+            self.dirty = False
+
+
+class ProfileCache:
+    """
+    Up to *capacity* loaded profiles, least recently used evicted first.
+    Profiles are only written on eviction and on flush() (write-back).
+    """
+
+    def __init__(self, root: Optional[Path] = None, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.root = root or default_root()
+        self.capacity = max(1, capacity)
+        self.index = ProfileIndex(self.root)
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty: set = set()
+        self.loads = 0              # disk reads / writes (the bench counts on these)
+        self.writes = 0
+
+    def path_for(self, name: str) -> Path:
+        return self.root / name / "profile.json"
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._lru
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """A learner's store; loaded from disk only if it is not in the cache."""
+        real = self.index.find(name)
+        if real is None:
+            raise KioskError(f"no learner called {name!r}")
+        store = self._lru.get(real)
+        if store is not None:
+            self._lru.move_to_end(real)
+        else:
+            store = storage.load_store(self.path_for(real))
+            self.loads += 1
+            self._put(real, store)
+        self.index.touch(real)
+        return store
+
+    def create(self, name: str) -> Dict[str, Any]:
+        name = name.strip()
+        if not _NAME_RE.match(name):
+            raise KioskError("names are 1-32 letters, digits, '.', '_' or '-'")
+        if not _valid_name(name):
+            raise KioskError(f"{name!r} can't be used as a folder name on Windows")
+        if self.index.find(name) is not None:
+            raise KioskError(f"{name!r} already exists")
+        store = storage.normalize_store({})
+        store["settings"]["name"] = name        # shows up on the leaderboard
+        self.index.add(name)
+        self.index.save()                       # new names must survive a crash
+        self._put(name, store)
+        self._dirty.add(name)
+        return store
+
+    def mark_dirty(self, name: str) -> None:
+        if name in self._lru:
+            self._dirty.add(name)
+
+    def _put(self, name: str, store: Dict[str, Any]) -> None:
+        self._lru[name] = store
+        self._lru.move_to_end(name)
+        while len(self._lru) > self.capacity:
+            old, old_store = self._lru.popitem(last=False)
+            if old in self._dirty and not self._write(old, old_store):
+                # unsaved: keep it loaded (over capacity for now) rather than drop the learner's runs
+                self._lru[old] = old_store
+                self._lru.move_to_end(old, last=False)
+                break
+
+    def _write(self, name: str, store: Dict[str, Any]) -> bool:
+        """Save one profile; a full or read-only disk is reported, not raised (False = still dirty)."""
+        try:
+            storage.save_store(store, self.path_for(name))
+        except OSError as e:
+            print(f"(profile {name!r} not saved: {e})", file=sys.stderr)
+            return False
+        self._dirty.discard(name)
+        self.writes += 1
+        return True
+
+    def flush(self) -> int:
+        """
+        Write every dirty profile (and the index) now. Returns how many profiles
+        were written; one that fails stays dirty and the rest are still written.
+        """
+        n = 0
+        for name in [n for n in self._lru if n in self._dirty]:
+            n += self._write(name, self._lru[name])
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"(kiosk index not saved: {e})", file=sys.stderr)
+        return n
+
+
+def profile_picker(state) -> None:
+    """The "who's typing?" screen (Screen.PROFILES)."""
+    from .state import Screen
+    from .ui_console import toast
+
+    io = state.io
+    cache: ProfileCache = state.profiles
+    recent = cache.index.recent(SHOW_RECENT)
+    io.print("\n=== Timed Typer — Who's typing? ===")
+    for i, name in enumerate(recent, 1):
+        mark = "  (current)" if name == state.profile_name else ""
+        io.print(f"[{i}] {name}{mark}")
+    more = len(cache.index.entries) - len(recent)
+    if more > 0:
+        io.print(f"    …and {more} more — type a name")
+    io.print("[N] New learner")
+    io.print("[Q] Quit")
+    choice = io.input("> ").strip()
+
+    low = choice.lower()
+    if low == "q":
+        state.set_screen(Screen.QUIT)
+        return
+    if low == "":
+        if state.profile_name:
+            state.set_screen(Screen.MENU)     # Enter = keep the current learner
+        return
+    try:
+        if low == "n":
+            name = io.input("New learner name: ").strip()
+            cache.create(name)
+        elif choice.isdigit() and 1 <= int(choice) <= len(recent):
+            name = recent[int(choice) - 1]
+        else:
+            name = choice
+        state.use_profile(name)
+    except KioskError as e:
+        toast(f"✗ {e}", io)
+        return
+    toast(f"👋 Hi {state.profile_name}!", io)
+    state.set_screen(Screen.MENU)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--kiosk` entry point: the normal game, with a learner picker in front."""
+    from .app import main as app_main
+    from .state import GameState
+
+    ap = argparse.ArgumentParser(prog="TimedTyper --kiosk", description="Shared-PC mode with one profile per learner.")
+    ap.add_argument("--root", type=Path, default=None, help="learner folders (default: <profile dir>/kiosk)")
+    ap.add_argument("--cache", type=int, default=DEFAULT_CAPACITY,
+                    help=f"learners kept loaded (default {DEFAULT_CAPACITY})")
+    ap.add_argument("--list", action="store_true", help="list learners (most recent first) and exit")
+    args = ap.parse_args(argv)
+
+    cache = ProfileCache(args.root, args.cache)
+    if args.list:
+        for name in cache.index.recent():
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(cache.index.entries[name].get("last_used", 0)))
+            print(f"{name:<32} last used {used}")
+        cache.index.save()          # keeps a freshly rebuilt index
+        return 0
+    try:
+        app_main(GameState(profiles=cache))
+    except (KeyboardInterrupt, EOFError):
+        pass                        # run_game has already flushed the cache
+    return 0
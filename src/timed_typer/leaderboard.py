@@ -0,0 +1,316 @@
+"""
+leaderboard.py — per-level leaderboards for every run on this machine.
+
+Each level keeps all its scores (WPM) in one sorted array('d'), so
+  rank / percentile of a score   = one bisect            O(log n)
+  inserting a new run            = bisect + memmove     (C speed, ~1 ms at 1M runs)
+and a short top-K list with names for the podium.
+
+On disk (next to profile.json, shared by every local profile):
+
+  leaderboard/L3.scores     sorted scores, raw little-endian doubles (snapshot)
+  leaderboard/L3.top.json   the top-K entries with names
+  leaderboard/runs.log      one JSON line per run added since the last snapshot
+
+Adding a run appends one line to runs.log; loading reads the snapshot with a
+single frombytes() and replays the (short) log on top. Once the log grows
+past COMPACT_AFTER lines the snapshots are rewritten and the log emptied.
+Nothing is ever rebuilt from the full run history.
+
+Several games (kiosk, server, a --leaderboard import) may share the folder,
+so appends and compactions hold leaderboard/lock. A compaction starts again
+from what is on disk — snapshots plus the whole log, including runs other
+processes appended — never from its own in-memory boards, and it keeps log
+lines for levels this build doesn't know (a level pack that isn't loaded).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import storage
+from .levels import LEVELS
+
+TOP_K = 20
+COMPACT_AFTER = 5000
+LOCK_STALE_S = 30.0         # a lock file older than this was left by a crashed process
+
+
+def default_root() -> Path:
+    return storage.DEFAULT_PATH.parent / "leaderboard"
+
+
+class LevelBoard:
+    __slots__ = ("scores", "top")
+
+    def __init__(self, scores: Optional[array] = None, top: Optional[list] = None) -> None:
+        self.scores = scores if scores is not None else array("d")    # ascending
+        self.top: List[dict] = top or []                                # best first
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, wpm: float, entry: Optional[dict] = None) -> None:
+        insort(self.scores, wpm)
+        if entry is not None and (len(self.top) < TOP_K or wpm > self.top[-1]["wpm"]):
+            # top is tiny: a linear insert keeps it simple
+            i = 0
+            while i < len(self.top) and self.top[i]["wpm"] >= wpm:
+                i += 1
+            self.top.insert(i, entry)
+            del self.top[TOP_K:]
+
+    def rank(self, wpm: float) -> int:
+        """1 = best. Ties share the better rank."""
+        return len(self.scores) - bisect_right(self.scores, wpm) + 1
+
+    def percentile(self, wpm: float) -> float:
+        """Share of runs strictly slower than *wpm*, 0..100."""
+        n = len(self.scores)
+        return bisect_left(self.scores, wpm) / n * 100.0 if n else 100.0
+
+    def top_k(self, k: int = 10) -> List[dict]:
+        return self.top[:k]
+
+
+def _le(a: array) -> array:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+@contextlib.contextmanager
+def _locked(root: Path) -> Iterator[None]:
+    """Hold root/lock (O_EXCL create works on Windows and Linux alike)."""
+    path = root / "lock"
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > LOCK_STALE_S:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue            # released between the two calls
+            time.sleep(0.01)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class Leaderboards:
+    """All levels' boards under one folder. Boards load lazily, once per process."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = root or default_root()
+        self._boards: Dict[int, LevelBoard] = {}
+        self._log_lines: Optional[List[dict]] = None
+
+    @property
+    def log_path(self) -> Path:
+        return self.root / "runs.log"
+
+    def _read_log(self) -> Tuple[List[dict], List[str]]:
+        """(runs for known levels, raw lines for levels we don't have) as on disk now."""
+        runs: List[dict] = []
+        other: List[str] = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue        # half-written last line after a crash
+                    if not isinstance(rec, dict) or not isinstance(rec.get("wpm"), (int, float)):
+                        continue
+                    if rec.get("level") in LEVELS:
+                        runs.append(rec)
+                    else:
+                        other.append(line if line.endswith("\n") else line + "\n")
+        except OSError:
+            pass
+        return runs, other
+
+    def _log(self) -> List[dict]:
+        if self._log_lines is None:
+            self._log_lines = self._read_log()[0]
+        return self._log_lines
+
+    def board(self, level: int) -> LevelBoard:
+        b = self._boards.get(level)
+        if b is not None:
+            return b
+        scores = array("d")
+        try:
+            scores.frombytes((self.root / f"L{level}.scores").read_bytes())
+            scores = _le(scores)
+        except (OSError, ValueError):
+            scores = array("d")
+        try:
+            top = json.loads((self.root / f"L{level}.top.json").read_text(encoding="utf-8"))
+            top = top if isinstance(top, list) else []
+        except (OSError, ValueError):
+            top = []
+        b = LevelBoard(scores, top)
+        for rec in self._log():
+            if rec.get("level") == level:
+                b.add(float(rec["wpm"]), rec)
+        self._boards[level] = b
+        return b
+
+    def record(self, level: int, wpm: float, accuracy: float, name: str) -> Tuple[int, int, float]:
+        """Add a run; returns (rank, total runs, percentile beaten)."""
+        entry = {"level": level, "wpm": round(wpm, 2), "accuracy": round(accuracy, 4),
+                 "name": name, "ts": round(time.time())}
+        self.add_many([entry])
+        b = self.board(level)
+        return b.rank(entry["wpm"]), len(b), b.percentile(entry["wpm"])
+
+    def add_many(self, entries: Iterable[dict]) -> int:
+        """Append runs to the log and the in-memory boards. Returns how many were added."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        log = self._log()
+        n = 0
+        with _locked(self.root), open(self.log_path, "a", encoding="utf-8") as f:
+            for e in entries:
+                level = e.get("level")
+                if level not in LEVELS or not isinstance(e.get("wpm"), (int, float)):
+                    continue
+                self.board(level)               # load the snapshot before the new run lands
+                f.write(json.dumps(e, separators=(",", ":")) + "\n")
+                log.append(e)
+                self._boards[level].add(float(e["wpm"]), e)
+                n += 1
+        if len(log) >= COMPACT_AFTER:
+            self.compact()
+        return n
+
+    def bulk_add(self, entries: Iterable[dict]) -> int:
+        """
+        Import many runs at once: scores go into one flat array per level and
+        are sorted once (no insort per run); only the TOP_K best entries per
+        level are kept as dicts. Then fresh snapshots are written (no log).
+        """
+        new: Dict[int, array] = {}
+        best: Dict[int, list] = {}      # level -> min-heap of (wpm, seq, entry), TOP_K long
+        seq = 0
+        for e in entries:
+            level = e.get("level")
+            wpm = e.get("wpm")
+            if level not in LEVELS or not isinstance(wpm, (int, float)):
+                continue
+            new.setdefault(level, array("d")).append(wpm)
+            heap = best.setdefault(level, [])
+            seq += 1
+            if len(heap) < TOP_K:
+                heapq.heappush(heap, (wpm, seq, e))
+            elif wpm > heap[0][0]:
+                heapq.heapreplace(heap, (wpm, seq, e))
+        self._rewrite(new, {level: [h[2] for h in heap] for level, heap in best.items()})
+        return seq
+
+    def compact(self) -> None:
+        """Write every level's snapshot, then empty the log."""
+        self._rewrite({}, {})
+
+    def _rewrite(self, new: Dict[int, array], new_top: Dict[int, List[dict]]) -> None:
+        """Snapshots = disk snapshots + the whole disk log (+ *new* runs); keeps unknown-level lines."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _locked(self.root):
+            # forget this process's view: other games may have appended since we loaded
+            self._boards = {}
+            self._log_lines, other = self._read_log()
+            for level in LEVELS:
+                b = self.board(level)
+                if level in new:
+                    scores = new[level]
+                    scores.extend(b.scores)
+                    b.scores = array("d", sorted(scores))
+                    b.top = sorted(b.top + new_top[level], key=lambda e: e["wpm"], reverse=True)[:TOP_K]
+                _atomic_write(self.root / f"L{level}.scores", _le(b.scores).tobytes())
+                _atomic_write(self.root / f"L{level}.top.json",
+                              json.dumps(b.top, separators=(",", ":")).encode("utf-8"))
+            _atomic_write(self.log_path, "".join(other).encode("utf-8"))
+            self._log_lines = []
+
+
+_SHARED: Dict[Path, Leaderboards] = {}
+
+
+def shared(root: Optional[Path] = None) -> Leaderboards:
+    """One Leaderboards per folder per process, so repeated runs reuse loaded boards."""
+    root = root or default_root()
+    lb = _SHARED.get(root)
+    if lb is None:
+        lb = _SHARED[root] = Leaderboards(root)
+    return lb
+
+
+def player_name(store: dict) -> str:
+    return str(store.get("settings", {}).get("name") or "player")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--leaderboard` entry point: show boards, or import run history files."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --leaderboard", description="Local per-level leaderboards.")
+    ap.add_argument("level", nargs="?", type=int, default=None, help="only this level")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--import", dest="imports", nargs="+", type=Path, metavar="RUNS_JSONL",
+                    help="add every run from these history files (name = file's folder)")
+    ap.add_argument("--compact", action="store_true", help="write snapshots now and empty the log")
+    args = ap.parse_args(argv)
+
+    lb = Leaderboards()
+    if args.imports:
+        total = 0
+        for path in args.imports:
+            name = path.parent.name or "player"
+            batch = ({"level": r.get("level"), "wpm": r.get("wpm"), "accuracy": r.get("accuracy", 0.0),
+                      "name": name, "ts": r.get("ts", 0)} for r in storage.iter_runs(path))
+            total += lb.bulk_add(batch)
+        print(f"Imported {total:,} runs.")
+    elif args.compact:
+        lb.compact()
+
+    levels = [args.level] if args.level else list(LEVELS)
+    for level in levels:
+        if level not in LEVELS:
+            print(f"Error: no level {level}")
+            return 2
+        b = lb.board(level)
+        print(f"\n== L{level} {LEVELS[level].name} — {len(b):,} runs ==")
+        for i, e in enumerate(b.top_k(args.top), 1):
+            print(f"{i:>3}. {e['wpm']:>7.1f} WPM  {e.get('accuracy', 0)*100:>5.1f}%  {e.get('name', '?')}")
+    return 0
@@ -1,8 +1,11 @@
 """
 Level configuration and helpers.
 Each level sets targets and word rules.
+The five built-in levels below can be extended or replaced by level packs
+(JSON/TOML files, see packs.py) without touching this file.
 """
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 @dataclass(frozen=True)
 class LevelConfig:
@@ -13,6 +16,8 @@ class LevelConfig:
     time_budget_s: int
     allow_symbols: bool = False
     max_word_len: int = 6
+    words: Tuple[str, ...] = ()   # pack levels bring their own pool; () = built-in pools in words.py
+    difficulty: Tuple[float, float] = (0.0, 100.0)  # only words scoring in this band (difficulty.py)
 
 LEVELS = {
     1: LevelConfig(1, "Ping",        0.80, 12, 45, False, 4),
@@ -25,3 +30,14 @@ LEVELS = {
 
 def get_level(n: int) -> LevelConfig:
     return LEVELS[n]
+
+
+def next_level_id(n: int) -> Optional[int]:
+    """The level after *n* in id order (packs may leave gaps: 5 -> 10). None after the last one."""
+    later = [i for i in LEVELS if i > n]
+    return min(later) if later else None
+
+
+# level packs add/replace entries in LEVELS (in place, from the compiled cache)
+from .packs import apply_packs  # noqa: E402  (packs needs LevelConfig from above)
+apply_packs(LEVELS)
@@ -5,17 +5,22 @@ Keep UI text here so logic stays clean.
 from .state import GameState, Screen
 
 def title_menu(state: GameState) -> None:
-    print("\n=== Timed Typer — Network Ops ===")
-    print("[1] Start")
-    print("[2] Level Select")
-    print("[3] Practice Mode")
-    print("[4] Focus Practice (by Level)")
-    print("[5] Self-Test (auto)")
-    print("[6] Demo (auto)")
-    print("[7] Export Report")
-    print("[A] About")              # <-- show About
-    print("[Q] Quit")
-    choice = input("> ").strip().lower()
+    io = state.io
+    io.print("\n=== Timed Typer — Network Ops ===")
+    if state.profiles is not None:
+        io.print(f"Learner: {state.profile_name}")
+    io.print("[1] Start")
+    io.print("[2] Level Select")
+    io.print("[3] Practice Mode")
+    io.print("[4] Focus Practice (by Level)")
+    io.print("[5] Self-Test (auto)")
+    io.print("[6] Demo (auto)")
+    io.print("[7] Export Report")
+    io.print("[A] About")              # <-- show About
+    if state.profiles is not None:
+        io.print("[P] Switch learner")     # kiosk mode only
+    io.print("[Q] Quit")
+    choice = io.input("> ").strip().lower()
 
     if choice == "1":
         state.set_screen(Screen.PLAY)
@@ -33,6 +38,8 @@ def title_menu(state: GameState) -> None:
         state.set_screen(Screen.REPORT)
     elif choice == "a":
         state.set_screen(Screen.ABOUT)  # <-- route About
+    elif choice == "p" and state.profiles is not None:
+        state.set_screen(Screen.PROFILES)
     elif choice == "q":
         state.set_screen(Screen.QUIT)
 
@@ -40,41 +47,39 @@ def title_menu(state: GameState) -> None:
 
 
 
-from .storage import is_unlocked, set_unlocked
-
 from .levels import LEVELS
 from .state import Screen
-from .storage import is_unlocked
-from .storage import get_store
 
 def level_select(state):
-    store = get_store()
+    io = state.io
+    store = state.store   # the profile in memory (re-reading disk would miss kiosk write-back)
     pbs = store.get("pbs", {})
 
-    print("\n-- Select Level (1-5) --")
-    for lid in range(1, 6):
-        cfg = LEVELS[lid]
-        unlocked = is_unlocked(lid)
+    io.print("\n-- Select Level --")
+    for lid, cfg in LEVELS.items():
+        unlocked = state.level_is_unlocked(lid)
         pb = pbs.get(str(lid))
         pb_str = f"  PB: {pb['wpm']:.1f} WPM, {int(pb['accuracy']*100)}%" if pb else ""
+        if pb and str(lid) in store.get("ghosts", {}):
+            pb_str += "  👻"   # a ghost run is saved for this level
         lock_str = "" if unlocked else " (locked)"
-        print(f"[{lid}] {cfg.name}{lock_str}{pb_str}")
+        io.print(f"[{lid}] {cfg.name}{lock_str}{pb_str}")
 
-    print("> ", end="")
-    raw = input().strip().lower()
+    io.print("> ", end="")
+    raw = io.input().strip().lower()
     if raw in ("q", "quit", "back"):
         state.set_screen(Screen.MENU)
         return
     if not raw.isdigit():
-        print("Invalid choice.")
+        io.print("Invalid choice.")
         return
 
     lid = int(raw)
     if lid not in LEVELS:
-        print("Invalid level.")
+        io.print("Invalid level.")
         return
-    if not is_unlocked(lid):
-        print("Level locked.")
+    if not state.level_is_unlocked(lid):
+        io.print("Level locked.")
         return
 
     state.current_level = lid
@@ -0,0 +1,323 @@
+"""
+metrics.py — tiny in-process metrics (counters, gauges, histograms) with
+Prometheus text exposition, for scraping a lab full of machines.
+
+  from .metrics import RUNS_STARTED
+  RUNS_STARTED.labels("3").inc()
+
+Children are cached per label tuple, so the hot loop binds one up front
+(`words = WORDS_TYPED.labels("3")`) and each counter/gauge update is a
+plain attribute add — no lock, no dict lookup. That is safe because only
+the game thread touches counters and gauges; the exporter thread only
+reads, and a scrape that lands halfway through an update is at most one
+increment behind.
+
+Histograms are different: SAVE_SECONDS is observed by storage.save_store,
+which --serve runs on several executor threads at once. observe() takes a
+small lock so those bucket counts and sums can't lose updates (an observe
+happens once per word or save, never per keystroke).
+
+Exposing them (both are global flags, any mode):
+
+  python run_timed_typer.py --metrics-port 9108            # http://127.0.0.1:9108/metrics
+  python run_timed_typer.py --metrics-file /srv/tt.prom    # rewritten every 15 s + at exit
+
+The file form is meant for node_exporter's textfile collector.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+FILE_INTERVAL_S = 15.0
+
+# seconds; covers a HUD redraw (sub-ms) up to a slow save on a network drive
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _esc(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self.value -= n
+
+    def set(self, v: float) -> None:
+        self.value = v
+
+
+class _HistValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)      # last slot = +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()               # save_store observes from server threads
+
+    def observe(self, v: float) -> None:
+        i = bisect_left(self.bounds, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new()
+
+    def _new(self):
+        return _Value()
+
+    def labels(self, *values: object):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            child = self._children.setdefault(key, self._new())
+        return child
+
+    # unlabelled metrics can be used directly
+    def inc(self, n: float = 1.0) -> None:
+        self._children[()].inc(n)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(child.value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, v: float) -> None:
+        self._children[()].set(v)
+
+    def dec(self, n: float = 1.0) -> None:
+        self._children[()].dec(n)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS) -> None:
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new(self):
+        return _HistValue(self.bounds)
+
+    def observe(self, v: float) -> None:
+        self._children[()].observe(v)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            with child._lock:                       # counts and sum from the same moment
+                counts = list(child.counts)
+                total = child.sum
+            # then make cumulative
+            acc = 0
+            for bound, c in zip(self.bounds + (float("inf"),), counts):
+                acc += c
+                le = 'le="' + _fmt(bound) + '"'
+                yield f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {acc}"
+            yield f"{self.name}_sum{_labels_text(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels_text(self.labelnames, key)} {acc}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        old = self._metrics.get(metric.name)
+        if old is not None:
+            return old          # re-import / reload: keep the live one
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines: List[str] = []
+        for m in list(self._metrics.values()):
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+# ---- the game's metrics ----
+
+RUNS_STARTED = counter("timed_typer_runs_started_total", "Level runs started", ("level",))
+RUNS_FINISHED = counter("timed_typer_runs_finished_total", "Level runs ended, by result",
+                        ("level", "result"))
+WORDS_TYPED = counter("timed_typer_words_typed_total", "Words submitted (right or wrong)", ("level",))
+TYPOS = counter("timed_typer_typos_total", "Missed or skipped words", ("level",))
+SAVE_SECONDS = histogram("timed_typer_save_seconds", "Time to write profile.json")
+RENDER_SECONDS = histogram("timed_typer_render_seconds", "Time to draw the HUD")
+FEEDBACK_SECONDS = histogram("timed_typer_feedback_seconds",
+                             "Enter pressed -> next HUD drawn (game-side latency per input)")
+ACTIVE_RUNS = gauge("timed_typer_active_runs", "Level runs in progress")
+
+
+# ---- exposition ----
+
+def write_file(path: Path, registry: Registry = REGISTRY) -> None:
+    """Atomic rewrite, so a collector never reads half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(registry.render())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def serve_http(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY):
+    """Serve /metrics from a daemon thread. Returns the server (call .shutdown())."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass        # keep the game screen clean
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="tt-metrics", daemon=True).start()
+    return httpd
+
+
+class _FileLoop:
+    def __init__(self, path: Path, interval: float) -> None:
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tt-metrics-file", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_file(self.path)
+            except OSError:
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        write_file(self.path)       # final numbers at exit
+
+
+def _pop_flag(argv: List[str], flag: str) -> Optional[str]:
+    """Remove `flag VALUE` or `flag=VALUE` from argv (in place); return VALUE."""
+    for i, a in enumerate(argv[1:], 1):
+        if a == flag and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            return value
+        if a.startswith(flag + "="):
+            del argv[i]
+            return a.partition("=")[2]
+    return None
+
+
+@contextlib.contextmanager
+def exporter_from_argv(argv: List[str]) -> Iterator[None]:
+    """
+    Pull `--metrics-port N` / `--metrics-file PATH` out of *argv* and keep
+    the matching exporter running for the block. Neither flag: does nothing.
+    """
+    port = _pop_flag(argv, "--metrics-port")
+    path = _pop_flag(argv, "--metrics-file")
+    httpd = loop = None
+    try:
+        if port is not None:
+            try:
+                httpd = serve_http(int(port))
+            except (ValueError, OSError) as e:
+                print(f"(metrics endpoint not started: {e})")
+        if path is not None:
+            loop = _FileLoop(Path(path), FILE_INTERVAL_S)
+        yield
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+        if loop is not None:
+            try:
+                loop.stop()
+            except OSError:
+                pass
@@ -0,0 +1,264 @@
+"""
+mining.py — build level vocabularies from what engineers really type.
+
+  python run_timed_typer.py --mine-words fw.conf syslog.gz ~/.bash_history \\
+         [--top 40] [--workers 4] [--out packs/mined.json] [--first-id 6]
+
+Files are streamed line by line (.gz too) and cut into tokens the way
+words.py spells them: plain words (`route`, `resolve`, `GET`) and symbol
+tokens (`port=443`, `allow[udp]`, `/api`). Each token falls into a class
+
+  short (2-4 letters) / medium (5-7) / long (8-12)   x   plain / symbol
+
+and every class has its own HeavyHitters sketch (Misra-Gries, see
+sketches.py), so memory is fixed by --capacity, not by the size of the logs.
+Each block of lines is decoded and tokenized in one go, counted exactly,
+and folded into the sketches once, so the per-token work stays in C.
+
+Big plain files are split into byte ranges; every range is one task on a
+process pool, so a single 5 GB syslog still uses every worker. Workers send
+back only their sketches, which merge in the parent.
+
+The result is a level pack (packs.py) with three levels — short, medium and
+long words — that shows up in the game the next time the menu opens.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .packs import PackError, compile_pack, packs_dir
+from .sketches import HeavyHitters
+
+RANGE_BYTES = 64 << 20          # split plain files into 64 MB tasks
+BLOCK_LINES = 20_000            # exact counting per block, then one sketch update
+DEFAULT_CAPACITY = 2000
+DEFAULT_TOP = 40
+MIN_COUNT = 5                   # rarer than this = one-off ids, typos, hostnames
+
+LENGTHS = (("short", 2, 4), ("medium", 5, 7), ("long", 8, 12))
+CLASSES = [(size, kind) for size, _, _ in LENGTHS for kind in ("plain", "symbol")]
+
+# a word, optionally glued to more word parts by the symbols words.py uses
+_TOKEN = re.compile(r"/?[A-Za-z][A-Za-z0-9]*(?:[=/\[\]._:-]+[A-Za-z0-9]+)*\]?")
+_PLAIN = re.compile(r"[a-z]+|[A-Z]+")      # all lower or all caps (GET, POST)
+_HEX = re.compile(r"[0-9a-f]+")
+
+# level settings per length class, in the spirit of the built-in ramp
+_LEVEL_SHAPE = {
+    "short":  dict(min_accuracy=0.82, target_wpm=18, time_budget_s=45, max_word_len=4),
+    "medium": dict(min_accuracy=0.86, target_wpm=26, time_budget_s=60, max_word_len=7),
+    "long":   dict(min_accuracy=0.90, target_wpm=34, time_budget_s=75, max_word_len=12),
+}
+
+
+def classify(tok: str) -> Optional[Tuple[str, str]]:
+    """(length class, plain|symbol) for a token, None if it should be ignored."""
+    n = len(tok)
+    size = None
+    for name, lo, hi in LENGTHS:
+        if lo <= n <= hi:
+            size = name
+            break
+    if size is None:
+        return None
+    digits = sum(ch.isdigit() for ch in tok)
+    if digits * 2 > n:
+        return None                     # 10.0.0.1 / timestamps: not words
+    if n >= 8 and _HEX.fullmatch(tok):
+        return None                     # ids and hashes that happen to have no digits
+    if _PLAIN.fullmatch(tok):
+        return size, "plain"
+    if tok.isalnum():
+        return None                     # MixedCase / ids like eth0x7f: noise
+    return size, "symbol"
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text)
+
+
+def _tidy(tok: str) -> str:
+    """`deny]` from `[tcp deny]` -> `deny`; balanced `allow[udp]` stays."""
+    if tok.endswith("]") and tok.count("]") > tok.count("["):
+        tok = tok.rstrip("]")
+    return tok
+
+
+class MineStats:
+    """One worker's (or the whole job's) sketches plus plain totals."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.sketches: Dict[Tuple[str, str], HeavyHitters] = {c: HeavyHitters(capacity) for c in CLASSES}
+        self.lines = 0
+        self.tokens = 0
+        self.bytes = 0
+
+    def merge(self, other: "MineStats") -> None:
+        for c, hh in other.sketches.items():
+            self.sketches[c].merge(hh)
+        self.lines += other.lines
+        self.tokens += other.tokens
+        self.bytes += other.bytes
+
+
+def _flush(stats: MineStats, block: Counter) -> None:
+    per_class: Dict[Tuple[str, str], Dict[str, int]] = {c: {} for c in CLASSES}
+    for tok, k in block.items():
+        tok = _tidy(tok)
+        c = classify(tok)
+        if c is not None:
+            d = per_class[c]
+            d[tok] = d.get(tok, 0) + k
+    for c, counts in per_class.items():
+        if counts:
+            stats.sketches[c].add_counts(counts)
+    block.clear()
+
+
+def _lines(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Lines whose first byte lies in [start, end); end < 0 = whole (maybe gzipped) file."""
+    if end < 0:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            yield from f
+        return
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()                # finish the line the previous range owns
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def mine_range(task: Tuple[str, int, int, int]) -> MineStats:
+    """Worker: count one file (or byte range of one) into fresh sketches."""
+    path, start, end, capacity = task
+    stats = MineStats(capacity)
+    block: Counter = Counter()
+    buf: List[bytes] = []
+    for raw in _lines(path, start, end):
+        buf.append(raw)
+        if len(buf) == BLOCK_LINES:
+            _count_block(stats, block, buf)
+    _count_block(stats, block, buf)
+    return stats
+
+
+def _count_block(stats: MineStats, block: Counter, buf: List[bytes]) -> None:
+    # one decode + one findall per block instead of per line
+    data = b"".join(buf)
+    toks = tokens(data.decode("utf-8", "replace"))
+    block.update(toks)
+    stats.bytes += len(data)
+    stats.lines += len(buf)
+    stats.tokens += len(toks)
+    buf.clear()
+    _flush(stats, block)
+
+
+def plan_tasks(paths: List[Path], capacity: int) -> List[Tuple[str, int, int, int]]:
+    tasks = []
+    for p in paths:
+        size = p.stat().st_size
+        if p.suffix == ".gz" or size <= RANGE_BYTES:
+            tasks.append((str(p), 0, -1, capacity))
+            continue
+        for start in range(0, size, RANGE_BYTES):
+            tasks.append((str(p), start, min(size, start + RANGE_BYTES), capacity))
+    # biggest first, so the pool does not end waiting on one late giant
+    tasks.sort(key=lambda t: -(t[2] - t[1] if t[2] >= 0 else os.path.getsize(t[0])))
+    return tasks
+
+
+def mine(paths: List[Path], capacity: int = DEFAULT_CAPACITY, workers: Optional[int] = None) -> MineStats:
+    tasks = plan_tasks(paths, capacity)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    total = MineStats(capacity)
+    if workers == 1:
+        for t in tasks:
+            total.merge(mine_range(t))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(mine_range, tasks):
+            total.merge(part)
+    return total
+
+
+def _frequent(hh: HeavyHitters, k: int, min_count: int) -> List[str]:
+    # a count at or below the sketch's error bound could be pure leftovers
+    floor = max(min_count, hh.error + 1)
+    return [w for w, c in hh.top(k) if c >= floor]
+
+
+def build_pack(stats: MineStats, top: int = DEFAULT_TOP, first_id: int = 6, name: str = "Mined",
+               min_count: int = MIN_COUNT) -> dict:
+    """Three levels (short / medium / long); symbol tokens only from medium up."""
+    levels = []
+    for size, _, _ in LENGTHS:
+        words = _frequent(stats.sketches[(size, "plain")], top, min_count)
+        sym = [] if size == "short" else _frequent(stats.sketches[(size, "symbol")], top // 4, min_count)
+        if len(words) + len(sym) < 2:
+            continue
+        # ids stay consecutive when a class is skipped, so every mined level can be unlocked
+        levels.append({"id": first_id + len(levels), "name": f"{name} {size}", "allow_symbols": bool(sym),
+                       **_LEVEL_SHAPE[size], "words": words + sym})
+    return {"name": name, "levels": levels}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--mine-words` entry point."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --mine-words",
+                                 description="Mine a level pack from configs, logs and shell histories.")
+    ap.add_argument("files", nargs="+", type=Path)
+    ap.add_argument("--top", type=int, default=DEFAULT_TOP, help="plain words per level (default 40)")
+    ap.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                    help="counters per token class; fixes memory use (default 2000)")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    ap.add_argument("--out", type=Path, default=None, help="pack file (default: packs/mined.json)")
+    ap.add_argument("--first-id", type=int, default=6, help="id of the first mined level (default 6)")
+    ap.add_argument("--min-count", type=int, default=MIN_COUNT, help="ignore tokens seen fewer times (default 5)")
+    ap.add_argument("--name", default="Mined")
+    args = ap.parse_args(argv)
+
+    missing = [str(p) for p in args.files if not p.is_file()]
+    if missing:
+        print("Error: not a file: " + ", ".join(missing))
+        return 2
+    t0 = time.perf_counter()
+    stats = mine(args.files, max(args.top, args.capacity), args.workers)
+    dt = time.perf_counter() - t0
+    pack = build_pack(stats, args.top, args.first_id, args.name, args.min_count)
+    if not pack["levels"]:
+        print("No usable words found.")
+        return 1
+
+    out = args.out or packs_dir() / "mined.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(pack, indent=1), encoding="utf-8")
+    try:
+        compile_pack(out)               # validate + warm the cache for the next launch
+    except PackError as e:
+        print(f"Error: mined pack is not valid: {e}")
+        return 1
+
+    mb = stats.bytes / 1e6
+    print(f"Mined {stats.lines:,} lines / {stats.tokens:,} tokens ({mb:,.1f} MB) in {dt:.2f}s "
+          f"({mb / max(dt, 1e-9):,.1f} MB/s)")
+    for lvl in pack["levels"]:
+        print(f"  L{lvl['id']} {lvl['name']:<14} {', '.join(lvl['words'][:8])}, …")
+    print(f"Pack written to: {out}")
+    return 0
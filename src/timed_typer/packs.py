@@ -0,0 +1,299 @@
+"""
+packs.py — level packs: extra (or replacement) levels from JSON / TOML files.
+
+Drop a pack into <profile dir>/packs/ (or list files/folders in
+TIMED_TYPER_PACKS, separated like PATH) and its levels appear in LEVELS
+next to the built-in five — no code change, no EXE rebuild.
+
+  {
+    "name": "Cloud Ops",
+    "levels": [
+      {"id": 6, "name": "Kubernetes", "min_accuracy": 0.9, "target_wpm": 42,
+       "time_budget_s": 75, "allow_symbols": true, "max_word_len": 12,
+       "words": ["pod", "node", "kubectl", "helm", "ingress", "replicas=3"],
+       "difficulty": [20, 70]}                # optional: only words scoring 20..70
+    ]
+  }
+
+TOML packs use the same keys ([[levels]] tables); they need Python 3.11+
+(tomllib) or the `tomli` package, otherwise they are skipped with a note.
+A pack level with an existing id replaces that level.
+
+Each pack is validated once and compiled into a small marshal file in
+packs/.cache/. The cache header keeps the source's size, mtime and SHA-1:
+  size + mtime match  -> load the marshal blob, never parse/validate again
+  only mtime changed  -> hash the file; same hash -> reuse, refresh the header
+  anything else       -> parse, validate, recompile
+so launching with a 50-level pack is a stat and a marshal.loads().
+
+Between runs (every time the title menu shows) reload_if_changed() stats
+the pack files and re-applies them if anything moved, so edits show up
+without restarting.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from . import storage
+
+if TYPE_CHECKING:
+    from .levels import LevelConfig
+# levels.py imports this module at its bottom, so LevelConfig is imported
+# where it is used — that way either module can be imported first.
+
+try:
+    import tomllib as _toml         # Python 3.11+
+except ImportError:                 # pragma: no cover - depends on Python version
+    try:
+        import tomli as _toml       # type: ignore[no-redef]
+    except ImportError:
+        _toml = None
+
+ENV_VAR = "TIMED_TYPER_PACKS"
+SUFFIXES = (".json", ".toml")
+CACHE_FORMAT = 4                # bumped when validation rules change, so old caches recompile
+MAX_WORD_LEN = 64
+MAX_LEVEL_WORDS = 2000          # distinct words per level
+MAX_PACK_WORDS = 8000           # distinct words per pack: every one takes a slot in vocab.py's table
+
+
+class PackError(ValueError):
+    """A pack file that can't be used (bad syntax, wrong types, out of range)."""
+
+
+def packs_dir() -> Path:
+    return storage.DEFAULT_PATH.parent / "packs"
+
+
+def _cache_dir() -> Path:
+    return packs_dir() / ".cache"
+
+
+def pack_sources() -> List[Path]:
+    """Pack files in load order: the profile's packs/ folder, then TIMED_TYPER_PACKS."""
+    roots = [packs_dir()]
+    roots += [Path(p) for p in os.environ.get(ENV_VAR, "").split(os.pathsep) if p]
+    out: List[Path] = []
+    for root in roots:
+        if root.is_file():
+            out.append(root)
+        elif root.is_dir():
+            out += sorted(p for p in root.iterdir() if p.suffix.lower() in SUFFIXES and p.is_file())
+    return list(dict.fromkeys(out))
+
+
+# ---------- validation ----------
+
+def _need(cond: bool, where: str, msg: str) -> None:
+    if not cond:
+        raise PackError(f"{where}: {msg}")
+
+
+def _is_num(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _level_tuple(d: Any, where: str) -> tuple:
+    """One level dict -> the compact tuple stored in the cache (LevelConfig field order)."""
+    _need(isinstance(d, dict), where, "must be a table/object")
+    lid = d.get("id")
+    _need(isinstance(lid, int) and not isinstance(lid, bool) and 1 <= lid <= 9999, where, "id must be an integer 1..9999")
+    name = d.get("name")
+    _need(isinstance(name, str) and 0 < len(name.strip()) <= 40, where, "name must be a short non-empty string")
+    acc = d.get("min_accuracy")
+    _need(_is_num(acc) and 0.0 <= acc <= 1.0, where, "min_accuracy must be 0..1")
+    wpm = d.get("target_wpm")
+    _need(_is_num(wpm) and 1 <= wpm <= 300, where, "target_wpm must be 1..300")
+    secs = d.get("time_budget_s")
+    _need(_is_num(secs) and 5 <= secs <= 3600, where, "time_budget_s must be 5..3600")
+    sym = d.get("allow_symbols", False)
+    _need(isinstance(sym, bool), where, "allow_symbols must be true/false")
+    mwl = d.get("max_word_len", 6)
+    _need(isinstance(mwl, int) and 1 <= mwl <= MAX_WORD_LEN, where, f"max_word_len must be 1..{MAX_WORD_LEN}")
+    words = d.get("words")
+    _need(isinstance(words, list) and len(words) >= 2, where, "words must be a list of at least 2 words")
+    for i, w in enumerate(words):
+        _need(isinstance(w, str) and 0 < len(w) <= MAX_WORD_LEN and w.isprintable() and not w.isspace()
+              and w == w.strip() and " " not in w, f"{where}.words[{i}]", "must be one printable word")
+    _need(len(set(words)) <= MAX_LEVEL_WORDS, where, f"at most {MAX_LEVEL_WORDS} different words per level")
+    band = d.get("difficulty", [0, 100])
+    _need(isinstance(band, list) and len(band) == 2 and all(_is_num(x) for x in band)
+          and 0 <= band[0] <= band[1] <= 100, where, "difficulty must be [low, high] within 0..100")
+    return (lid, name.strip(), float(acc), round(wpm), round(secs), sym, mwl, tuple(dict.fromkeys(words)),
+            (float(band[0]), float(band[1])))
+
+
+def _parse(path: Path, raw: bytes) -> Tuple[str, tuple]:
+    """Source bytes -> (pack name, tuple of level tuples). Raises PackError."""
+    try:
+        if path.suffix.lower() == ".toml":
+            if _toml is None:
+                raise PackError(f"{path.name}: TOML packs need Python 3.11+ or the 'tomli' package")
+            data = _toml.loads(raw.decode("utf-8"))
+        else:
+            data = json.loads(raw.decode("utf-8"))
+    except PackError:
+        raise
+    except (ValueError, UnicodeDecodeError) as e:        # JSONDecodeError / TOMLDecodeError are ValueErrors
+        raise PackError(f"{path.name}: {e}") from None
+    _need(isinstance(data, dict), path.name, "top level must be an object with a 'levels' list")
+    levels = data.get("levels")
+    _need(isinstance(levels, list) and levels, path.name, "needs a non-empty 'levels' list")
+    rows = tuple(_level_tuple(d, f"{path.name}: levels[{i}]") for i, d in enumerate(levels))
+    ids = [r[0] for r in rows]
+    _need(len(set(ids)) == len(ids), path.name, "level ids must be unique")
+    _need(len({w for r in rows for w in r[7]}) <= MAX_PACK_WORDS, path.name,
+          f"at most {MAX_PACK_WORDS} different words per pack")
+    return str(data.get("name") or path.stem), rows
+
+
+# ---------- compiled cache ----------
+
+def _cache_path(src: Path, cache_dir: Optional[Path] = None) -> Path:
+    key = hashlib.sha1(str(src.resolve()).encode("utf-8")).hexdigest()[:12]
+    return (cache_dir or _cache_dir()) / f"{src.stem}-{key}.ttpk"
+
+
+def _read_cache(cpath: Path) -> Optional[tuple]:
+    try:
+        blob = marshal.loads(cpath.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not (isinstance(blob, tuple) and len(blob) == 6 and blob[0] == CACHE_FORMAT):
+        return None
+    return blob
+
+
+def _write_cache(cpath: Path, blob: tuple) -> None:
+    try:
+        cpath.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=cpath.name + ".", dir=str(cpath.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps(blob))
+            os.replace(tmp, cpath)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except OSError:
+        pass        # read-only profile dir: we just compile again next launch
+
+
+def compile_pack(src: Path, cache_dir: Optional[Path] = None) -> Tuple[str, List[LevelConfig], str]:
+    """
+    Load one pack via its cache. Returns (pack name, levels, how) where how is
+    "cached", "rehashed" or "compiled". Raises PackError / OSError.
+    """
+    st = src.stat()
+    cpath = _cache_path(src, cache_dir)
+    blob = _read_cache(cpath)
+    how = "cached"
+    if blob is None or blob[1] != st.st_size or blob[2] != st.st_mtime_ns:
+        raw = src.read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+        if blob is not None and blob[3] == digest:
+            how = "rehashed"            # touched / copied, same content
+            blob = (CACHE_FORMAT, st.st_size, st.st_mtime_ns, digest, blob[4], blob[5])
+        else:
+            how = "compiled"
+            name, rows = _parse(src, raw)
+            blob = (CACHE_FORMAT, st.st_size, st.st_mtime_ns, digest, name, rows)
+        _write_cache(cpath, blob)
+    from .levels import LevelConfig
+    levels = [LevelConfig(*row) for row in blob[5]]
+    return blob[4], levels, how
+
+
+# ---------- applying packs to LEVELS ----------
+
+_BUILTIN: Dict[int, LevelConfig] = {}
+_applied_sig: Optional[tuple] = None
+_errors_shown: set = set()
+
+
+def _signature(sources: List[Path]) -> tuple:
+    sig = []
+    for p in sources:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        sig.append((str(p), st.st_size, st.st_mtime_ns))
+    return tuple(sig)
+
+
+def apply_packs(levels: Dict[int, LevelConfig]) -> List[str]:
+    """
+    Rebuild *levels* in place (built-ins + every pack, later packs win).
+    In place, because every module holds a reference to levels.LEVELS.
+    Returns one-line problems for packs that were skipped.
+    """
+    global _applied_sig
+    if not _BUILTIN:
+        _BUILTIN.update(levels)
+    sources = pack_sources()
+    merged = dict(_BUILTIN)
+    problems: List[str] = []
+    for src in sources:
+        try:
+            _name, pack_levels, _how = compile_pack(src)
+        except (PackError, OSError) as e:
+            problems.append(f"{src.name}: {e}" if isinstance(e, OSError) else str(e))
+            continue
+        for cfg in pack_levels:
+            merged[cfg.id] = cfg
+    levels.clear()
+    levels.update(sorted(merged.items()))
+    _applied_sig = _signature(sources)
+    for msg in problems:
+        if msg not in _errors_shown:        # once per process, not every menu visit
+            _errors_shown.add(msg)
+            print(f"(level pack skipped: {msg})", file=sys.stderr)
+    return problems
+
+
+def reload_if_changed(levels: Optional[Dict[int, LevelConfig]] = None) -> bool:
+    """Re-apply packs if any pack file was added, removed or edited. Cheap: stats only."""
+    if levels is None:
+        from .levels import LEVELS as levels
+    if _signature(pack_sources()) == _applied_sig:
+        return False
+    apply_packs(levels)
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--packs` entry point: list pack files, validate them, show their levels."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --packs", description="List and validate level packs.")
+    ap.add_argument("files", nargs="*", type=Path, help="check these pack files instead of the installed ones")
+    args = ap.parse_args(argv)
+
+    sources = args.files or pack_sources()
+    if not sources:
+        print(f"No level packs. Put .json/.toml packs in {packs_dir()} (or set {ENV_VAR}).")
+        return 0
+    bad = 0
+    for src in sources:
+        try:
+            name, levels, how = compile_pack(src)
+        except PackError as e:
+            bad += 1
+            print(f"✗ {e}")
+            continue
+        except OSError as e:
+            bad += 1
+            print(f"✗ {src}: {e}")
+            continue
+        print(f"✓ {src}  — {name}, {len(levels)} level(s) [{how}]")
+        for cfg in levels:
+            print(f"    L{cfg.id:<3} {cfg.name:<16} {cfg.target_wpm:>3} WPM  {cfg.min_accuracy*100:>3.0f}%  "
+                  f"{cfg.time_budget_s:>4}s  {len(cfg.words)} words")
+    return 1 if bad else 0
@@ -7,22 +7,37 @@ from typing import Tuple
 
 from .state import GameState, Screen
 from .levels import get_level
-from .words import words_for_level, check_input
+from .words import check_input
+from .sequence import balanced_ids_for_level
+from .vocab import VOCAB
 from .timing import Stopwatch, wpm
 from .scoring import RunStats, update_accuracy, passed_level
 from .ui_console import render_hud, toast, results_card
+from . import recording
+from .ghost import GhostRecorder, load_ghost, maybe_save_ghost
+from .typo_stats import TypoStats, coaching_tips
+from . import leaderboard
+from . import metrics
+from . import tracing
+from .tracing import Tracer, EVAL, TOAST, STATS, RENDER, TOTAL
 
 HELP_TEXT = "Commands: :skip/s, :q/menu/quit/exit, :help/h"
+HELP_CMDS = frozenset((":help", "help", ":h", "h"))
+QUIT_CMDS = frozenset((":q", ":menu", "q", "menu", "quit", "exit"))
+SKIP_CMDS = frozenset((":skip", ":s", "skip", "s"))
 
 
 def play_level(state: GameState) -> None:
     """Run the currently selected level until time runs out or words are done."""
     cfg = get_level(state.current_level)
+    io = state.io
 
     # 1) Prepare runtime variables
     minutes = cfg.time_budget_s / 60.0
     target_words_count = max(20, math.ceil(cfg.target_wpm * minutes * 1.2))
-    words = words_for_level(cfg, target_words_count)
+    words = balanced_ids_for_level(cfg, target_words_count)   # same load for every run
+    # the sequence is vocabulary ids (vocab.py); a word becomes a str only for the prompt
+    vocab_words, vocab_lens, vocab_id = VOCAB.words, VOCAB.lens, VOCAB.get
 
     stats = RunStats()
     streak = 0
@@ -31,23 +46,53 @@ def play_level(state: GameState) -> None:
     # 2) Start the clock
     clock = Stopwatch()
     clock.start()
+    rec = recording.for_run("play", cfg.id)   # no-op unless TIMED_TYPER_RECORD is set
+    ghost = load_ghost(state.store, cfg.id)    # best run so far (None = no ghost)
+    ghost_rec = GhostRecorder()
+    typos = TypoStats()                        # which characters got confused this run
+
+    # metrics children bound once, so the loop only does attribute adds
+    level_label = str(cfg.id)
+    m_words = metrics.WORDS_TYPED.labels(level_label)
+    m_typos = metrics.TYPOS.labels(level_label)
+    m_render = metrics.RENDER_SECONDS
+    m_feedback = metrics.FEEDBACK_SECONDS
+    metrics.RUNS_STARTED.labels(level_label).inc()
+    metrics.ACTIVE_RUNS.inc()
+
+    trace = Tracer()        # Enter -> next prompt, per stage (see tracing.py)
+    t_enter = 0             # when the last input came back; 0 = nothing to close
 
     i = 0
     while clock.seconds < cfg.time_budget_s and i < len(words):
+        t = tracing.now()
         remaining = max(0, int(cfg.time_budget_s - clock.seconds))
         # live WPM from chars_ok so far
         stats.wpm_live = wpm(stats.chars_ok, max(clock.seconds, 1e-6))
         update_accuracy(stats)
-        render_hud(cfg.name, remaining, stats.wpm_live, stats.accuracy, streak)
-
-        target = words[i]
+        ghost_delta = None
+        if ghost is not None:
+            ghost_delta = stats.chars_ok - ghost.chars_at(int(clock.seconds * 1000))
+        t = trace.end(STATS, t)
+        render_hud(cfg.name, remaining, stats.wpm_live, stats.accuracy, streak, io=io, ghost=ghost_delta)
+        t_done = trace.end(RENDER, t)
+        m_render.observe((t_done - t) / 1e9)
+        if t_enter:
+            trace.add(TOTAL, t_done - t_enter)
+            m_feedback.observe((t_done - t_enter) / 1e9)
+
+        tid = words[i]
+        target = vocab_words[tid]
+        rec.word(target)
 
         try:
-            user = input(f"Type: {target}\n> ")
+            user = io.input(f"Type: {target}\n> ")
         except (KeyboardInterrupt, EOFError):
-            toast("⏹ Interrupted — ending level.")
+            toast("⏹ Interrupted — ending level.", io)
             interrupted = True
+            rec.interrupt()
             break
+        t_enter = t = tracing.now()
 
         # If time expired while typing, break gracefully
         if clock.seconds >= cfg.time_budget_s:
@@ -55,70 +100,120 @@ def play_level(state: GameState) -> None:
 
         raw = user.strip()
         cmd = raw.lower()
+        rec.input(raw)
 
         # --- command handling (both with and without ':') ---
-        if cmd in (":help", "help", ":h", "h"):
-            toast(HELP_TEXT)
+        if cmd in HELP_CMDS:
+            toast(HELP_TEXT, io)
+            trace.end(TOAST, t)
             continue
-        if cmd in (":q", ":menu", "q", "menu", "quit", "exit"):
-            toast("↩ Exiting to menu…")
+        if cmd in QUIT_CMDS:
+            toast("↩ Exiting to menu…", io)
             interrupted = True
             break
-        if cmd in (":skip", ":s", "skip", "s"):
+        if cmd in SKIP_CMDS:
             stats.typos += 1
+            m_typos.inc()
             streak = 0
             i += 1
             continue
         if raw == "":
             # empty input: gentle nudge, no penalty
-            toast(f"(Empty input) {HELP_TEXT}")
+            toast(f"(Empty input) {HELP_TEXT}", io)
+            trace.end(TOAST, t)
             continue
 
         # --- normal evaluation ---
         stats.words_total += 1
-        complete, first_err = _evaluate_attempt(target, raw)
+        m_words.inc()
+        # exact match = same id (one dict probe, no char compare); only a miss needs check_input
+        complete = vocab_id(raw) == tid
+        first_err = -1 if complete else _evaluate_attempt(target, raw)[1]
 
         if complete:
             stats.words_ok += 1
-            stats.chars_ok += len(target)
+            stats.chars_ok += vocab_lens[tid]
+            typos.add_ok()
+            ghost_rec.word_done(int(clock.seconds * 1000), vocab_lens[tid])
             streak += 1
             i += 1
+            trace.end(EVAL, t)
         else:
             stats.typos += 1
+            m_typos.inc()
             streak = 0
+            typos.add_miss(target, raw, first_err)
+            t = trace.end(EVAL, t)
             if first_err >= 0:
-                toast(f"Mismatch at pos {first_err+1}. Try again. ({HELP_TEXT})")
+                toast(f"Mismatch at pos {first_err+1}. Try again. ({HELP_TEXT})", io)
+                trace.end(TOAST, t)
 
     # 3) Stop the clock, compute final metrics
     clock.stop()
+    rec.end()       # END at the clock's stop, not after the results screen
     final_seconds = max(clock.seconds, 1e-6)
     final_wpm = wpm(stats.chars_ok, final_seconds)
     update_accuracy(stats)
 
-    # 4) Show results card
-    results_card(cfg.name, stats, final_wpm)
+    # 4) Show results card (finished runs also go on the local leaderboard)
+    rank = None
+    if not interrupted:
+        try:
+            rank = leaderboard.shared().record(cfg.id, final_wpm, stats.accuracy,
+                                               leaderboard.player_name(state.store))
+        except OSError:
+            rank = None   # leaderboard folder not writable: just skip the rank
+    results_card(cfg.name, stats, final_wpm, io=io, rank=rank)
+
+    # how long the game itself kept the player waiting after each Enter
+    trace_summary = trace.summary()
+    state.stats["trace"] = trace_summary
+    if tracing.over_budget(trace_summary):
+        toast(f"⚠ Feedback p99 {trace_summary['total'][3]:.1f} ms is over the "
+              f"{tracing.LATENCY_BUDGET_MS:.0f} ms budget.", io)
+    if tracing.enabled(state.store) or tracing.over_budget(trace_summary):
+        for line in tracing.summary_lines(trace_summary):
+            toast("  " + line, io)
 
     # figure out if this run "passes" the level rules
     passed = (not interrupted) and passed_level(cfg, stats, final_wpm)
+    metrics.ACTIVE_RUNS.dec()
+    metrics.RUNS_FINISHED.labels(level_label, "interrupted" if interrupted else
+                                 ("passed" if passed else "failed")).inc()
+    saved = rec.finish(stats, final_wpm, final_seconds, passed)
+    if saved:
+        toast(f"🎞 Recording saved: {saved}", io)
+    if ghost is not None:
+        diff = stats.chars_ok - ghost.chars_at(int(final_seconds * 1000))
+        toast(f"👻 Ghost ({ghost.wpm:.1f} WPM): you finished {abs(diff)} chars "
+              f"{'ahead' if diff >= 0 else 'behind'}.", io)
+    # fastest finished run becomes the ghost (saved with the PB below)
+    if not interrupted and maybe_save_ghost(state.store, cfg.id, ghost_rec, final_wpm):
+        toast("👻 New ghost saved — race it next time!", io)
 
     # 5) Tell the player what happened (UI toasts)
     if passed:
-        toast("✅ Level passed! Next level unlocked.")
+        toast("✅ Level passed! Next level unlocked.", io)
     elif interrupted:
-        toast("📝 Run ended early (no unlock).")
+        toast("📝 Run ended early (no unlock).", io)
     else:
         need_wpm = cfg.target_wpm
         need_acc = int(cfg.min_accuracy * 100)
         have_wpm = final_wpm
         have_acc = int(stats.accuracy * 100)
-        toast(f"❌ Not passed. Need ≥{need_wpm} WPM and ≥{need_acc}% acc.")
-        toast(f"   You had {have_wpm:.1f} WPM and {have_acc}% acc.")
+        toast(f"❌ Not passed. Need ≥{need_wpm} WPM and ≥{need_acc}% acc.", io)
+        toast(f"   You had {have_wpm:.1f} WPM and {have_acc}% acc.", io)
         if have_acc < need_acc and have_wpm >= need_wpm - 2:
-            toast("Tip: Slow down slightly; focus on clean first 3 letters.")
+            toast("Tip: Slow down slightly; focus on clean first 3 letters.", io)
         elif have_wpm < need_wpm and stats.accuracy * 100 >= need_acc - 2:
-            toast("Tip: You’re accurate—push speed on short words.")
+            toast("Tip: You’re accurate—push speed on short words.", io)
         else:
-            toast("Tip: Aim for small streaks of 3–5 perfect words.")
+            toast("Tip: Aim for small streaks of 3–5 perfect words.", io)
+        for tip in coaching_tips(typos, TypoStats.from_store(state.store)):
+            toast("Tip: " + tip, io)
+
+    # lifetime typo totals ride along with the PB save below
+    typos.merge_into(state.store)
 
     # 6) >>> PERSIST PROGRESS <<<  ### NEW
     # This is the critical part you were asking about.
@@ -131,12 +226,13 @@ def play_level(state: GameState) -> None:
         wpm=final_wpm,
         acc=stats.accuracy,
         passed=passed,
+        stats=stats,
     )
 
     # 7) Pause here, then go back to MENU explicitly
-    toast("(Press Enter to return to menu)")
+    toast("(Press Enter to return to menu)", io)
     try:
-        input()
+        io.input()
     except (KeyboardInterrupt, EOFError):
         pass
     state.set_screen(Screen.MENU)
@@ -2,15 +2,21 @@
 practice.py — no-timer practice lane to build WPM (elapsed time + no immediate repeats)
 """
 from __future__ import annotations
-import random
 from typing import Optional
 
 from .state import GameState, Screen
 from .timing import Stopwatch, wpm
 from .scoring import RunStats, update_accuracy
 from .ui_console import render_hud_practice, toast, results_card
+from . import recording
+from .srs import scheduler_for, save_into
+from .difficulty import filter_band
 
 HELP_TEXT = "Practice: type words fast. Commands: :skip/s, :q/quit/exit, :help/h"
+# shared with practice_level.py (and recording.py for replays)
+HELP_CMDS = frozenset((":help", "help", ":h", "h"))
+QUIT_CMDS = frozenset((":q", "q", "quit", "exit"))
+SKIP_CMDS = frozenset((":skip", ":s", "skip", "s"))
 
 # Short, speed-friendly words
 PRACTICE_WORDS = [
@@ -18,57 +24,56 @@ PRACTICE_WORDS = [
     "cache","route","trace","dns","api","http","ip","hop","pkt","vpn"
 ]
 
-def next_word(prev: Optional[str]) -> str:
-    """Pick a word different from the previous one (avoid immediate repeats)."""
-    choice = random.choice(PRACTICE_WORDS)
-    if prev is None:
-        return choice
-    # Re-roll until different (the list is small; this is fine)
-    while choice == prev:
-        choice = random.choice(PRACTICE_WORDS)
-    return choice
-
 def practice_mode(state: GameState) -> None:
+    io = state.io
     stats = RunStats()
     streak = 0
     best_streak = 0
 
     clock = Stopwatch()
     clock.start()
+    rec = recording.for_run("practice")
 
-    toast("Practice mode ON — type fast; 'q' to exit. " + HELP_TEXT)
+    toast("Practice mode ON — type fast; 'q' to exit. " + HELP_TEXT, io)
 
+    # spaced repetition instead of a uniform pick (see srs.py)
+    band = state.store.get("settings", {}).get("practice_difficulty")
+    sched = scheduler_for(state.store, filter_band(PRACTICE_WORDS, band))
     prev_word: Optional[str] = None
-    target = next_word(prev_word)
+    target = sched.next_word(prev_word)
 
     while True:
         # Show live HUD with elapsed seconds
         elapsed = int(clock.seconds)
         stats.wpm_live = wpm(stats.chars_ok, max(clock.seconds, 1e-6))
         update_accuracy(stats)
-        render_hud_practice(elapsed, stats.wpm_live, stats.accuracy, streak)
+        render_hud_practice(elapsed, stats.wpm_live, stats.accuracy, streak, io=io)
+        rec.word(target)
 
         try:
-            user = input(f"Type: {target}\n> ")
+            user = io.input(f"Type: {target}\n> ")
         except (KeyboardInterrupt, EOFError):
-            toast("⏹ Leaving practice.")
+            toast("⏹ Leaving practice.", io)
+            rec.interrupt()
             break
 
         raw = user.strip()
         cmd = raw.lower()
+        rec.input(raw)
 
         # commands
-        if cmd in (":help","help",":h","h"):
-            toast(HELP_TEXT); continue
-        if cmd in (":q","q","quit","exit"):
-            toast("↩ Back to menu."); break
-        if cmd in (":skip",":s","skip","s"):
+        if cmd in HELP_CMDS:
+            toast(HELP_TEXT, io); continue
+        if cmd in QUIT_CMDS:
+            toast("↩ Back to menu.", io); break
+        if cmd in SKIP_CMDS:
             streak = 0
+            sched.grade(target, False)
             prev_word = target
-            target = next_word(prev_word)
+            target = sched.next_word(prev_word)
             continue
         if raw == "":
-            toast("(Empty input) " + HELP_TEXT); continue
+            toast("(Empty input) " + HELP_TEXT, io); continue
 
         # evaluate (exact match)
         stats.words_total += 1
@@ -77,24 +82,35 @@ def practice_mode(state: GameState) -> None:
             stats.chars_ok += len(target)
             streak += 1
             best_streak = max(best_streak, streak)
+            sched.grade(target, True)
             prev_word = target
-            target = next_word(prev_word)
+            target = sched.next_word(prev_word)
         else:
             stats.typos += 1  # <-- add this
             streak = 0
-            toast("Mismatch. Tip: lock the first 3 letters cleanly.")
+            sched.grade(target, False)
+            toast("Mismatch. Tip: lock the first 3 letters cleanly.", io)
 
     # ===== end-of-session results =====
     clock.stop()
+    rec.end()       # END at the clock's stop, not after the results screen
     final_seconds = max(clock.seconds, 1e-6)
     final_wpm = wpm(stats.chars_ok, final_seconds)
     update_accuracy(stats)
 
-    results_card("Practice", stats, final_wpm)
-    toast(f"Best streak: {best_streak}")
-    toast("(Press Enter to return to menu)")
+    results_card("Practice", stats, final_wpm, io=io)
+    saved = rec.finish(stats, final_wpm, final_seconds, False)
+    if saved:
+        toast(f"🎞 Recording saved: {saved}", io)
+    toast(f"Best streak: {best_streak}", io)
+    tricky = sched.hardest(5)
+    if tricky:
+        toast("Words to watch: " + ", ".join(tricky), io)
+    save_into(state.store, sched)
+    state.save()
+    toast("(Press Enter to return to menu)", io)
     try:
-        input()
+        io.input()
     except (KeyboardInterrupt, EOFError):
         pass
 
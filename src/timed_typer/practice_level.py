@@ -5,41 +5,41 @@ from __future__ import annotations
 from typing import Optional
 
 from .state import GameState, Screen
-from .levels import get_level
+from .levels import LEVELS, get_level
 from .words import words_for_level, _pool_for_level  # reuse pool builder
 from .timing import Stopwatch, wpm
 from .scoring import RunStats, update_accuracy
 from .ui_console import render_hud_practice, toast, results_card
+from .practice import HELP_CMDS, QUIT_CMDS, SKIP_CMDS
+from . import recording
+from .srs import scheduler_for, save_into
+from .difficulty import FULL_BAND
 
 
 HELP_TEXT = "Commands: :skip/s, :q/quit/exit, :help/h"
 
-def _next_word(pool: list[str], prev: Optional[str]) -> str:
-    # avoid immediate repeats
-    if not pool:
-        return ""
-    if prev is None:
-        return pool[0]
-    i = (pool.index(prev) + 1) % len(pool) if prev in pool else 0
-    return pool[i]
-
 def practice_level(state: GameState) -> None:
+    io = state.io
     # Ask level number
-    print("\n-- Focus Practice: choose level (1-5), or 'q' to cancel")
-    choice = input("> ").strip().lower()
+    io.print(f"\n-- Focus Practice: choose level ({min(LEVELS)}-{max(LEVELS)}), or 'q' to cancel")
+    choice = io.input("> ").strip().lower()
     if choice in ("q", "quit", "exit"):
         state.set_screen(Screen.MENU)
         return
-    if not choice.isdigit() or not (1 <= int(choice) <= 5):
-        toast("Invalid choice.")
+    if not choice.isdigit() or int(choice) not in LEVELS:
+        toast("Invalid choice.", io)
         state.set_screen(Screen.MENU)
         return
 
     level_num = int(choice)
     cfg = get_level(level_num)
-    pool = _pool_for_level(cfg)
+    # the player's practice band (if they set one) wins over the level's own band
+    band = state.store.get("settings", {}).get("practice_difficulty")
+    if band and tuple(band) == FULL_BAND:
+        band = None
+    pool = _pool_for_level(cfg, band=band)
     if not pool:
-        toast("No words for this level.")
+        toast("No words for this level.", io)
         state.set_screen(Screen.MENU)
         return
 
@@ -48,44 +48,45 @@ def practice_level(state: GameState) -> None:
     best_streak = 0
     clock = Stopwatch()
     clock.start()
+    rec = recording.for_run("practice_level", cfg.id)
 
-    toast(f"Focus Practice: Level {cfg.id} — {cfg.name}. 'q' to exit. {HELP_TEXT}")
+    toast(f"Focus Practice: Level {cfg.id} — {cfg.name}. 'q' to exit. {HELP_TEXT}", io)
 
-    # deterministic rotation through pool (helps memorize patterns)
-    idx = 0
-    target = pool[idx]
+    # spaced repetition: the words you keep missing come back sooner (srs.py)
+    sched = scheduler_for(state.store, pool)
     prev: Optional[str] = None
+    target = sched.next_word(prev)
 
     while True:
         elapsed = int(clock.seconds)
         stats.wpm_live = wpm(stats.chars_ok, max(clock.seconds, 1e-6))
         update_accuracy(stats)
-        render_hud_practice(elapsed, stats.wpm_live, stats.accuracy, streak)
+        render_hud_practice(elapsed, stats.wpm_live, stats.accuracy, streak, io=io)
+        rec.word(target)
 
         try:
-            user = input(f"Type: {target}\n> ")
+            user = io.input(f"Type: {target}\n> ")
         except (KeyboardInterrupt, EOFError):
-            toast("⏹ Leaving practice.")
+            toast("⏹ Leaving practice.", io)
+            rec.interrupt()
             break
 
         raw = user.strip()
         cmd = raw.lower()
+        rec.input(raw)
 
-        if cmd in (":help","help",":h","h"):
-            toast(HELP_TEXT); continue
-        if cmd in (":q","q","quit","exit"):
-            toast("↩ Back to menu."); break
-        if cmd in (":skip",":s","skip","s"):
+        if cmd in HELP_CMDS:
+            toast(HELP_TEXT, io); continue
+        if cmd in QUIT_CMDS:
+            toast("↩ Back to menu.", io); break
+        if cmd in SKIP_CMDS:
             streak = 0
+            sched.grade(target, False)
             prev = target
-            idx = (idx + 1) % len(pool)
-            target = pool[idx]
-            if target == prev:
-                idx = (idx + 1) % len(pool)
-                target = pool[idx]
+            target = sched.next_word(prev)
             continue
         if raw == "":
-            toast("(Empty input) " + HELP_TEXT); continue
+            toast("(Empty input) " + HELP_TEXT, io); continue
 
         stats.words_total += 1
         if raw == target:
@@ -93,27 +94,34 @@ def practice_level(state: GameState) -> None:
             stats.chars_ok += len(target)
             streak += 1
             best_streak = max(best_streak, streak)
+            sched.grade(target, True)
             prev = target
-            idx = (idx + 1) % len(pool)
-            target = pool[idx]
-            if target == prev:
-                idx = (idx + 1) % len(pool)
-                target = pool[idx]
+            target = sched.next_word(prev)
         else:
             stats.typos += 1  # <-- add this
             streak = 0
-            toast("Mismatch. Tip: lock the first 3 letters cleanly.")
+            sched.grade(target, False)
+            toast("Mismatch. Tip: lock the first 3 letters cleanly.", io)
 
     clock.stop()
+    rec.end()       # END at the clock's stop, not after the results screen
     final_seconds = max(clock.seconds, 1e-6)
     final_wpm = wpm(stats.chars_ok, final_seconds)
     update_accuracy(stats)
 
-    results_card(f"Practice L{cfg.id} — {cfg.name}", stats, final_wpm)
-    toast(f"Best streak: {best_streak}")
-    toast("(Press Enter to return to menu)")
+    results_card(f"Practice L{cfg.id} — {cfg.name}", stats, final_wpm, io=io)
+    saved = rec.finish(stats, final_wpm, final_seconds, False)
+    if saved:
+        toast(f"🎞 Recording saved: {saved}", io)
+    toast(f"Best streak: {best_streak}", io)
+    tricky = sched.hardest(5)
+    if tricky:
+        toast("Words to watch: " + ", ".join(tricky), io)
+    save_into(state.store, sched)
+    state.save()
+    toast("(Press Enter to return to menu)", io)
     try:
-        input()
+        io.input()
     except (KeyboardInterrupt, EOFError):
         pass
     state.set_screen(Screen.MENU)
@@ -0,0 +1,175 @@
+"""
+profiling.py — opt-in profiling of a whole session or CLI mode.
+
+Turn it on with either
+
+  TIMED_TYPER_PROFILE=1 python run_timed_typer.py --demo 3
+  python run_timed_typer.py --profile --demo 3
+  python run_timed_typer.py --profile=cprofile --report
+
+Modes:
+  sample    (default) a background thread looks at the main thread's stack
+            SAMPLE_HZ times a second. Cost is a few µs per sample, nothing
+            per function call, so it is fine to leave on with real players.
+            Wall-clock: time spent waiting in input() shows up too.
+  cprofile  deterministic cProfile (exact call counts, noticeably slower on
+            CPU-heavy modes like --selftest / --teacher; fine for menus).
+  both      the two together.
+
+Output goes to <profile dir>/profiles/:
+  <cli mode>-<time>-<pid>.pstats     load with `python -m pstats` or snakeviz
+  <cli mode>-<time>-<pid>.collapsed  "outer;inner;leaf count" lines, ready for
+                                     flamegraph.pl / speedscope / inferno
+
+When profiling is off, `session()` is a nullcontext — nothing is imported,
+no thread is started, no hook is installed.
+
+Only the main process is profiled; worker processes (selftest, cohort,
+teacher) are not followed.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from . import storage
+
+ENV_VAR = "TIMED_TYPER_PROFILE"
+MODES = ("sample", "cprofile", "both")
+SAMPLE_HZ = 200
+MAX_DEPTH = 128
+
+
+def profiles_dir() -> Path:
+    return storage.DEFAULT_PATH.parent / "profiles"
+
+
+def _mode_of(value: Optional[str]) -> Optional[str]:
+    """Env/flag value -> mode name, None when off."""
+    if value is None:
+        return None
+    v = value.strip().lower()
+    if v in ("", "0", "off", "no", "false"):
+        return None
+    if v in ("1", "on", "yes", "true"):
+        return "sample"
+    return v if v in MODES else "sample"
+
+
+class StackSampler:
+    """
+    Polls one thread's current frame from a daemon thread and counts whole
+    stacks. Frame labels are cached per code object, so a sample is one
+    dict lookup per frame plus a Counter increment.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, hz: int = SAMPLE_HZ) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.interval = 1.0 / max(1, hz)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        s = self._labels.get(code)
+        if s is None:
+            s = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return s
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack: List[str] = []
+        while frame is not None and len(stack) < MAX_DEPTH:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="tt-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, heaviest stacks first."""
+        return "".join(f"{';'.join(s)} {n}\n" for s, n in self.stacks.most_common())
+
+
+def _out_base(name: str) -> Path:
+    d = profiles_dir()
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+@contextlib.contextmanager
+def _profiled(name: str, mode: str) -> Iterator[None]:
+    prof = sampler = None
+    if mode in ("cprofile", "both"):
+        import cProfile
+        prof = cProfile.Profile()
+    if mode in ("sample", "both"):
+        sampler = StackSampler()
+        sampler.start()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof is not None:
+            prof.disable()
+        if sampler is not None:
+            sampler.stop()
+        written: List[Path] = []
+        try:
+            base = _out_base(name)
+            if prof is not None:
+                prof.dump_stats(str(base.with_suffix(".pstats")))
+                written.append(base.with_suffix(".pstats"))
+            if sampler is not None and sampler.samples:
+                base.with_suffix(".collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+                written.append(base.with_suffix(".collapsed"))
+        except OSError as e:
+            print(f"(profile not saved: {e})", file=sys.stderr)
+        for p in written:
+            print(f"Profile written: {p}", file=sys.stderr)
+
+
+def session(name: str, mode: Optional[str] = None):
+    """Context manager profiling the block in *mode* (default: from TIMED_TYPER_PROFILE)."""
+    mode = mode or _mode_of(os.environ.get(ENV_VAR))
+    if mode is None:
+        return contextlib.nullcontext()
+    return _profiled(name, mode)
+
+
+def session_from_argv(argv: List[str]):
+    """
+    Pull `--profile` / `--profile=MODE` out of *argv* (in place) and return
+    the matching session for the CLI mode left in argv[1] ("menu" if none).
+    """
+    mode: Optional[str] = None
+    for a in list(argv[1:]):
+        if a == "--profile" or a.startswith("--profile="):
+            argv.remove(a)
+            mode = _mode_of(a.partition("=")[2] or "1")
+    name = argv[1].lstrip("-").lower() if len(argv) > 1 else "menu"
+    return session(name or "cli", mode)
+
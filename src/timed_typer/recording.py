@@ -0,0 +1,384 @@
+"""
+recording.py — compact binary recordings of runs, and `--replay`.
+
+Set TIMED_TYPER_RECORD=1 (or to a folder) and every run of play_level,
+practice_mode and practice_level is saved as a .ttr file in
+<profile dir>/recordings/ (or that folder).
+
+File layout (little-endian):
+
+  b"TTR1" | u32 meta length | meta JSON | u32 n | tags: n x u8 | dt: n x u16 | arg: n x u16
+
+Meta holds the mode, level, the string table (every distinct word/input,
+stored once — a per-file vocab.Vocab, since the game's own word ids are only
+valid inside one process) and the stats the live run ended with. Each event is 5 bytes:
+  tag  WORD (new target) / INPUT (a line the player entered) / TICK (long pause)
+       INTERRUPT (Ctrl+C / EOF) / END
+  dt   milliseconds since the previous event (pauses > 65 s are split with TICKs)
+  arg  string id for WORD / INPUT
+
+Nothing is written to disk until the run ends, so recording costs the
+player nothing but a few list appends per input.
+
+Replay walks the columns with the same rules and scoring functions as the
+screens (check_input, update_accuracy, wpm, passed_level) and checks that
+the final stats match what the live run saw.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import storage
+from .levels import LEVELS
+from .scoring import RunStats, passed_level, update_accuracy
+from .timing import wpm
+from .vocab import Vocab
+
+MAGIC = b"TTR1"
+ENV_VAR = "TIMED_TYPER_RECORD"
+
+WORD, INPUT, TICK, INTERRUPT, END = 1, 2, 3, 4, 5
+_TAG_NAMES = {WORD: "WORD", INPUT: "INPUT", TICK: "TICK", INTERRUPT: "INTERRUPT", END: "END"}
+_MAX_DT = 0xFFFF
+
+
+def recordings_dir() -> Path:
+    return storage.DEFAULT_PATH.parent / "recordings"
+
+
+class NullRecorder:
+    """Used when recording is off: every hook is a no-op."""
+    path: Optional[Path] = None
+
+    def word(self, w: str) -> None: pass
+    def input(self, raw: str) -> None: pass
+    def interrupt(self) -> None: pass
+    def end(self) -> None: pass
+
+    def finish(self, stats: RunStats, final_wpm: float, elapsed_s: float, passed: bool) -> Optional[Path]:
+        return None
+
+
+class Recorder(NullRecorder):
+    def __init__(self, mode: str, level: int, out_dir: Path) -> None:
+        self.mode = mode
+        self.level = level
+        self.out_dir = out_dir
+        self.tags = array("B")
+        self.dts = array("H")
+        self.args = array("H")
+        self.table = Vocab()            # this file's strings; ids go in the arg column
+        self._target = -1
+        self._t0 = time.perf_counter_ns()
+        self._last_ms = 0
+        self._ended = False
+        self.truncated = False          # string table full (65k distinct inputs)
+
+    def _event(self, tag: int, arg: int = 0) -> None:
+        now_ms = (time.perf_counter_ns() - self._t0) // 1_000_000
+        dt = now_ms - self._last_ms
+        self._last_ms = now_ms
+        while dt > _MAX_DT:
+            self.tags.append(TICK); self.dts.append(_MAX_DT); self.args.append(0)
+            dt -= _MAX_DT
+        self.tags.append(tag)
+        self.dts.append(dt)
+        self.args.append(arg)
+
+    def _intern(self, s: str) -> int:
+        try:
+            return self.table.intern(s)
+        except OverflowError:
+            self.truncated = True
+            return -1
+
+    def word(self, w: str) -> None:
+        i = self._intern(w)
+        if i >= 0 and i != self._target:
+            self._target = i
+            self._event(WORD, i)
+
+    def input(self, raw: str) -> None:
+        i = self._intern(raw)
+        if i >= 0:
+            self._event(INPUT, i)
+
+    def interrupt(self) -> None:
+        self._event(INTERRUPT)
+
+    def end(self) -> None:
+        """Stamp END — call it right after clock.stop(), so the timeline matches elapsed_s."""
+        if not self._ended:
+            self._ended = True
+            self._event(END)
+
+    def finish(self, stats: RunStats, final_wpm: float, elapsed_s: float, passed: bool) -> Optional[Path]:
+        self.end()          # no-op if the caller already stamped it
+        if self.truncated:
+            return None
+        meta = {
+            "mode": self.mode, "level": self.level, "version": storage.VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "strings": self.table.words,
+            "end": {"words_total": stats.words_total, "words_ok": stats.words_ok,
+                    "typos": stats.typos, "chars_ok": stats.chars_ok,
+                    "elapsed_s": elapsed_s, "wpm": final_wpm,
+                    "accuracy": stats.accuracy, "passed": bool(passed)},
+        }
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() // 1_000_000 % 1000:03d}"
+        path = self.out_dir / f"{self.mode}-L{self.level}-{stamp}.ttr"
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            write_recording(path, meta, self.tags, self.dts, self.args)
+        except OSError:
+            return None
+        self.path = path
+        return path
+
+
+def for_run(mode: str, level: int = 0) -> NullRecorder:
+    """A Recorder when TIMED_TYPER_RECORD is set ("1" or a folder), else a no-op."""
+    val = os.environ.get(ENV_VAR, "").strip()
+    if not val or val == "0":
+        return NullRecorder()
+    out_dir = recordings_dir() if val == "1" else Path(val)
+    return Recorder(mode, level, out_dir)
+
+
+# ---------------------------------------------------------------------------
+# File I/O
+# ---------------------------------------------------------------------------
+
+def _le(a: array) -> array:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+
+def write_recording(path: Path, meta: dict, tags: array, dts: array, args: array) -> None:
+    blob = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(blob)))
+        f.write(blob)
+        f.write(struct.pack("<I", len(tags)))
+        f.write(tags.tobytes())
+        f.write(_le(dts).tobytes())
+        f.write(_le(args).tobytes())
+
+
+@dataclass
+class Recording:
+    meta: dict
+    tags: array
+    dts: array
+    args: array
+
+    @property
+    def mode(self) -> str:
+        return self.meta["mode"]
+
+
+def read_recording(path: Path) -> Recording:
+    data = path.read_bytes()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a Timed Typer recording")
+    (mlen,) = struct.unpack_from("<I", data, 4)
+    pos = 8 + mlen
+    meta = json.loads(data[8:pos].decode("utf-8"))
+    (n,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    if len(data) < pos + 5 * n:
+        raise ValueError(f"{path} is truncated")
+    tags = array("B", data[pos:pos + n]); pos += n
+    dts = array("H"); dts.frombytes(data[pos:pos + 2 * n]); pos += 2 * n
+    args = array("H"); args.frombytes(data[pos:pos + 2 * n])
+    return Recording(meta, tags, _le(dts), _le(args))
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+_TEXT, _HELP, _QUIT, _SKIP, _EMPTY = range(5)
+
+
+@dataclass(frozen=True)
+class ModeRules:
+    """How a screen treats a line of input (mirrors the screen's own code)."""
+    help_cmds: frozenset
+    quit_cmds: frozenset
+    skip_cmds: frozenset
+    skip_is_typo: bool
+    evaluate: Callable[[str, str], bool]     # (target, typed) -> complete?
+    timed: bool                               # has a level time budget / pass check
+
+
+def _rules() -> Dict[str, ModeRules]:
+    from . import play, practice
+    return {
+        "play": ModeRules(play.HELP_CMDS, play.QUIT_CMDS, play.SKIP_CMDS, True,
+                          lambda t, x: play._evaluate_attempt(t, x)[0], True),
+        "practice": ModeRules(practice.HELP_CMDS, practice.QUIT_CMDS, practice.SKIP_CMDS, False,
+                              lambda t, x: x == t, False),
+        "practice_level": ModeRules(practice.HELP_CMDS, practice.QUIT_CMDS, practice.SKIP_CMDS, False,
+                                    lambda t, x: x == t, False),
+    }
+
+
+@dataclass
+class ReplayResult:
+    stats: RunStats
+    final_wpm: float
+    passed: bool
+    interrupted: bool
+    timeline_s: float       # time of END according to the event deltas
+    events: int
+
+
+def replay(rec: Recording, on_event: Optional[Callable[[float, int, str], None]] = None) -> ReplayResult:
+    """
+    Re-run the recorded inputs through the screen rules and scoring code.
+    on_event(t_seconds, tag, text) is called per event (used for --speed);
+    without it the loop does nothing but score.
+    """
+    rules = _rules()[rec.mode]
+    strings = rec.meta["strings"]
+    # classify every distinct string once instead of once per event
+    kinds = []
+    for s in strings:
+        c = s.lower()
+        kinds.append(_HELP if c in rules.help_cmds else _QUIT if c in rules.quit_cmds
+                     else _SKIP if c in rules.skip_cmds else _EMPTY if s == "" else _TEXT)
+    memo: Dict[int, bool] = {}
+    evaluate = rules.evaluate
+    n_str = len(strings) + 1
+
+    words_total = words_ok = typos = chars_ok = 0
+    target = -1
+    interrupted = False
+    t_ms = 0
+    for tag, dt, arg in zip(rec.tags, rec.dts, rec.args):
+        t_ms += dt
+        if on_event is not None:
+            on_event(t_ms / 1000.0, tag, strings[arg] if tag in (WORD, INPUT) else "")
+        if tag == INPUT:
+            k = kinds[arg]
+            if k == _TEXT:
+                words_total += 1
+                key = target * n_str + arg
+                ok = memo.get(key)
+                if ok is None:
+                    ok = memo[key] = evaluate(strings[target], strings[arg])
+                if ok:
+                    words_ok += 1
+                    chars_ok += len(strings[target])
+                else:
+                    typos += 1
+            elif k == _SKIP:
+                if rules.skip_is_typo:
+                    typos += 1
+            elif k == _QUIT:
+                interrupted = True
+        elif tag == WORD:
+            target = arg
+        elif tag == INTERRUPT:
+            interrupted = True
+        elif tag == END:
+            break
+
+    stats = RunStats(words_total=words_total, words_ok=words_ok, typos=typos, chars_ok=chars_ok)
+    update_accuracy(stats)
+    # the clock reading at the end is data, like the inputs: use the exact value
+    elapsed = rec.meta["end"]["elapsed_s"]
+    final_wpm = wpm(stats.chars_ok, max(elapsed, 1e-6))
+    passed = False
+    if rules.timed:
+        cfg = LEVELS[rec.meta["level"]]
+        passed = (not interrupted) and passed_level(cfg, stats, final_wpm)
+    return ReplayResult(stats, final_wpm, passed, interrupted, t_ms / 1000.0, len(rec.tags))
+
+
+def compare(rec: Recording, res: ReplayResult) -> List[str]:
+    """Differences between the live end-of-run stats and the replay ([] = match)."""
+    end = rec.meta["end"]
+    diffs = []
+    for key in ("words_total", "words_ok", "typos", "chars_ok"):
+        if getattr(res.stats, key) != end[key]:
+            diffs.append(f"{key}: recorded {end[key]}, replay {getattr(res.stats, key)}")
+    if abs(res.stats.accuracy - end["accuracy"]) > 1e-9:
+        diffs.append(f"accuracy: recorded {end['accuracy']:.4f}, replay {res.stats.accuracy:.4f}")
+    if abs(res.final_wpm - end["wpm"]) > 1e-6 * max(1.0, end["wpm"]):
+        diffs.append(f"wpm: recorded {end['wpm']:.3f}, replay {res.final_wpm:.3f}")
+    if res.passed != end["passed"]:
+        diffs.append(f"passed: recorded {end['passed']}, replay {res.passed}")
+    # the event timeline is whole ms and starts a hair after the Stopwatch
+    if abs(res.timeline_s - end["elapsed_s"]) > 0.05:
+        diffs.append(f"time: clock {end['elapsed_s']:.3f}s, events {res.timeline_s:.3f}s")
+    return diffs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--replay <file>` entry point. Exit 1 if the replay disagrees with the recording."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --replay", description="Replay and verify a .ttr recording.")
+    ap.add_argument("file", type=Path)
+    ap.add_argument("--speed", default="max", help="'max' (default) or a multiplier: 1 = real time, 10 = 10x")
+    args = ap.parse_args(argv)
+
+    try:
+        rec = read_recording(args.file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 2
+    if rec.mode not in _rules():
+        print(f"Error: unknown mode {rec.mode!r}")
+        return 2
+
+    on_event: Optional[Callable[[float, int, str], None]] = None
+    if args.speed != "max":
+        try:
+            speed = float(args.speed)
+        except ValueError:
+            print("Error: --speed must be 'max' or a number")
+            return 2
+        speed = speed if speed > 0 else 1.0
+        start = time.perf_counter()
+
+        def _paced(t: float, tag: int, text: str) -> None:
+            delay = start + t / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if tag != TICK:
+                print(f"[{t:7.2f}s] {_TAG_NAMES[tag]:<9} {text}")
+
+        on_event = _paced
+
+    t0 = time.perf_counter()
+    res = replay(rec, on_event)
+    dt = time.perf_counter() - t0
+
+    label = rec.mode + (f" L{rec.meta['level']}" if rec.meta.get("level") else "")
+    s = res.stats
+    print(f"{args.file.name}: {label}, {res.events} events, {args.file.stat().st_size} bytes")
+    print(f"replay: {s.words_ok}/{s.words_total} ok, {s.typos} typos, {res.final_wpm:.1f} WPM, "
+          f"{s.accuracy*100:.0f}% acc" + (f", {'PASS' if res.passed else 'no pass'}" if _rules()[rec.mode].timed else ""))
+    if on_event is None:
+        print(f"{res.events / max(dt, 1e-9):,.0f} events/s")
+    diffs = compare(rec, res)
+    if diffs:
+        print("MISMATCH:")
+        for d in diffs:
+            print("  " + d)
+        return 1
+    print("OK — replay matches the recorded run")
+    return 0
@@ -1,151 +1,131 @@
 """
 report.py — builds the turn-in report with Q1–Q5 and writes REPORT.md
+
+The report is assembled from independent sections, each a pure function
+of a few inputs (unlocks, PBs, level names...). Building them is cheap, so
+they are simply rebuilt every time; the file write itself is skipped when
+nothing but the timestamp would change.
 """
 
 from __future__ import annotations
 
+import argparse
+import csv
+import io
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, Iterable, Optional
 
-from .storage import load_store
-from .levels import get_level
-
-
-def _build_report_text(store: dict) -> str:
-    """
-    Build markdown answering the required questions:
+from .storage import load_store, iter_runs, history_path
+from .levels import LEVELS
+from .sketches import Moments, QuantileSketch, Histogram, Trend
+from .typo_stats import MAX_POS, TypoStats, describe_pair
 
-    Q1. Creative goals
-    Q2. Five levels + transitions
-    Q3. Progress & final success feedback
-    Q4. New functions beyond skeleton
-    Q5. Code readability & style
-    """
+TITLE = "Report Notes (Timed Typer)"
 
-    # pull persistent data from the save system
-    unlocks = store.get("unlocks", {})
-    pbs = store.get("pbs", {})
-
-    # the game is designed around 5 missions/levels
-    level_ids = [1, 2, 3, 4, 5]
-
-    # ---------- helper blocks that generate report sections ----------
-
-    def level_status_block() -> list[str]:
-        """
-        For Q2: show each level with:
-        - UNLOCKED or LOCKED
-        - PB (WPM and accuracy %)
-        - Level name (Ping / Traceroute / DNS / HTTP / Firewall)
-        """
-        lines: list[str] = []
-        for lvl in level_ids:
-            # ex: cfg.name == "Ping", "Traceroute", etc.
-            try:
-                cfg = get_level(lvl)
-                lvl_name = cfg.name
-            except Exception:
-                lvl_name = f"Level {lvl}"
-
-            is_open = bool(unlocks.get(str(lvl), False))
-            status = "UNLOCKED" if is_open else "LOCKED"
-
-            pb = pbs.get(str(lvl))
-            if pb:
-                wpm_val = pb.get("wpm", 0.0)
-                acc_ratio = pb.get("accuracy", 0.0)
-                acc_pct = acc_ratio * 100.0
-                pb_str = f"{wpm_val:.1f} WPM @ {acc_pct:.1f}% acc"
-            else:
-                pb_str = "PB: —"
-
-            lines.append(f"- {lvl}. {lvl_name} — {status} — {pb_str}")
-        return lines
-
-    def progress_block() -> list[str]:
-        """
-        For Q3: summarize what the player has actually achieved.
-        We consider a level "cleared" if:
-          - beating level N unlocked level N+1, OR
-          - for the last level, we at least have a PB recorded.
-        Also highlight the best run overall.
-        """
-        lines: list[str] = []
-
-        cleared_levels: list[int] = []
-        for lvl in level_ids:
-            if lvl < max(level_ids):
-                # cleared if next level is unlocked
-                nxt = str(lvl + 1)
-                if unlocks.get(nxt, False):
-                    cleared_levels.append(lvl)
-            else:
-                # last level: cleared if we have *any* PB saved
-                if pbs.get(str(lvl)):
-                    cleared_levels.append(lvl)
 
-        if cleared_levels:
-            cleared_str = ", ".join(str(x) for x in cleared_levels)
-            lines.append(f"- Cleared levels so far: {cleared_str}")
-        else:
-            lines.append("- Cleared levels so far: none yet")
+# ---------- helper blocks that generate report sections ----------
 
-        # strongest performance = PB with highest WPM
-        best_lvl = None
-        best_lvl_name = ""
-        best_wpm = 0.0
-        best_acc_pct = 0.0
+def _level_status_block(level_ids: list[int], names: dict, unlocks: dict, pbs: dict) -> list[str]:
+    """
+    For Q2: show each level with:
+    - UNLOCKED or LOCKED
+    - PB (WPM and accuracy %)
+    - Level name (Ping / Traceroute / DNS / HTTP / Firewall)
+    """
+    lines: list[str] = []
+    for lvl in level_ids:
+        # ex: "Ping", "Traceroute", etc.
+        lvl_name = names.get(str(lvl)) or f"Level {lvl}"
 
-        for lvl_str, pb in pbs.items():
-            try:
-                lvl_int = int(lvl_str)
-            except ValueError:
-                continue
+        is_open = bool(unlocks.get(str(lvl), False))
+        status = "UNLOCKED" if is_open else "LOCKED"
 
+        pb = pbs.get(str(lvl))
+        if pb:
             wpm_val = pb.get("wpm", 0.0)
             acc_ratio = pb.get("accuracy", 0.0)
             acc_pct = acc_ratio * 100.0
-
-            if wpm_val > best_wpm:
-                best_wpm = wpm_val
-                best_acc_pct = acc_pct
-                try:
-                    cfg = get_level(lvl_int)
-                    best_lvl_name = cfg.name
-                except Exception:
-                    best_lvl_name = f"Level {lvl_int}"
-                best_lvl = lvl_int
-
-        if best_lvl is not None:
-            lines.append(
-                f"- Strongest performance: Level {best_lvl} "
-                f"({best_lvl_name}) at {best_wpm:.1f} WPM / "
-                f"{best_acc_pct:.1f}% accuracy"
-            )
+            pb_str = f"{wpm_val:.1f} WPM @ {acc_pct:.1f}% acc"
         else:
-            lines.append("- Strongest performance: (no PBs yet)")
+            pb_str = "PB: —"
+
+        lines.append(f"- {lvl}. {lvl_name} — {status} — {pb_str}")
+    return lines
 
-        # describe the feedback loop at the end of a run
+def _progress_block(level_ids: list[int], names: dict, unlocks: dict, pbs: dict) -> list[str]:
+    """
+    For Q3: summarize what the player has actually achieved.
+    We consider a level "cleared" if:
+      - beating level N unlocked level N+1, OR
+      - for the last level, we at least have a PB recorded.
+    Also highlight the best run overall.
+    """
+    lines: list[str] = []
+
+    cleared_levels: list[int] = []
+    ordered = sorted(level_ids)
+    for k, lvl in enumerate(ordered):
+        if k + 1 < len(ordered):
+            # cleared if next level is unlocked (packs may skip ids: 5 -> 10)
+            nxt = str(ordered[k + 1])
+            if unlocks.get(nxt, False):
+                cleared_levels.append(lvl)
+        else:
+            # last level: cleared if we have *any* PB saved
+            if pbs.get(str(lvl)):
+                cleared_levels.append(lvl)
+
+    if cleared_levels:
+        cleared_str = ", ".join(str(x) for x in cleared_levels)
+        lines.append(f"- Cleared levels so far: {cleared_str}")
+    else:
+        lines.append("- Cleared levels so far: none yet")
+
+    # strongest performance = PB with highest WPM
+    best_lvl = None
+    best_lvl_name = ""
+    best_wpm = 0.0
+    best_acc_pct = 0.0
+
+    for lvl_str, pb in pbs.items():
+        try:
+            lvl_int = int(lvl_str)
+        except ValueError:
+            continue
+
+        wpm_val = pb.get("wpm", 0.0)
+        acc_ratio = pb.get("accuracy", 0.0)
+        acc_pct = acc_ratio * 100.0
+
+        if wpm_val > best_wpm:
+            best_wpm = wpm_val
+            best_acc_pct = acc_pct
+            best_lvl_name = names.get(str(lvl_int)) or f"Level {lvl_int}"
+            best_lvl = lvl_int
+
+    if best_lvl is not None:
         lines.append(
-            "- After every run, the game prints feedback:\n"
-            "  * ✅ \"Level passed! Next level unlocked.\" when you hit both\n"
-            "    target WPM and accuracy without quitting.\n"
-            "  * Otherwise it tells you why you failed (too slow vs too many\n"
-            "    typos) and gives a tip, e.g. 'Slow down slightly' or 'Push\n"
-            "    speed on short words.'"
+            f"- Strongest performance: Level {best_lvl} "
+            f"({best_lvl_name}) at {best_wpm:.1f} WPM / "
+            f"{best_acc_pct:.1f}% accuracy"
         )
-        return lines
+    else:
+        lines.append("- Strongest performance: (no PBs yet)")
 
-    # ---------- assemble the final markdown body ----------
+    # describe the feedback loop at the end of a run
+    lines.append(
+        "- After every run, the game prints feedback:\n"
+        "  * ✅ \"Level passed! Next level unlocked.\" when you hit both\n"
+        "    target WPM and accuracy without quitting.\n"
+        "  * Otherwise it tells you why you failed (too slow vs too many\n"
+        "    typos) and gives a tip, e.g. 'Slow down slightly' or 'Push\n"
+        "    speed on short words.'"
+    )
+    return lines
 
+def _q1_lines() -> list[str]:
     lines: list[str] = []
-
-    # Title + timestamp
-    lines.append("Report Notes (Timed Typer)")
-    lines.append(f"Generated: {datetime.now().isoformat(timespec='seconds')}")
-    lines.append("")
-
-    # Q1
     lines.append("## Q1. Creative goals")
     lines.append(
         "- Make a high-pressure typing trainer that feels like doing real\n"
@@ -161,8 +141,11 @@ def _build_report_text(store: dict) -> str:
         "  so each level feels like a mission instead of homework."
     )
     lines.append("")
+    return lines
+
 
-    # Q2
+def _q2_lines(level_ids: list[int], names: dict, unlocks: dict, pbs: dict) -> list[str]:
+    lines: list[str] = []
     lines.append("## Q2. Five levels + transitions")
     lines.append(
         "- The game has 5 missions, escalating from Ping to Firewall.\n"
@@ -173,19 +156,25 @@ def _build_report_text(store: dict) -> str:
         "  quitting early), the next mission unlocks automatically."
     )
     lines.append("- Current status:")
-    lines.extend(level_status_block())
+    lines.extend(_level_status_block(level_ids, names, unlocks, pbs))
     lines.append(
         "- The Level Select menu shows which levels are UNLOCKED vs LOCKED\n"
         "  and displays your PB for each one."
     )
     lines.append("")
+    return lines
+
 
-    # Q3
+def _q3_lines(level_ids: list[int], names: dict, unlocks: dict, pbs: dict) -> list[str]:
+    lines: list[str] = []
     lines.append("## Q3. Progress & final success feedback")
-    lines.extend(progress_block())
+    lines.extend(_progress_block(level_ids, names, unlocks, pbs))
     lines.append("")
+    return lines
+
 
-    # Q4
+def _q4_lines() -> list[str]:
+    lines: list[str] = []
     lines.append("## Q4. New functions beyond skeleton")
     lines.append(
         "- `storage.py`: full save system. It writes a `profile.json` file\n"
@@ -218,8 +207,11 @@ def _build_report_text(store: dict) -> str:
         "  teacher tool wired directly into the game."
     )
     lines.append("")
+    return lines
 
-    # Q5
+
+def _q5_lines() -> list[str]:
+    lines: list[str] = []
     lines.append("## Q5. Code readability & style")
     lines.append(
         "- The code is split into focused modules:\n"
@@ -254,23 +246,348 @@ def _build_report_text(store: dict) -> str:
         "  targeted advice ('slow down for accuracy' vs 'push speed'),\n"
         "  which is part of the grading story for \"progress & feedback\"."
     )
+    return lines
+
+
+# ---------- run-history analytics (one streaming pass, mergeable) ----------
+
+# accuracy bands for the distribution table (ratios, like the save file)
+ACC_EDGES = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+# trend x-axis = days since 2025-01-01 (keeps the regression sums small)
+_TREND_EPOCH = 1735689600.0
+
+
+class LevelAnalytics:
+    """Constant-size summary of every run on one level."""
+    __slots__ = ("runs", "passes", "wpm", "wpm_q", "acc", "acc_q", "acc_bands", "trend")
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.passes = 0
+        self.wpm = Moments()
+        self.wpm_q = QuantileSketch()
+        self.acc = Moments()
+        self.acc_q = QuantileSketch()
+        self.acc_bands = Histogram(ACC_EDGES)
+        self.trend = Trend()            # WPM vs. day -> improvement rate
+
+    def add(self, wpm_val: float, acc_val: float, passed: bool, ts: Optional[float]) -> None:
+        self.runs += 1
+        self.passes += 1 if passed else 0
+        self.wpm.add(wpm_val)
+        self.wpm_q.add(wpm_val)
+        self.acc.add(acc_val)
+        self.acc_q.add(acc_val)
+        self.acc_bands.add(acc_val)
+        if ts is not None:
+            self.trend.add((ts - _TREND_EPOCH) / 86400.0, wpm_val)
+
+    def merge(self, other: "LevelAnalytics") -> None:
+        self.runs += other.runs
+        self.passes += other.passes
+        self.wpm.merge(other.wpm)
+        self.wpm_q.merge(other.wpm_q)
+        self.acc.merge(other.acc)
+        self.acc_q.merge(other.acc_q)
+        self.acc_bands.merge(other.acc_bands)
+        self.trend.merge(other.trend)
+
+
+class HistoryAnalytics:
+    """Per-level LevelAnalytics; memory depends on the number of levels, not runs."""
+
+    def __init__(self) -> None:
+        self.levels: dict[int, LevelAnalytics] = {}
+        self.skipped = 0                # malformed records
+
+    def add(self, rec: dict) -> None:
+        try:
+            lvl = int(rec["level"])
+            wpm_val = float(rec["wpm"])
+            acc_val = float(rec["accuracy"])
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            return
+        ts = rec.get("ts")
+        la = self.levels.get(lvl)
+        if la is None:
+            la = self.levels[lvl] = LevelAnalytics()
+        la.add(wpm_val, acc_val, bool(rec.get("passed")), float(ts) if isinstance(ts, (int, float)) else None)
+
+    def merge(self, other: "HistoryAnalytics") -> None:
+        self.skipped += other.skipped
+        for lvl, la in other.levels.items():
+            if lvl in self.levels:
+                self.levels[lvl].merge(la)
+            else:
+                self.levels[lvl] = la
+
+    @property
+    def runs(self) -> int:
+        return sum(la.runs for la in self.levels.values())
+
+
+def analyze_history(paths: Iterable[Path]) -> HistoryAnalytics:
+    """One streaming pass per file; the per-file partials are merged."""
+    total = HistoryAnalytics()
+    for path in paths:
+        part = HistoryAnalytics()
+        for rec in iter_runs(path):
+            part.add(rec)
+        total.merge(part)
+    return total
+
+
+def analytics_rows(agg: HistoryAnalytics) -> list[dict]:
+    """Small, rounded per-level rows — used for both the Markdown table and the CSV."""
+    rows: list[dict] = []
+    for lvl in sorted(agg.levels):
+        la = agg.levels[lvl]
+        cfg = LEVELS.get(lvl)
+        slope = la.trend.slope
+        rows.append({
+            "level": lvl,
+            "name": cfg.name if cfg else f"Level {lvl}",
+            "runs": la.runs,
+            "passes": la.passes,
+            "wpm_mean": round(la.wpm.mean, 2),
+            "wpm_sd": round(la.wpm.stdev, 2),
+            "wpm_p50": round(la.wpm_q.quantile(0.5), 2),
+            "wpm_p90": round(la.wpm_q.quantile(0.9), 2),
+            "wpm_best": round(la.wpm.max, 2),
+            "acc_mean": round(la.acc.mean, 4),
+            "acc_p10": round(la.acc_q.quantile(0.1), 4),
+            "acc_p50": round(la.acc_q.quantile(0.5), 4),
+            "wpm_per_day": None if slope is None else round(slope, 3),
+            "acc_bands": list(la.acc_bands.counts),
+        })
+    return rows
+
+
+def _analytics_lines(rows: list[dict]) -> list[str]:
+    lines: list[str] = []
+    lines.append("## Run history analytics")
+    total = sum(r["runs"] for r in rows)
+    lines.append(f"- {total} recorded runs across {len(rows)} level(s).")
+    lines.append("")
+    lines.append("| Level | Runs | Pass % | WPM mean ± sd | WPM p50 | WPM p90 | Best | Acc mean | Acc p10 | Acc p50 | Trend |")
+    lines.append("|-------|------|--------|---------------|---------|---------|------|----------|---------|---------|-------|")
+    for r in rows:
+        trend = "—" if r["wpm_per_day"] is None else f"{r['wpm_per_day']:+.2f} WPM/day"
+        lines.append(
+            f"| {r['level']}. {r['name']} | {r['runs']} | {r['passes'] / max(1, r['runs']) * 100:.0f}% "
+            f"| {r['wpm_mean']:.1f} ± {r['wpm_sd']:.1f} | {r['wpm_p50']:.1f} | {r['wpm_p90']:.1f} "
+            f"| {r['wpm_best']:.1f} | {r['acc_mean']*100:.1f}% | {r['acc_p10']*100:.1f}% "
+            f"| {r['acc_p50']*100:.1f}% | {trend} |"
+        )
+    lines.append("")
+    bands = Histogram(ACC_EDGES).labels("{:.0%}")
+    lines.append("Accuracy distribution (runs per band):")
+    lines.append("")
+    lines.append("| Level | " + " | ".join(bands) + " |")
+    lines.append("|-------|" + "|".join("-" * (len(b) + 2) for b in bands) + "|")
+    for r in rows:
+        lines.append(f"| {r['level']}. {r['name']} | " + " | ".join(str(c) for c in r["acc_bands"]) + " |")
+    return lines
+
+
+def analytics_csv(rows: list[dict]) -> str:
+    bands = [f"acc_{b}" for b in Histogram(ACC_EDGES).labels("{:.0%}")]
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    keys = [k for k in rows[0] if k != "acc_bands"] if rows else []
+    w.writerow(keys + bands)
+    for r in rows:
+        w.writerow([r[k] for k in keys] + r["acc_bands"])
+    return buf.getvalue()
+
+
+# ---------- typo analytics (from the profile's confusion matrix) ----------
 
+def _typo_inputs(store: dict) -> dict:
+    return {"typos": store.get("typos") or {}}
+
+
+def _typo_lines(typos: dict) -> list[str]:
+    ts = TypoStats.from_store({"typos": typos})
+    lines: list[str] = []
+    lines.append("## Typo analytics")
+    rate = ts.misses / ts.attempts * 100 if ts.attempts else 0.0
+    lines.append(f"- {ts.misses} missed attempts out of {ts.attempts} ({rate:.1f}%) in timed levels.")
+    lines.append("")
+    lines.append("| Expected | Typed | Count | Share of misses |")
+    lines.append("|----------|-------|-------|-----------------|")
+    for exp, got, c in ts.top_pairs(10):
+        lines.append(f"| `{exp or '∅'}` | `{got or '∅'}` | {c} | {c / max(1, ts.misses) * 100:.0f}% |")
+    lines.append("")
+    lines.append("Misses by letter position (first wrong letter):")
+    lines.append("")
+    labels = [str(i + 1) for i in range(MAX_POS - 1)] + [f"{MAX_POS}+"]
+    last = max((i for i, c in enumerate(ts.pos) if c), default=0)
+    lines.append("| Position | " + " | ".join(labels[:last + 1]) + " |")
+    lines.append("|----------|" + "|".join("---" for _ in labels[:last + 1]) + "|")
+    lines.append("| Misses | " + " | ".join(str(c) for c in ts.pos[:last + 1]) + " |")
+    top = ts.top_pairs(1)
+    if top:
+        lines.append("")
+        lines.append(f"Most common slip: {describe_pair(top[0][0], top[0][1])}.")
+    return lines
+
+
+# ---------- section table ----------
+
+def _no_inputs(store: dict) -> dict:
+    return {}
+
+
+def _level_inputs(store: dict) -> dict:
+    # built-in missions plus any level packs
+    return {
+        "level_ids": list(LEVELS),
+        "names": {str(lvl): cfg.name for lvl, cfg in LEVELS.items()},
+        "unlocks": store.get("unlocks", {}),
+        "pbs": store.get("pbs", {}),
+    }
+
+
+# (builder, which inputs it reads) — in report order
+SECTIONS: list[tuple[Callable[..., list[str]], Callable[[dict], dict]]] = [
+    (_q1_lines, _no_inputs),
+    (_q2_lines, _level_inputs),
+    (_q3_lines, _level_inputs),
+    (_q4_lines, _no_inputs),
+    (_q5_lines, _no_inputs),
+]
+
+
+def _build_report_body(store: dict, analytics: Optional[HistoryAnalytics] = None) -> str:
+    """Everything below the title/timestamp header."""
+    lines: list[str] = []
+    for build, inputs_for in SECTIONS:
+        lines.extend(build(**inputs_for(store)))
+    if (store.get("typos") or {}).get("misses"):
+        lines.append("")
+        lines.extend(_typo_lines(**_typo_inputs(store)))
+    if analytics is not None and analytics.runs:
+        lines.append("")
+        lines.extend(_analytics_lines(analytics_rows(analytics)))
     # final newline for nice file ending
     return "\n".join(lines) + "\n"
 
 
-def export_report_to_project_root() -> Path:
+def _header(generated: Optional[datetime] = None) -> str:
+    generated = generated or datetime.now()
+    return f"{TITLE}\nGenerated: {generated.isoformat(timespec='seconds')}\n\n"
+
+
+def _build_report_text(store: dict) -> str:
     """
-    Called by game.py when the player chooses [7] Export Report.
+    Build markdown answering the required questions:
 
-    1. Load the save (profile.json) via storage.load_store()
-    2. Build the Q1–Q5 narrative
-    3. Write REPORT.md in the current working directory
-    4. Return that path so game.py can print it
+    Q1. Creative goals
+    Q2. Five levels + transitions
+    Q3. Progress & final success feedback
+    Q4. New functions beyond skeleton
+    Q5. Code readability & style
     """
-    store = load_store()
-    text = _build_report_text(store)
+    return _header() + _build_report_body(store)
+
+
+def _existing_body(path: Path, expected_len: int) -> Optional[str]:
+    """Body of an existing report, or None if it clearly differs / is missing."""
+    try:
+        # same header length every time, so a size mismatch means "changed"
+        if path.stat().st_size != expected_len:
+            return None
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    parts = text.split("\n", 3)
+    return parts[3] if len(parts) == 4 else None
+
 
+def _write_if_changed(path: Path, text: str) -> bool:
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def csv_path_for(report_path: Path) -> Path:
+    return report_path.with_name(report_path.stem + "_analytics.csv")
+
+
+def export_report(store: dict, out_path: Path, analytics: Optional[HistoryAnalytics] = None) -> bool:
+    """
+    Write the report for *store* to *out_path* (plus <name>_analytics.csv when
+    there is run history). Returns False (and leaves the report alone) when
+    the content is unchanged.
+    """
+    body = _build_report_body(store, analytics)
+    header = _header()
+    expected_len = len((header + body).encode("utf-8"))
+    if analytics is not None and analytics.runs:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_if_changed(csv_path_for(out_path), analytics_csv(analytics_rows(analytics)))
+    if _existing_body(out_path, expected_len) == body:
+        return False
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(header + body, encoding="utf-8")
+    return True
+
+
+def export_default_report(store: Optional[dict] = None,
+                          profile_path: Optional[Path] = None) -> tuple[Path, bool]:
+    """
+    Profile + its run history -> ./REPORT.md. Returns (path, written).
+    *profile_path* picks whose runs.jsonl is read (a kiosk learner's); default = the normal profile.
+    """
+    if store is None:
+        store = load_store(profile_path)
     out_path = Path.cwd() / "REPORT.md"
-    out_path.write_text(text, encoding="utf-8")
-    return out_path
+    hist = history_path(profile_path)
+    analytics = analyze_history([hist]) if hist.exists() else None
+    return out_path, export_report(store, out_path, analytics)
+
+
+def export_report_to_project_root(store: Optional[dict] = None,
+                                  profile_path: Optional[Path] = None) -> Path:
+    """
+    Called by game.py when the player chooses [7] Export Report.
+
+    1. Load the save (profile.json) via storage.load_store() unless given one
+    2. Build the Q1–Q5 narrative + the analytics of the
+       runs.jsonl next to *profile_path* (in kiosk mode: the current learner's)
+    3. Write REPORT.md in the current working directory (if it changed)
+    4. Return that path so game.py can print it
+    """
+    return export_default_report(store, profile_path)[0]
+
+
+def analytics_main(argv: Optional[list[str]] = None) -> int:
+    """`--analytics [history files...]` — merge histories, print Markdown, write CSV."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --analytics",
+                                 description="Streaming analytics over one or more runs.jsonl files.")
+    ap.add_argument("files", nargs="*", type=Path, help="history files (default: this profile's runs.jsonl)")
+    ap.add_argument("--csv", type=Path, default=Path("analytics.csv"), help="CSV output (default analytics.csv)")
+    ap.add_argument("--md", type=Path, default=None, help="also write the Markdown to this file")
+    args = ap.parse_args(argv)
+
+    agg = analyze_history(args.files or [history_path()])
+    if not agg.runs:
+        print("No runs recorded yet.")
+        return 0
+    rows = analytics_rows(agg)
+    text = "\n".join(_analytics_lines(rows)) + "\n"
+    print(text)
+    args.csv.write_text(analytics_csv(rows), encoding="utf-8")
+    print(f"CSV written to: {args.csv}")
+    if args.md:
+        args.md.write_text(text, encoding="utf-8")
+        print(f"Markdown written to: {args.md}")
+    if agg.skipped:
+        print(f"({agg.skipped} malformed records skipped)")
+    return 0
@@ -1,18 +1,72 @@
 """
 selftest.py — automated, non-interactive checks for the game
 (derives targets from level config so PASS/FAIL are accurate)
+
+Checks register themselves with @check and are discovered from CHECKS.
+The runner executes them in parallel, each against its own throwaway
+profile.json inside a temp directory (the player's real profile is never
+touched), times every check, and can emit JSON / JUnit XML for CI.
 """
 from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from math import ceil
-from typing import List, Tuple
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
 
 from .state import GameState, Screen
-from .levels import get_level
-from .words import words_for_level
+from .levels import LEVELS, get_level, next_level_id
+from .words import words_for_level, check_input
 from .timing import wpm as wpm_calc
 from .scoring import RunStats, update_accuracy, passed_level
-from .storage import save_pb
-from .ui_console import toast, results_card
+from . import storage
+from .ui_console import toast
+
+
+class CheckFailed(Exception):
+    """Raised by a check when the game does not behave as expected."""
+
+
+@dataclass
+class CheckContext:
+    profile_path: Path      # private profile.json for this check
+    rng: random.Random      # private, seeded RNG (reproducible in parallel)
+
+
+@dataclass
+class Check:
+    id: str
+    name: str
+    fn: Callable[[CheckContext], str]
+
+
+@dataclass
+class CheckResult:
+    id: str
+    name: str
+    passed: bool
+    duration_s: float
+    message: str
+
+
+# Every @check-decorated function lands here, in definition order.
+CHECKS: List[Check] = []
+
+
+def check(check_id: str, name: str):
+    """Register a self-test. The function returns a short message or raises."""
+    def deco(fn: Callable[[CheckContext], str]) -> Callable[[CheckContext], str]:
+        CHECKS.append(Check(check_id, name, fn))
+        return fn
+    return deco
 
 
 def _assert_no_immediate_repeats(words: List[str]) -> tuple[bool, int]:
@@ -37,14 +91,15 @@ def _calc_words_ok_for_accuracy(words_total: int, target_acc: float) -> Tuple[in
     return words_ok, typos
 
 
-def _simulate_level_with_targets(level_id: int, wpm_margin: float, acc_margin: float) -> tuple[RunStats, float, bool]:
+def _simulate_level_with_targets(level_id: int, wpm_margin: float, acc_margin: float,
+                                 rng: Optional[random.Random] = None) -> tuple[RunStats, float, bool]:
     """
     Simulate a run based on the level's true targets + margins.
     wpm_margin: how much above/below the target_wpm we aim (-5 for fail, +2 for pass, etc.)
     acc_margin: how much above the min_accuracy we aim (e.g., +0.03)
     """
     cfg = get_level(level_id)
-    sample = words_for_level(cfg, 40)  # just to compute realistic chars_ok
+    sample = words_for_level(cfg, 40, rng=rng)  # just to compute realistic chars_ok
 
     # Use a fixed words_total for stable numbers in results cards
     words_total = 20
@@ -66,53 +121,214 @@ def _simulate_level_with_targets(level_id: int, wpm_margin: float, acc_margin: f
     update_accuracy(stats)
     final_wpm = wpm_calc(chars_ok, seconds)
     did_pass = passed_level(cfg, stats, final_wpm)
+    return stats, final_wpm, did_pass
 
-    # Show a results card for visibility
-    results_card(f"SELFTEST L{cfg.id} — {cfg.name}", stats, final_wpm)
-    if did_pass:
-        toast("✅ Would pass. (Saving PB & unlocking for realism.)")
-        save_pb(cfg.id, final_wpm, stats.accuracy)
-    else:
-        toast("❌ Would NOT pass. (Fail path OK)")
-    print("")  # spacing
 
-    return stats, final_wpm, did_pass
+def _expect_level(ctx: CheckContext, level_id: int, wpm_margin: float, acc_margin: float,
+                  expect_pass: bool) -> str:
+    cfg = get_level(level_id)
+    stats, final_wpm, did_pass = _simulate_level_with_targets(level_id, wpm_margin, acc_margin, ctx.rng)
+    summary = f"L{cfg.id} {cfg.name}: {final_wpm:.1f} WPM @ {stats.accuracy*100:.1f}%"
+    if did_pass != expect_pass:
+        want = "PASS" if expect_pass else "FAIL"
+        raise CheckFailed(f"{summary} — expected {want}")
 
+    if did_pass:
+        # Save PB & unlock for realism, but only in this check's own profile
+        store = storage.load_store(ctx.profile_path)
+        storage.record_pb(store, cfg.id, final_wpm, stats.accuracy)
+        storage.unlock_next_level(store, cfg.id)
+        storage.save_store(store, ctx.profile_path)
+        saved = storage.load_store(ctx.profile_path)
+        if str(cfg.id) not in saved["pbs"] or not saved["unlocks"].get(str(next_level_id(cfg.id))):
+            raise CheckFailed(f"{summary} — PB/unlock did not persist")
+        return f"{summary} — passes, PB saved"
+    return f"{summary} — fails as expected"
 
-def run_self_tests(state: GameState) -> None:
-    print("\n=== SELF-TEST (auto) ===")
 
-    # ---- Test A: no immediate repeats on each level ----
-    print("\n[TEST A] Word generation: no immediate duplicate words")
-    all_ok = True
-    for lvl in range(1, 6):
+# ---------------------------------------------------------------------------
+# The checks
+# ---------------------------------------------------------------------------
+
+@check("A", "Word generation: no immediate duplicate words")
+def _check_no_repeats(ctx: CheckContext) -> str:
+    for lvl in sorted(LEVELS):
         cfg = get_level(lvl)
-        seq = words_for_level(cfg, 60)
+        seq = words_for_level(cfg, 60, rng=ctx.rng)
         ok, idx = _assert_no_immediate_repeats(seq)
-        mark = "PASS" if ok else f"FAIL (dup at i={idx}: '{seq[idx]}')"
-        print(f"  Level {lvl} — {cfg.name}: {mark}")
-        all_ok = all_ok and ok
-    if not all_ok:
-        toast("⚠ Word repeat test found issues.")
-    else:
-        toast("👍 No immediate repeats across levels.")
-    print("")
+        if not ok:
+            raise CheckFailed(f"Level {lvl} — {cfg.name}: dup at i={idx}: '{seq[idx]}'")
+    return f"{len(LEVELS)} levels x 60 words, no repeats"
+
+
+@check("B", "Simulated Level 1 — expect PASS (targets + small margins)")
+def _check_level1_pass(ctx: CheckContext) -> str:
+    return _expect_level(ctx, 1, wpm_margin=+2.0, acc_margin=+0.03, expect_pass=True)
+
+
+@check("C", "Simulated Level 2 — expect PASS (targets + small margins)")
+def _check_level2_pass(ctx: CheckContext) -> str:
+    return _expect_level(ctx, 2, wpm_margin=+2.0, acc_margin=+0.03, expect_pass=True)
 
-    # ---- Test B: Level 1 PASS (slightly above both targets) ----
-    print("[TEST B] Simulated Level 1 — expect PASS (targets + small margins)")
-    _simulate_level_with_targets(level_id=1, wpm_margin=+2.0, acc_margin=+0.03)
 
-    # ---- Test C: Level 2 PASS (targets + small margins) ----
-    print("[TEST C] Simulated Level 2 — expect PASS (targets + small margins)")
-    _simulate_level_with_targets(level_id=2, wpm_margin=+2.0, acc_margin=+0.03)
+@check("D", "Simulated Level 3 — expect FAIL (under target WPM)")
+def _check_level3_fail(ctx: CheckContext) -> str:
+    return _expect_level(ctx, 3, wpm_margin=-5.0, acc_margin=+0.05, expect_pass=False)
 
-    # ---- Test D: Level 3 FAIL (WPM under target; accuracy fine) ----
-    print("[TEST D] Simulated Level 3 — expect FAIL (under target WPM)")
-    _simulate_level_with_targets(level_id=3, wpm_margin=-5.0, acc_margin=+0.05)
 
-    toast("(Self-tests complete) Press Enter to return to menu")
+@check("E", "Save file: legacy 'acc' PBs migrate to 'accuracy'")
+def _check_migration(ctx: CheckContext) -> str:
+    ctx.profile_path.parent.mkdir(parents=True, exist_ok=True)
+    ctx.profile_path.write_text(json.dumps({"pbs": {"1": {"wpm": 20.0, "acc": 0.9}}}), encoding="utf-8")
+    store = storage.load_store(ctx.profile_path)
+    pb = store["pbs"]["1"]
+    if pb.get("accuracy") != 0.9 or "acc" in pb:
+        raise CheckFailed(f"PB not migrated: {pb}")
+    if not store["unlocks"].get("1"):
+        raise CheckFailed("defaults were not forward-merged")
+    return "acc -> accuracy, defaults merged"
+
+
+@check("F", "Input check: exact match only, first mismatch reported")
+def _check_input_rules(ctx: CheckContext) -> str:
+    cases = [
+        ("ping", "ping", (True, -1)),
+        ("ping", "pong", (False, 1)),
+        ("ping", "pin", (False, -1)),
+        ("ping", "pingg", (False, 4)),
+    ]
+    for target, typed, want in cases:
+        got = check_input(target, typed)
+        if got != want:
+            raise CheckFailed(f"check_input({target!r}, {typed!r}) = {got}, want {want}")
+    return f"{len(cases)} cases"
+
+
+@check("G", "Kiosk: profiles written back on eviction and on exit")
+def _check_kiosk(ctx: CheckContext) -> str:
+    from .kiosk import ProfileCache
+    root = ctx.profile_path.parent / "kiosk"
+    cache = ProfileCache(root, capacity=2)
+    for name in ("ana", "ben", "cy"):
+        cache.create(name)
+        storage.record_pb(cache.get(name), 1, 20.0, 0.9)
+        cache.mark_dirty(name)
+    if not (root / "ana" / "profile.json").is_file() or (root / "cy" / "profile.json").exists():
+        raise CheckFailed("expected only the evicted learner on disk before flush")
+    if cache.flush() != 2 or cache.writes != 3:
+        raise CheckFailed(f"flush wrote {cache.writes} profiles in total, want 3")
+    again = ProfileCache(root)
+    if again.index.rebuilt or again.index.recent()[0] != "cy":
+        raise CheckFailed(f"index not reused: {again.index.recent()}")
+    if again.get("Ana")["pbs"].get("1", {}).get("wpm") != 20.0:
+        raise CheckFailed("PB lost in write-back")
+    return "3 learners, cache of 2: 1 eviction write + 2 on flush, index reused"
+
+
+# ---------------------------------------------------------------------------
+# Runner + reporters
+# ---------------------------------------------------------------------------
+
+def _run_one(chk: Check, root: Path) -> CheckResult:
+    ctx = CheckContext(profile_path=root / chk.id / "profile.json", rng=random.Random(f"selftest:{chk.id}"))
+    t0 = time.perf_counter()
+    try:
+        msg = chk.fn(ctx)
+        passed = True
+    except CheckFailed as e:
+        msg, passed = str(e), False
+    except Exception:
+        msg, passed = traceback.format_exc(limit=3).strip(), False
+    return CheckResult(chk.id, chk.name, passed, time.perf_counter() - t0, msg)
+
+
+def run_checks(checks: Optional[List[Check]] = None, workers: Optional[int] = None) -> List[CheckResult]:
+    """Run checks in parallel against a temp profile dir; results keep CHECKS order."""
+    checks = CHECKS if checks is None else checks
+    with tempfile.TemporaryDirectory(prefix="timed_typer_selftest.") as tmp:
+        root = Path(tmp)
+        with ThreadPoolExecutor(max_workers=workers or max(1, len(checks))) as pool:
+            return list(pool.map(lambda c: _run_one(c, root), checks))
+
+
+def results_to_json(results: List[CheckResult], total_s: float) -> str:
+    return json.dumps({
+        "passed": all(r.passed for r in results),
+        "total_s": round(total_s, 6),
+        "checks": [asdict(r) for r in results],
+    }, ensure_ascii=False, indent=2)
+
+
+def results_to_junit(results: List[CheckResult], total_s: float) -> str:
+    failures = sum(1 for r in results if not r.passed)
+    suite = ET.Element("testsuite", name="timed_typer.selftest", tests=str(len(results)),
+                       failures=str(failures), errors="0", time=f"{total_s:.6f}")
+    for r in results:
+        case = ET.SubElement(suite, "testcase", classname="timed_typer.selftest",
+                             name=f"{r.id}: {r.name}", time=f"{r.duration_s:.6f}")
+        if not r.passed:
+            fail = ET.SubElement(case, "failure", message=r.message.splitlines()[0] if r.message else "failed")
+            fail.text = r.message
+    return ET.tostring(suite, encoding="unicode")
+
+
+def _format_line(r: CheckResult) -> str:
+    mark = "PASS" if r.passed else "FAIL"
+    return f"[TEST {r.id}] {mark} ({r.duration_s*1000:.1f} ms) {r.name} — {r.message.splitlines()[0] if r.message else ''}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--selftest` entry point. Exit code 0 = all checks passed, 1 = failures."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --selftest", description="Run the built-in self-tests.")
+    ap.add_argument("--json", metavar="FILE", help="write JSON results ('-' = stdout)")
+    ap.add_argument("--junit", metavar="FILE", help="write JUnit XML results")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("-k", metavar="TEXT", default=None, help="only run checks whose id/name contains TEXT")
+    args = ap.parse_args(argv)
+
+    checks = CHECKS
+    if args.k:
+        needle = args.k.lower()
+        checks = [c for c in CHECKS if needle in c.id.lower() or needle in c.name.lower()]
+
+    t0 = time.perf_counter()
+    results = run_checks(checks, workers=args.workers)
+    total_s = time.perf_counter() - t0
+
+    if args.json != "-":
+        for r in results:
+            print(_format_line(r))
+        n_ok = sum(1 for r in results if r.passed)
+        print(f"\n{n_ok}/{len(results)} checks passed in {total_s*1000:.1f} ms")
+    if args.json:
+        text = results_to_json(results, total_s)
+        if args.json == "-":
+            print(text)
+        else:
+            Path(args.json).write_text(text + "\n", encoding="utf-8")
+    if args.junit:
+        Path(args.junit).write_text(results_to_junit(results, total_s) + "\n", encoding="utf-8")
+
+    return 0 if all(r.passed for r in results) else 1
+
+
+def run_self_tests(state: GameState) -> None:
+    """Menu option [5]: same checks, printed on screen, then back to the menu."""
+    io = state.io
+    io.print("\n=== SELF-TEST (auto) ===")
+    t0 = time.perf_counter()
+    results = run_checks()
+    total_s = time.perf_counter() - t0
+    for r in results:
+        io.print(_format_line(r))
+    if all(r.passed for r in results):
+        toast(f"👍 All {len(results)} checks passed in {total_s*1000:.0f} ms.", io)
+    else:
+        toast("⚠ Some self-tests failed (see above).", io)
+
+    toast("(Self-tests complete) Press Enter to return to menu", io)
     try:
-        input()
+        io.input()
     except (KeyboardInterrupt, EOFError):
         pass
     state.set_screen(Screen.MENU)
@@ -0,0 +1,150 @@
+"""
+sequence.py — word sequences that are equally hard for everyone.
+
+words_for_level samples uniformly, so one 45 s run can be full of short
+easy words and the next full of `allow[udp]`. Here every sequence is built
+to hit the *expected* totals of the pool — characters and difficulty
+(difficulty.py) — not just at the end but for every prefix, so a player who
+gets through 17 words faces about the same load as anyone else's first 17.
+
+  greedy   for each slot draw CANDIDATES random words (never the previous
+           one) and keep the one that brings the running totals closest to
+           (slot+1) x the pool average. The random draw keeps variety;
+           the pick keeps the drift small.
+  repair   if the final totals are still outside TOLERANCE, swap single
+           words for the pool word that shrinks the error most (neighbours
+           respected) until they fit or nothing helps.
+
+A builder precomputes its pool's lengths/scores once (builder_for caches
+one per pool), so a 60-word level is a fraction of a millisecond and
+bulk() makes thousands of sequences for simulations. Builders work on
+vocabulary ids (vocab.py), so a sequence is an array('H'), 2 bytes a word.
+"""
+from __future__ import annotations
+
+import random
+from array import array
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .difficulty import score
+from .levels import LevelConfig
+from .vocab import VOCAB
+from .words import BASE_WORDS, _pool_for_level
+
+CANDIDATES = 3
+TOLERANCE = 0.02            # final chars / difficulty within ±2% of the target
+
+
+class SequenceBuilder:
+    """Works on vocabulary ids (vocab.py): sequences come out as array('H')."""
+
+    def __init__(self, pool: Sequence[str]) -> None:
+        # a full vocabulary (many pack reloads) drops new words instead of failing the level
+        self.pool = VOCAB.fit(pool) or VOCAB.encode(BASE_WORDS)
+        # id -> (chars, difficulty); looked up per candidate, so kept as a dict of ints
+        self.info = {i: (VOCAB.lens[i], score(VOCAB[i])) for i in self.pool}
+        n = len(self.pool) or 1
+        # uniform sampling over the pool list (duplicates count) -> expected per word
+        self.mean_chars = sum(self.info[i][0] for i in self.pool) / n
+        self.mean_diff = sum(self.info[i][1] for i in self.pool) / n
+        self.distinct = list(dict.fromkeys(self.pool))
+
+    def _err(self, chars: float, diff: float, slots: int) -> float:
+        # relative distance from the expected totals after *slots* words
+        tc = max(self.mean_chars * slots, 1e-9)
+        td = max(self.mean_diff * slots, 1e-9)
+        return abs(chars - tc) / tc + abs(diff - td) / td
+
+    def build_ids(self, n: int, rng: Optional[random.Random] = None) -> array:
+        """n word ids, no immediate repeats (if the pool has 2+ distinct words), totals balanced."""
+        rng = rng or random
+        pool, info = self.pool, self.info
+        out = array("H")
+        if n <= 0 or not pool:
+            return out
+        can_alternate = len(self.distinct) > 1
+        chars = diff = 0.0
+        prev = -1
+        for slot in range(1, n + 1):
+            best = -1
+            best_err = 0.0
+            for _ in range(CANDIDATES):
+                w = rng.choice(pool)
+                if w == prev and can_alternate:
+                    continue
+                c, d = info[w]
+                e = self._err(chars + c, diff + d, slot)
+                if best < 0 or e < best_err:
+                    best, best_err = w, e
+            if best < 0:        # every draw was the previous word
+                best = rng.choice([w for w in self.distinct if w != prev])
+            out.append(best)
+            c, d = info[best]
+            chars += c
+            diff += d
+            prev = best
+        self._repair(out, rng)
+        return out
+
+    def build(self, n: int, rng: Optional[random.Random] = None) -> List[str]:
+        """Same as build_ids, decoded to words."""
+        return VOCAB.decode(self.build_ids(n, rng))
+
+    def within_tolerance(self, seq: Sequence[int], tol: float = TOLERANCE) -> bool:
+        chars, diff = self.totals(seq)
+        n = len(seq)
+        return (abs(chars - self.mean_chars * n) <= max(1.0, tol * self.mean_chars * n)
+                and abs(diff - self.mean_diff * n) <= max(1.0, tol * self.mean_diff * n))
+
+    def totals(self, seq: Sequence[int]) -> Tuple[float, float]:
+        info = self.info
+        return (float(sum(info[i][0] for i in seq)), sum(info[i][1] for i in seq))
+
+    def _repair(self, seq: array, rng: random.Random, max_steps: int = 0) -> None:
+        n = len(seq)
+        steps = max_steps or 4 * n
+        info = self.info
+        chars, diff = self.totals(seq)
+        for _ in range(steps):
+            if self.within_tolerance(seq):
+                return
+            i = rng.randrange(n)
+            left = seq[i - 1] if i else -1
+            right = seq[i + 1] if i + 1 < n else -1
+            c0, d0 = info[seq[i]]
+            cur = self._err(chars, diff, n)
+            best, best_err = -1, cur
+            for w in self.distinct:
+                if w == left or w == right:
+                    continue
+                c, d = info[w]
+                e = self._err(chars - c0 + c, diff - d0 + d, n)
+                if e < best_err:
+                    best, best_err = w, e
+            if best >= 0:
+                c, d = info[best]
+                chars += c - c0
+                diff += d - d0
+                seq[i] = best
+
+    def bulk(self, count: int, n: int, seed: int = 0) -> Iterator[array]:
+        """*count* id sequences from one seeded stream (for simulations)."""
+        rng = random.Random(seed)
+        for _ in range(count):
+            yield self.build_ids(n, rng)
+
+
+@lru_cache(maxsize=256)
+def builder_for(pool: Tuple[str, ...]) -> SequenceBuilder:
+    return SequenceBuilder(pool)
+
+
+def balanced_ids_for_level(cfg: LevelConfig, n: int, rng: Optional[random.Random] = None) -> array:
+    """A balanced sequence as vocabulary ids — what play_level and the simulations use."""
+    return builder_for(tuple(_pool_for_level(cfg))).build_ids(n, rng)
+
+
+def balanced_words_for_level(cfg: LevelConfig, n: int, rng: Optional[random.Random] = None) -> List[str]:
+    """Drop-in for words.words_for_level with balanced characters and difficulty."""
+    return VOCAB.decode(balanced_ids_for_level(cfg, n, rng))
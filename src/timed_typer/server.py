@@ -0,0 +1,402 @@
+"""
+server.py — run typing sessions for a whole room from one machine.
+
+`--serve` starts an asyncio TCP server. Every connection is one player with
+their own RNG, stopwatch and RunStats; the rules are the same as play_level.
+Profiles live in <root>/<name>/profile.json and are saved through the
+storage layer on a worker thread, so a slow disk never stalls other players.
+
+Line protocol (UTF-8, one message per line, server replies with one line):
+
+  HELLO <name>        -> HI <name> <unlocked levels, e.g. 1,2,3>
+  PLAY <level>        -> LEVEL <id> <budget_s> <target_wpm> <min_acc> <first word>
+  <typed word>        -> OK <wpm> <acc> <secs left> <streak> <next word>
+                         MISS <pos> <wpm> <acc> <secs left> <same word>
+  :skip               -> SKIP <wpm> <acc> <secs left> <next word>
+  :q                  -> END ...   (ends the run early, no unlock)
+  (run over)          -> END <wpm> <acc> <words ok> <attempts> <typos> PASS|FAIL|QUIT
+  PBS                 -> PBS <level>:<wpm>/<acc> ...
+  QUIT                -> BYE
+  anything wrong      -> ERR <reason>
+
+`--loadtest` connects N bot clients to a server on localhost (or starts one
+in-process with --self) and reports per-message latency percentiles.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import re
+import socket
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import storage
+from .levels import LEVELS, LevelConfig
+from .play import _evaluate_attempt
+from .scoring import RunStats, passed_level, update_accuracy
+from .timing import Stopwatch, wpm
+from .sequence import balanced_ids_for_level
+from .vocab import VOCAB
+
+DEFAULT_PORT = 7777
+IDLE_TIMEOUT_S = 300.0
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]{1,32}$")
+
+
+def default_root() -> Path:
+    return storage.DEFAULT_PATH.parent / "room"
+
+
+class Session:
+    """One level run for one connection (play_level without the console)."""
+
+    def __init__(self, cfg: LevelConfig, rng: random.Random) -> None:
+        self.cfg = cfg
+        minutes = cfg.time_budget_s / 60.0
+        self.words = balanced_ids_for_level(cfg, max(20, math.ceil(cfg.target_wpm * minutes * 1.2)), rng=rng)
+        self.stats = RunStats()
+        self.streak = 0
+        self.i = 0
+        self.clock = Stopwatch()
+        self.clock.start()
+
+    @property
+    def word(self) -> str:
+        return VOCAB[self.words[self.i]]      # ids until they go on the wire
+
+    def _live(self) -> str:
+        s = self.stats
+        s.wpm_live = wpm(s.chars_ok, max(self.clock.seconds, 1e-6))
+        update_accuracy(s)
+        left = max(0, int(self.cfg.time_budget_s - self.clock.seconds))
+        return f"{s.wpm_live:.1f} {s.accuracy:.3f} {left}"
+
+    def over(self) -> bool:
+        return self.clock.seconds >= self.cfg.time_budget_s or self.i >= len(self.words)
+
+    def attempt(self, raw: str) -> str:
+        """Apply one typed line; returns the reply (without END — caller checks over())."""
+        if self.over():             # time ran out while they were typing
+            return ""
+        cmd = raw.lower()
+        if cmd in (":skip", ":s"):
+            self.stats.typos += 1
+            self.streak = 0
+            self.i += 1
+            return "" if self.over() else f"SKIP {self._live()} {self.word}"
+        self.stats.words_total += 1
+        tid = self.words[self.i]
+        if VOCAB.get(raw) == tid:
+            self.stats.words_ok += 1
+            self.stats.chars_ok += VOCAB.lens[tid]
+            self.streak += 1
+            self.i += 1
+            return "" if self.over() else f"OK {self._live()} {self.streak} {self.word}"
+        _complete, first_err = _evaluate_attempt(self.word, raw)
+        self.stats.typos += 1
+        self.streak = 0
+        return f"MISS {first_err + 1} {self._live()} {self.word}"
+
+    def finish(self, interrupted: bool) -> Tuple[float, bool, str]:
+        self.clock.stop()
+        final_wpm = wpm(self.stats.chars_ok, max(self.clock.seconds, 1e-6))
+        update_accuracy(self.stats)
+        passed = (not interrupted) and passed_level(self.cfg, self.stats, final_wpm)
+        s = self.stats
+        verdict = "QUIT" if interrupted else ("PASS" if passed else "FAIL")
+        return final_wpm, passed, (f"END {final_wpm:.1f} {s.accuracy:.3f} {s.words_ok} "
+                                   f"{s.words_total} {s.typos} {verdict}")
+
+
+class TypingServer:
+    def __init__(self, root: Path, seed: Optional[int] = None) -> None:
+        self.root = root
+        self.seed = seed
+        self._conn_no = 0
+        self._stores: Dict[str, dict] = {}             # name -> profile, shared by that name's connections
+        self._locks: Dict[str, asyncio.Lock] = {}      # name -> save lock
+        self._active: set = set()                       # handler tasks still running
+        self.sessions_done = 0
+
+    def _profile_path(self, name: str) -> Path:
+        return self.root / name / "profile.json"
+
+    async def _store_for(self, name: str) -> dict:
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name not in self._stores:
+                loop = asyncio.get_running_loop()
+                self._stores[name] = await loop.run_in_executor(None, storage.load_store, self._profile_path(name))
+            return self._stores[name]
+
+    async def _save_run(self, name: str, store: dict, level_id: int, final_wpm: float,
+                        session: Session, passed: bool) -> None:
+        # the lock keeps two connections with the same name from saving over each other
+        async with self._locks[name]:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, storage.record_run, store, level_id, final_wpm,
+                                       session.stats.accuracy, passed, session.stats,
+                                       self._profile_path(name))
+        self.sessions_done += 1
+
+    async def _is_unlocked(self, name: str, store: dict, level: str) -> bool:
+        async with self._locks[name]:
+            return bool(store.get("unlocks", {}).get(level))
+
+    async def wait_idle(self) -> None:
+        """Wait for every connection (and its pending save) to finish."""
+        while self._active:
+            await asyncio.gather(*self._active, return_exceptions=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._active.add(task)
+        task.add_done_callback(self._active.discard)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._conn_no += 1
+        rng = random.Random(None if self.seed is None else f"{self.seed}:{self._conn_no}")
+        name: Optional[str] = None
+        store: Optional[dict] = None
+        session: Optional[Session] = None
+        level_id = 0
+
+        def send(line: str) -> None:
+            writer.write(line.encode("utf-8") + b"\n")
+
+        async def end_run(interrupted: bool) -> None:
+            nonlocal session
+            final_wpm, passed, line = session.finish(interrupted)
+            send(line)
+            await writer.drain()        # player sees the result before the save starts
+            run, session = session, None
+            await self._save_run(name, store, level_id, final_wpm, run, passed)
+
+        # idle watchdog: a timer handle re-armed per message is far cheaper
+        # than wrapping every readline() in wait_for (which spawns a task)
+        loop = asyncio.get_running_loop()
+        idle = loop.call_later(IDLE_TIMEOUT_S, writer.close)
+        try:
+            while True:
+                try:
+                    data = await reader.readline()
+                except ValueError:          # line too long
+                    break
+                if not data:                # client left (or the watchdog closed us)
+                    break
+                idle.cancel()
+                idle = loop.call_later(IDLE_TIMEOUT_S, writer.close)
+                raw = data.decode("utf-8", "replace").strip()
+
+                if session is not None:
+                    if raw.lower() in (":q", ":menu", "quit", "exit"):
+                        await end_run(interrupted=True)
+                    elif not raw:
+                        send(f"ERR empty input (word: {session.word})")
+                    else:
+                        reply = session.attempt(raw)
+                        if reply:
+                            send(reply)
+                        if session.over():      # last word done or time up -> END
+                            await end_run(interrupted=False)
+                    await writer.drain()
+                    continue
+
+                verb, _, arg = raw.partition(" ")
+                verb = verb.upper()
+                if verb == "HELLO":
+                    if not _NAME_RE.match(arg):
+                        send("ERR name must be 1-32 of A-Z a-z 0-9 _ . -")
+                    else:
+                        name = arg
+                        store = await self._store_for(name)
+                        # another connection's record_run may be changing the store in a thread
+                        async with self._locks[name]:
+                            unlocked = ",".join(k for k in sorted(store.get("unlocks", {}), key=int)
+                                                if store["unlocks"][k])
+                        send(f"HI {name} {unlocked}")
+                elif verb == "PLAY":
+                    if store is None:
+                        send("ERR say HELLO first")
+                    elif not arg.isdigit() or int(arg) not in LEVELS:
+                        send(f"ERR level must be one of {','.join(map(str, LEVELS))}")
+                    elif not await self._is_unlocked(name, store, arg):
+                        send(f"ERR level {arg} is locked")
+                    else:
+                        level_id = int(arg)
+                        cfg = LEVELS[level_id]
+                        session = Session(cfg, rng)
+                        send(f"LEVEL {cfg.id} {cfg.time_budget_s} {cfg.target_wpm} "
+                             f"{cfg.min_accuracy} {session.word}")
+                elif verb == "PBS":
+                    if store is None:
+                        send("ERR say HELLO first")
+                    else:
+                        async with self._locks[name]:      # record_run may be mid-update in the executor
+                            pbs = store.get("pbs", {})
+                            line = "PBS " + " ".join(f"{k}:{v['wpm']:.1f}/{v['accuracy']:.3f}"
+                                                     for k, v in sorted(pbs.items(), key=lambda kv: int(kv[0])))
+                        send(line)
+                elif verb == "QUIT":
+                    send("BYE")
+                    await writer.drain()
+                    break
+                else:
+                    send("ERR unknown command")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            idle.cancel()
+            if session is not None and name is not None:
+                # dropped mid-run: keep the attempt like play_level does on Ctrl+C
+                try:
+                    final_wpm, passed, _ = session.finish(interrupted=True)
+                    await self._save_run(name, store, level_id, final_wpm, session, passed)
+                except Exception:
+                    pass
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return await asyncio.start_server(self.handle, host, port, backlog=1024)
+
+
+# ---------------------------------------------------------------------------
+# Load-testing client
+# ---------------------------------------------------------------------------
+
+async def _bot(host: str, port: int, name: str, level: int, miss_rate: float,
+               rng: random.Random, latencies: List[float]) -> str:
+    reader, writer = await asyncio.open_connection(host, port)
+    perf = time.perf_counter
+
+    async def ask(line: str) -> str:
+        t0 = perf()
+        writer.write(line.encode("utf-8") + b"\n")
+        await writer.drain()
+        reply = (await reader.readline()).decode("utf-8").strip()
+        latencies.append(perf() - t0)
+        return reply
+
+    try:
+        await ask(f"HELLO {name}")
+        reply = await ask(f"PLAY {level}")
+        if not reply.startswith("LEVEL"):
+            return reply
+        word = reply.rsplit(" ", 1)[1]
+        while True:
+            typed = word if rng.random() >= miss_rate else word[::-1] + "x"
+            reply = await ask(typed)
+            if reply.startswith("END"):
+                return reply
+            if not reply:
+                return "ERR connection closed"
+            if not reply.startswith(("OK", "MISS", "SKIP")):
+                return reply
+            word = reply.rsplit(" ", 1)[1]
+    finally:
+        writer.close()
+
+
+async def loadtest(host: str, port: int, clients: int, level: int = 1,
+                   miss_rate: float = 0.05, seed: int = 1, self_host: bool = False) -> dict:
+    server = None
+    tmp = None
+    if self_host:
+        tmp = tempfile.TemporaryDirectory(prefix="timed_typer_room.")
+        srv = TypingServer(Path(tmp.name), seed=seed)
+        server = await srv.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    latencies: List[float] = []
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        _bot(host, port, f"bot-{i}", level, miss_rate, random.Random(f"{seed}:{i}"), latencies)
+        for i in range(clients)), return_exceptions=True)
+    wall = time.perf_counter() - t0
+
+    if server is not None:
+        server.close()
+        await srv.wait_idle()           # let the last saves land before deleting the folder
+        await server.wait_closed()
+        tmp.cleanup()
+
+    ends = [r for r in results if isinstance(r, str) and r.startswith("END")]
+    errors = [r for r in results if not (isinstance(r, str) and r.startswith("END"))]
+    lat = sorted(latencies)
+
+    def pct(q: float) -> float:
+        return lat[min(len(lat) - 1, int(q * len(lat)))] * 1000 if lat else 0.0
+
+    return {
+        "clients": clients, "completed": len(ends), "errors": len(errors),
+        "first_error": repr(errors[0]) if errors else "",
+        "messages": len(lat), "wall_s": wall, "msg_per_s": len(lat) / wall if wall else 0.0,
+        "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "max_ms": pct(1.0),
+        "mean_ms": statistics.fmean(lat) * 1000 if lat else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def serve_main(argv: Optional[List[str]] = None) -> int:
+    """`--serve` entry point."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --serve", description="Multi-player typing server (line protocol).")
+    ap.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to accept the whole room")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--root", type=Path, default=None, help="profiles folder (default: <profile dir>/room)")
+    ap.add_argument("--seed", type=int, default=None, help="make word lists reproducible per connection")
+    args = ap.parse_args(argv)
+
+    srv = TypingServer(args.root or default_root(), seed=args.seed)
+
+    async def run() -> None:
+        server = await srv.start(args.host, args.port)
+        addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"Serving on {addrs} — profiles in {srv.root}  (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"\nStopped. {srv.sessions_done} run(s) saved.")
+    return 0
+
+
+def loadtest_main(argv: Optional[List[str]] = None) -> int:
+    """`--loadtest` entry point. Exit 1 if any client failed."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --loadtest", description="Hammer a local --serve instance.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--clients", type=int, default=200)
+    ap.add_argument("--level", type=int, default=1)
+    ap.add_argument("--miss-rate", type=float, default=0.05, help="share of deliberately wrong answers")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--self", dest="self_host", action="store_true",
+                    help="start a throwaway server in-process (temp profiles) instead of connecting to one")
+    args = ap.parse_args(argv)
+
+    r = asyncio.run(loadtest(args.host, args.port, max(1, args.clients), args.level,
+                             args.miss_rate, args.seed, args.self_host))
+    print(f"{r['completed']}/{r['clients']} runs completed, {r['errors']} error(s)")
+    if r["errors"]:
+        print(f"  first error: {r['first_error']}")
+    print(f"{r['messages']:,} messages in {r['wall_s']:.2f}s ({r['msg_per_s']:,.0f} msg/s)")
+    print(f"latency ms: p50 {r['p50_ms']:.2f}  p95 {r['p95_ms']:.2f}  p99 {r['p99_ms']:.2f}  "
+          f"max {r['max_ms']:.2f}  mean {r['mean_ms']:.2f}")
+    return 1 if r["errors"] else 0
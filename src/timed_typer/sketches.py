@@ -0,0 +1,225 @@
+"""
+sketches.py — small, mergeable summaries for streaming statistics.
+
+All of these use constant memory no matter how many values go in, and two
+of the same kind can be merged (e.g. one per history file, or one per
+worker process) into the summary you would have got from one big pass.
+
+  Moments         count / mean / variance / min / max   (Welford + Chan merge)
+  QuantileSketch  p50, p90, ... within ~1% relative error (log-spaced buckets)
+  Histogram       counts in fixed buckets (e.g. accuracy bands)
+  Trend           least-squares slope of y over x (e.g. WPM per day)
+  HeavyHitters    most frequent items of a huge stream (Misra-Gries, k counters)
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class Moments:
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other: "Moments") -> None:
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.min, self.max = other.n, other.mean, other.m2, other.min, other.max
+            return
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.mean += d * other.n / n
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Moments":
+        m = cls()
+        m.n, m.mean, m.m2, m.min, m.max = d["n"], d["mean"], d["m2"], d["min"], d["max"]
+        return m
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (the DDSketch idea): value x > 0 goes to
+    bucket ceil(log_gamma(x)), so any quantile comes back within `rel_err`
+    relative error. Bucket count only grows with log(max/min), so memory
+    is bounded (WPM 0.01..10^6 needs < 1000 buckets at 1%).
+    """
+    __slots__ = ("rel_err", "_gamma_log", "buckets", "zeros", "n")
+
+    def __init__(self, rel_err: float = 0.01) -> None:
+        self.rel_err = rel_err
+        self._gamma_log = math.log((1 + rel_err) / (1 - rel_err))
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0          # values <= 0 (e.g. 0 WPM runs)
+        self.n = 0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        if x <= 0:
+            self.zeros += 1
+            return
+        k = math.ceil(math.log(x) / self._gamma_log)
+        self.buckets[k] = self.buckets.get(k, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.rel_err != self.rel_err:
+            raise ValueError("can only merge sketches with the same rel_err")
+        self.n += other.n
+        self.zeros += other.zeros
+        for k, c in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + c
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return 0.0
+        rank = q * (self.n - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                # middle of the bucket (gamma^(k-1), gamma^k]
+                return 2 * math.exp(k * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return 2 * math.exp(max(self.buckets) * self._gamma_log) / (1 + math.exp(self._gamma_log))
+
+    def to_dict(self) -> dict:
+        return {"rel_err": self.rel_err, "zeros": self.zeros, "n": self.n,
+                "buckets": {str(k): c for k, c in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        s = cls(d["rel_err"])
+        s.zeros, s.n = d["zeros"], d["n"]
+        s.buckets = {int(k): c for k, c in d["buckets"].items()}
+        return s
+
+
+class Histogram:
+    """Counts per fixed bucket. edges=[a, b, c] gives buckets (<a), [a,b), [b,c), (>=c)."""
+    __slots__ = ("edges", "counts")
+
+    def __init__(self, edges: Sequence[float]) -> None:
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def add(self, x: float) -> None:
+        self.counts[bisect_right(self.edges, x)] += 1
+
+    def merge(self, other: "Histogram") -> None:
+        if other.edges != self.edges:
+            raise ValueError("can only merge histograms with the same edges")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+
+    def labels(self, fmt: str = "{:g}") -> List[str]:
+        e = [fmt.format(x) for x in self.edges]
+        return [f"<{e[0]}"] + [f"{a}–{b}" for a, b in zip(e, e[1:])] + [f"≥{e[-1]}"]
+
+
+class Trend:
+    """Streaming least-squares line through (x, y). Merge = add the sums."""
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def merge(self, other: "Trend") -> None:
+        self.n += other.n
+        self.sx += other.sx
+        self.sy += other.sy
+        self.sxx += other.sxx
+        self.sxy += other.sxy
+
+    @property
+    def slope(self) -> Optional[float]:
+        if self.n < 2:
+            return None
+        den = self.n * self.sxx - self.sx * self.sx
+        if abs(den) < 1e-12:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / den
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary with at most *capacity* counters. Every item that
+    makes up more than 1/(capacity+1) of the stream is guaranteed to be kept,
+    and each kept count is low by at most `error` (the total subtracted).
+
+    Updates are batched: add_counts() takes an exact Counter of a chunk and
+    then trims back to capacity by subtracting the (capacity+1)-th largest
+    count from everything — the standard mergeable form, so merging two
+    workers' summaries is the same operation.
+    """
+    __slots__ = ("capacity", "counts", "n", "error")
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.n = 0              # items seen
+        self.error = 0          # upper bound on how much any count is under-reported
+
+    def add_counts(self, counts: Mapping[str, int]) -> None:
+        c = self.counts
+        for item, k in counts.items():
+            c[item] = c.get(item, 0) + k
+            self.n += k
+        self._trim()
+
+    def _trim(self) -> None:
+        c = self.counts
+        if len(c) <= self.capacity:
+            return
+        cut = sorted(c.values(), reverse=True)[self.capacity]
+        self.error += cut
+        self.counts = {item: k - cut for item, k in c.items() if k > cut}
+
+    def merge(self, other: "HeavyHitters") -> None:
+        c = self.counts
+        for item, k in other.counts.items():
+            c[item] = c.get(item, 0) + k
+        self.n += other.n
+        self.error += other.error
+        self._trim()
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Up to k (item, estimated count), most frequent first; ties alphabetical."""
+        return sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
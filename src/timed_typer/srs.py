@@ -0,0 +1,131 @@
+"""
+srs.py — spaced repetition for the practice lanes.
+
+Every word the player practises gets a card (SM-2 style):
+  ease      how easy the word is for them (1.3 .. 2.8, lower = harder)
+  interval  attempts until it should come back
+  due       the attempt number when it is due again
+  reps / lapses   correct streak / times missed
+
+Time is a logical clock — one tick per attempt — so a card missed now comes
+back in a word or two, while one typed cleanly many times drifts further out.
+
+The scheduler keeps the cards of the current pool in a heap keyed by
+(due, ease): the top is the most overdue, hardest word. Grading a word
+pushes a fresh entry (O(log n)); the old one is left in place and skipped
+when it surfaces (lazy deletion), and the heap is rebuilt if stale entries
+pile up. Cards live in the profile under "srs":
+
+  "srs": {"clock": 1234, "cards": {"ping": [ease*100, interval, due, reps, lapses], ...}}
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, Iterable, List, Optional
+
+EASE_START = 250        # ease is stored x100 so cards stay plain ints in JSON
+EASE_MIN = 130
+EASE_MAX = 280
+
+
+class Scheduler:
+    def __init__(self, pool: Iterable[str], data: Optional[Dict[str, Any]] = None) -> None:
+        data = data if isinstance(data, dict) else {}
+        self.clock: int = int(data.get("clock", 0))
+        cards = data.get("cards")
+        # all cards ever seen (other levels' words too) — only the pool goes in the heap
+        self.cards: Dict[str, List[int]] = cards if isinstance(cards, dict) else {}
+        self.pool = list(dict.fromkeys(pool))
+        self._version: Dict[str, int] = {}
+        self._seq = 0
+        self._heap: List[tuple] = []
+        self._rebuild()
+
+    # ---- heap plumbing ----
+
+    def _card(self, word: str) -> List[int]:
+        c = self.cards.get(word)
+        if not (isinstance(c, list) and len(c) == 5):
+            # new word: due right now, average ease
+            c = self.cards[word] = [EASE_START, 0, self.clock, 0, 0]
+        return c
+
+    def _entry(self, word: str) -> tuple:
+        c = self._card(word)
+        self._seq += 1
+        self._version[word] = self._seq
+        return (c[2], c[0], self._seq, word)
+
+    def _rebuild(self) -> None:
+        self._version.clear()
+        self._heap = [self._entry(w) for w in self.pool]
+        heapq.heapify(self._heap)
+
+    def _valid(self, entry: tuple) -> bool:
+        return self._version.get(entry[3]) == entry[2]
+
+    def _pop_valid(self) -> Optional[tuple]:
+        heap = self._heap
+        while heap:
+            e = heapq.heappop(heap)
+            if self._valid(e):
+                return e
+        return None
+
+    # ---- public API ----
+
+    def next_word(self, prev: Optional[str] = None) -> str:
+        """The word the player most needs now (never *prev* if there is another)."""
+        first = self._pop_valid()
+        if first is None:
+            return ""
+        if first[3] != prev:
+            heapq.heappush(self._heap, first)   # stays queued until graded
+            return first[3]
+        second = self._pop_valid()
+        heapq.heappush(self._heap, first)
+        if second is None:
+            return first[3]
+        heapq.heappush(self._heap, second)
+        return second[3]
+
+    def grade(self, word: str, ok: bool) -> None:
+        """Record one attempt at *word* (ok = typed correctly; a skip counts as a miss)."""
+        self.clock += 1
+        c = self._card(word)
+        if ok:
+            c[3] += 1
+            c[1] = 1 if c[3] == 1 else (3 if c[3] == 2 else max(1, round(c[1] * c[0] / 100)))
+            c[0] = min(EASE_MAX, c[0] + 10)
+        else:
+            c[4] += 1
+            c[3] = 0
+            c[1] = 1
+            c[0] = max(EASE_MIN, c[0] - 20)
+        c[2] = self.clock + c[1]
+        if word in self._version:
+            heapq.heappush(self._heap, self._entry(word))
+            if len(self._heap) > 2 * len(self.pool) + 64:
+                self._rebuild()
+
+    def hardest(self, n: int = 5) -> List[str]:
+        """Pool words with the lowest ease (most missed first), for tips."""
+        seen = [w for w in self.pool if self.cards.get(w, [EASE_START, 0, 0, 0, 0])[4] > 0]
+        return heapq.nsmallest(n, seen, key=lambda w: (self.cards[w][0], -self.cards[w][4]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"clock": self.clock, "cards": self.cards}
+
+
+def scheduler_for(store: Dict[str, Any], pool: Iterable[str]) -> Scheduler:
+    """Scheduler over *pool* that shares (and writes back to) store["srs"]."""
+    data = store.get("srs")
+    if not isinstance(data, dict):
+        data = store["srs"] = {}
+    sched = Scheduler(pool, data)
+    data["cards"] = sched.cards      # same dict object: grading updates the store in place
+    return sched
+
+
+def save_into(store: Dict[str, Any], sched: Scheduler) -> None:
+    store["srs"] = sched.to_dict()
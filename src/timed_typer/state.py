@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from enum import Enum, auto
 from . import storage
+from .io_backend import ConsoleIO
 
 
 class Screen(Enum):
@@ -15,13 +16,22 @@ class Screen(Enum):
     DEMO = auto()
     REPORT = auto()
     ABOUT = auto()
+    PROFILES = auto()     # kiosk mode: pick / create a learner
     QUIT = auto()
 
 
 class GameState:
-    def __init__(self) -> None:
-        # which screen are we currently showing?
-        self.screen = Screen.MENU
+    def __init__(self, io=None, profiles=None) -> None:
+        # where screens read input / write output (see io_backend.py)
+        self.io = io or ConsoleIO()
+
+        # kiosk mode (kiosk.py): a ProfileCache of learners, else None = the one OS-user profile
+        self.profiles = profiles
+        self.profile_name = None
+        self.profile_path = storage.DEFAULT_PATH
+
+        # which screen are we currently showing? (kiosk mode asks "who's typing?" first)
+        self.screen = Screen.MENU if profiles is None else Screen.PROFILES
 
         # which level is selected for play() etc.
         self.current_level = 1
@@ -33,14 +43,34 @@ class GameState:
         self.stats = {}
 
         # persistent profile data (PBs, unlocks, settings)
-        # this is loaded from JSON on disk
-        self.store = storage.load_store()
+        # this is loaded from JSON on disk (kiosk: a blank store until a learner is picked)
+        self.store = storage.load_store() if profiles is None else storage.normalize_store({})
         self.unlocked = self.store.get("unlocks", {})
         self.pbs = self.store.get("pbs", {})
 
     def set_screen(self, next_screen: Screen) -> None:
         self.screen = next_screen
 
+    def use_profile(self, name: str) -> None:
+        """Kiosk mode: switch to learner *name* (from the cache when it is recent)."""
+        self.store = self.profiles.get(name)
+        self.profile_name = self.profiles.index.find(name)
+        self.profile_path = self.profiles.path_for(self.profile_name)
+        self.unlocked = self.store.get("unlocks", {})
+        self.pbs = self.store.get("pbs", {})
+
+    def save(self) -> None:
+        """Persist self.store: right away normally, on eviction / exit in kiosk mode."""
+        if self.profiles is not None:
+            self.profiles.mark_dirty(self.profile_name)
+        else:
+            storage.save_store(self.store, self.profile_path)
+
+    def close(self) -> None:
+        """End of the session: write back whatever the kiosk cache still holds."""
+        if self.profiles is not None:
+            self.profiles.flush()
+
     def level_is_unlocked(self, lvl: int) -> bool:
         # ask storage layer if this level is unlocked in the save file
         return bool(self.store.get("unlocks", {}).get(str(lvl), False))
@@ -51,6 +81,7 @@ class GameState:
         wpm: float,
         acc: float,
         passed: bool,
+        stats=None,
     ) -> None:
         """
         Called once at the end of play_level().
@@ -58,17 +89,13 @@ class GameState:
         - record/update PB for this level
         - if passed, unlock the next level
         - save progress to disk
+        - append the run to the history file (runs.jsonl)
         - refresh our cached view (self.unlocked, self.pbs)
         """
-        # update PB in memory
-        storage.record_pb(self.store, level_id, wpm, acc)
-
-        # unlock next level if the run "passed"
-        if passed:
-            storage.unlock_next_level(self.store, level_id)
-
-        # write JSON save file safely
-        storage.save_store(self.store)
+        storage.record_run(self.store, level_id, wpm, acc, passed, stats,
+                           path=self.profile_path, save=self.profiles is None)
+        if self.profiles is not None:
+            self.profiles.mark_dirty(self.profile_name)   # written back later (kiosk.py)
 
         # refresh cached views for menus
         self.unlocked = self.store.get("unlocks", {})
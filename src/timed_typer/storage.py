@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json, os, tempfile
+import json, marshal, os, tempfile, time
 from pathlib import Path
-from typing import Dict, Any
-from copy import deepcopy
+from typing import Dict, Any, Iterator
+
+from .metrics import SAVE_SECONDS
 
 APP_NAME = "TimedTyper"
 VERSION = "1.0"
@@ -30,6 +31,8 @@ DEFAULT_PATH = _profile_dir() / "profile.json"
 #          accuracy is stored 0.0–1.0, not percent.
 #   "unlocks": { "1": True, "2": True, ... }
 #   "settings": misc stuff like color mode etc.
+#   "ghosts": { "1": {"wpm": float, "t": b64, "c": b64}, ... }
+#          timeline of the fastest run per level (see ghost.py)
 DEFAULT_STORE: Dict[str, Any] = {
     "version": VERSION,
     "pbs": {},
@@ -37,13 +40,23 @@ DEFAULT_STORE: Dict[str, Any] = {
     "settings": {
         "seed": 42,
         "color": True,
+        "ghost": True,       # race against your best run in play_level
+        "practice_difficulty": [0, 100],   # practice only words in this band (difficulty.py)
     },
+    "ghosts": {},
+    "srs": {},               # spaced-repetition cards for practice (see srs.py)
+    "typos": {},             # confusion-matrix totals (see typo_stats.py)
 }
 
 
+# DEFAULT_STORE is plain dicts/lists/scalars, so a marshal round trip is a deep
+# copy — ~6x cheaper than copy.deepcopy, which adds up in bulk imports
+_DEFAULT_BLOB = marshal.dumps(DEFAULT_STORE)
+
+
 def _deepcopy_default() -> Dict[str, Any]:
     # fresh copy so we never mutate DEFAULT_STORE globally
-    return deepcopy(DEFAULT_STORE)
+    return marshal.loads(_DEFAULT_BLOB)
 
 
 def load_store(path: Path | None = None) -> Dict[str, Any]:
@@ -63,10 +76,21 @@ def load_store(path: Path | None = None) -> Dict[str, Any]:
     except Exception:
         # corrupt / unreadable -> start clean
         return _deepcopy_default()
+    return normalize_store(data)
 
-    # start with defaults, then merge user data
+
+def normalize_store(data: Any) -> Dict[str, Any]:
+    """
+    Turn whatever JSON came off disk into a well-formed store:
+    defaults forward-merged in, legacy "acc" PB keys upgraded.
+    Non-dict input gives a clean default store.
+    """
     store = _deepcopy_default()
-    for key in ("pbs", "unlocks", "settings", "version"):
+    if not isinstance(data, dict):
+        return store
+
+    # start with defaults, then merge user data
+    for key in ("pbs", "unlocks", "settings", "version", "ghosts", "srs", "typos"):
         if key in data:
             if isinstance(store.get(key), dict) and isinstance(data.get(key), dict):
                 store[key].update(data[key])
@@ -84,7 +108,7 @@ def load_store(path: Path | None = None) -> Dict[str, Any]:
     return store
 
 
-def save_store(store: Dict[str, Any], path: Path | None = None) -> None:
+def save_store(store: Dict[str, Any], path: Path | None = None, pretty: bool = True) -> None:
     """
     Safely write the current store dict to disk as JSON.
 
@@ -92,17 +116,26 @@ def save_store(store: Dict[str, Any], path: Path | None = None) -> None:
     That avoids half-written files if the game crashes mid-save.
     (Writing dicts to JSON files with json.dump is a common way to persist
     game state / progress in Python.)  # ref: json.dump usage :contentReference[oaicite:3]{index=3}
+
+    pretty=False writes compact JSON in one C-encoded dumps() call (indent
+    forces json's pure-Python encoder) — for bulk writers like
+    --import-profiles. The next normal save makes the file pretty again.
     """
     path = path or DEFAULT_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
 
     tmp_fd, tmp_name = tempfile.mkstemp(
         prefix="profile.", suffix=".json", dir=str(path.parent)
     )
     try:
         with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(store, f, ensure_ascii=False, indent=2)
+            if pretty:
+                json.dump(store, f, ensure_ascii=False, indent=2)
+            else:
+                f.write(json.dumps(store, ensure_ascii=False, separators=(",", ":")))
         os.replace(tmp_name, path)
+        SAVE_SECONDS.observe(time.perf_counter() - t0)
     finally:
         # best-effort cleanup if replace failed
         if os.path.exists(tmp_name):
@@ -112,6 +145,44 @@ def save_store(store: Dict[str, Any], path: Path | None = None) -> None:
                 pass
 
 
+def history_path(profile_path: Path | None = None) -> Path:
+    """Run history lives next to the profile: .../TimedTyper/runs.jsonl"""
+    return (profile_path or DEFAULT_PATH).with_name("runs.jsonl")
+
+
+def append_run(record: Dict[str, Any], path: Path | None = None) -> None:
+    """
+    Append one finished run to the history file (one JSON object per line).
+
+    History is append-only and kept out of profile.json on purpose: it can
+    grow to millions of runs, and the profile must stay tiny and fast to load.
+    """
+    path = path or history_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def iter_runs(path: Path | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream runs from a history file, one dict at a time (constant memory).
+    Missing file -> nothing. Corrupt lines are skipped, like load_store does.
+    """
+    path = path or history_path()
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict):
+                yield rec
+
+
 def record_pb(store: Dict[str, Any], level_id: int, wpm_val: float, acc_val: float) -> None:
     """
     Update personal best (PB) for a level in *store*.
@@ -150,11 +221,45 @@ def record_pb(store: Dict[str, Any], level_id: int, wpm_val: float, acc_val: flo
 def unlock_next_level(store: Dict[str, Any], just_cleared: int) -> None:
     """
     Mark the next level as unlocked in *store*.
-    Example: beat level 1 -> unlock "2".
+    Example: beat level 1 -> unlock "2"; with a pack starting at 10, beat 5 -> unlock "10".
     """
-    nxt = str(just_cleared + 1)
+    from .levels import next_level_id      # levels -> packs -> storage, so not at the top
+    nxt = next_level_id(just_cleared)
     store.setdefault("unlocks", {})
-    store["unlocks"][nxt] = True
+    if nxt is not None:
+        store["unlocks"][str(nxt)] = True
+
+
+def record_run(store: Dict[str, Any], level_id: int, wpm_val: float, acc_val: float,
+               passed: bool, stats: Any = None, path: Path | None = None, save: bool = True) -> None:
+    """
+    Everything that happens to the save when a level ends:
+      1. record/update the PB
+      2. unlock the next level if the run passed
+      3. save the profile (atomically)
+      4. append the run to the history file next to it
+    *stats* is an optional RunStats for the word/typo counts.
+    save=False skips step 3 for callers that write the profile later
+    themselves (kiosk mode's write-back cache).
+    """
+    path = path or DEFAULT_PATH
+    record_pb(store, level_id, wpm_val, acc_val)
+    if passed:
+        unlock_next_level(store, level_id)
+    if save:
+        save_store(store, path)
+
+    # one line per run for the analytics report
+    record = {
+        "ts": round(time.time(), 3),
+        "level": level_id,
+        "wpm": round(wpm_val, 2),
+        "accuracy": round(acc_val, 4),
+        "passed": bool(passed),
+    }
+    if stats is not None:
+        record.update(words_ok=stats.words_ok, words_total=stats.words_total, typos=stats.typos)
+    append_run(record, history_path(path))
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,152 @@
+"""
+teacher.py — the teacher batch (`--teacher` / `--batch`) as a small pipeline.
+
+  1. load     read the profile once
+  2. simulate demo runs for every level at the same time (own seeded RNG each)
+  3. report   REPORT.md is written while the simulations run
+  4. advise   coaching advice from the profile's PBs + the demo results in memory
+
+Nothing reads stdin, so the batch is safe for unattended use (scheduled tasks,
+CI). Wall time for each stage is printed at the end (report is timed on its
+own, even though it overlaps the simulations).
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import storage
+from .demo import _simulate_core
+from .levels import LEVELS, LevelConfig
+from .report import export_default_report
+from .scoring import passed_level
+from .sequence import balanced_ids_for_level
+
+DEFAULT_SPEED = 1.05
+DEFAULT_ACC = 0.92
+
+
+@dataclass
+class DemoResult:
+    level: int
+    name: str
+    wpm: float
+    accuracy: float
+    words_ok: int
+    typos: int
+    passed: bool
+
+
+@dataclass
+class TeacherResult:
+    demos: List[DemoResult]
+    report_path: Path
+    report_written: bool
+    advice: List[str]
+    stage_s: Dict[str, float] = field(default_factory=dict)
+
+
+def simulate_level(cfg: LevelConfig, speed: float, acc: float, seed: int) -> DemoResult:
+    """One silent demo run. Same engine as --demo, but no HUD and no prompt."""
+    rng = random.Random(f"{seed}:{cfg.id}")
+    minutes = cfg.time_budget_s / 60.0
+    seq = balanced_ids_for_level(cfg, max(20, int(cfg.target_wpm * minutes * 1.4)), rng=rng)
+    stats, final_wpm = _simulate_core(cfg, seq, cfg.target_wpm * speed, acc, rng=rng)
+    return DemoResult(cfg.id, cfg.name, final_wpm, stats.accuracy, stats.words_ok, stats.typos,
+                      passed_level(cfg, stats, final_wpm))
+
+
+def _needs(cfg: LevelConfig, wpm_val: float, acc_val: float, slack: float = 0.5) -> str:
+    gap_wpm = cfg.target_wpm - wpm_val
+    gap_acc = (cfg.min_accuracy*100) - (acc_val*100)
+    need = []
+    if gap_wpm > slack: need.append(f"+{gap_wpm:.1f} WPM")
+    if gap_acc > slack: need.append(f"+{gap_acc:.0f}% Acc")
+    return "OK" if not need else "Needs " + " & ".join(need)
+
+
+def coaching_advice(store: dict, demos: Iterable[DemoResult] = ()) -> List[str]:
+    """
+    PB gaps per level, plus how this batch's demo did there, e.g.
+    "- DNS: Needs +3.2 WPM & +2% Acc (demo: 26.1 WPM, 93% — OK)".
+    """
+    pbs = store.get("pbs", {})
+    by_level = {d.level: d for d in demos}
+    out: List[str] = []
+    for lvl, cfg in LEVELS.items():
+        pb = pbs.get(str(lvl))
+        line = f"- {cfg.name}: " + (_needs(cfg, pb["wpm"], pb["accuracy"]) if pb else "No PB recorded yet.")
+        d = by_level.get(lvl)
+        if d is not None:
+            line += f" (demo: {d.wpm:.1f} WPM, {d.accuracy*100:.0f}% — {_needs(cfg, d.wpm, d.accuracy, 0.0)})"
+        out.append(line)
+    return out
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    t = time.perf_counter()
+    return fn(*args), time.perf_counter() - t
+
+
+def run_teacher_batch(speed: float = DEFAULT_SPEED, acc: float = DEFAULT_ACC,
+                      seed: Optional[int] = None, workers: Optional[int] = None) -> TeacherResult:
+    stage: Dict[str, float] = {}
+    t_all = time.perf_counter()
+
+    t = time.perf_counter()
+    store = storage.load_store()
+    if seed is None:
+        seed = int(store.get("settings", {}).get("seed", 42))
+    stage["load"] = time.perf_counter() - t
+
+    levels = list(LEVELS.values())
+    with ThreadPoolExecutor(max_workers=workers or len(levels) + 1) as pool:
+        t = time.perf_counter()
+        report_fut = pool.submit(_timed, export_default_report, store)
+        sim_futs = [pool.submit(simulate_level, cfg, speed, acc, seed) for cfg in levels]
+        demos = [f.result() for f in sim_futs]
+        stage["simulate"] = time.perf_counter() - t
+        (report_path, written), stage["report"] = report_fut.result()   # its own time, not since t
+
+    t = time.perf_counter()
+    advice = coaching_advice(store, demos)
+    stage["advise"] = time.perf_counter() - t
+    stage["total"] = time.perf_counter() - t_all
+    return TeacherResult(demos, report_path, written, advice, stage)
+
+
+def format_result(res: TeacherResult, speed: float, acc: float) -> str:
+    lines = ["== Teacher batch: demos + report ==",
+             f"Demos @{speed:.2f}x target speed, {acc:.2f} hit chance", "",
+             f"{'Level':<16} {'WPM':>6} {'Acc':>6} {'OK':>4} {'Typos':>6}  Result"]
+    for d in res.demos:
+        lines.append(f"{f'L{d.level} {d.name}':<16} {d.wpm:>6.1f} {d.accuracy*100:>5.0f}% "
+                     f"{d.words_ok:>4} {d.typos:>6}  {'meets targets' if d.passed else 'below target'}")
+    lines.append("")
+    lines.append(f"Report {'written' if res.report_written else 'unchanged'}: {res.report_path}")
+    lines.append("")
+    lines.append("== Coaching Advice ==")
+    lines.extend(res.advice)
+    lines.append("")
+    lines.append("Stage times: " + ", ".join(f"{k} {v*1000:.1f} ms" for k, v in res.stage_s.items()))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`--teacher` / `--batch` entry point."""
+    ap = argparse.ArgumentParser(prog="TimedTyper --teacher", description="Demos for every level + report + advice.")
+    ap.add_argument("--speed", type=float, default=DEFAULT_SPEED, help="demo speed vs target WPM (default 1.05)")
+    ap.add_argument("--acc", type=float, default=DEFAULT_ACC, help="demo hit chance 0..1 (default 0.92)")
+    ap.add_argument("--seed", type=int, default=None, help="default: the profile's seed setting")
+    args = ap.parse_args(argv)
+
+    speed = DEFAULT_SPEED if args.speed <= 0 else args.speed
+    acc = min(1.0, max(0.0, args.acc))
+    res = run_teacher_batch(speed, acc, args.seed)
+    print(format_result(res, speed, acc))
+    return 0
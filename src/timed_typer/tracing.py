@@ -0,0 +1,100 @@
+"""
+tracing.py — how long the game itself takes between Enter and the next prompt.
+
+play_level marks each stage of the per-word loop:
+
+  eval    check_input + stats/typo/ghost bookkeeping for the typed word
+  toast   the feedback line (mismatch / help / empty input), when there is one
+  stats   live WPM, accuracy and ghost position for the HUD
+  render  render_hud
+  total   Enter pressed (input returned) -> HUD redrawn, ready for the next word
+
+Spans are stored as (stage id, nanoseconds) in two preallocated arrays used
+as a ring, so recording one is a perf_counter_ns() call and two stores — no
+allocation, no dict, no list growth inside the loop. At the end of the run
+the buffer is summarised as per-stage percentiles.
+
+The summary is printed after the results card when TIMED_TYPER_TRACE=1 or
+settings.trace is true. If the p99 of "total" ever goes over
+LATENCY_BUDGET_MS a warning is shown regardless, because that is the game
+getting in the way of the player's typing.
+"""
+from __future__ import annotations
+
+import os
+from array import array
+from math import ceil
+from time import perf_counter_ns
+from typing import Any, Dict, List, Tuple
+
+ENV_VAR = "TIMED_TYPER_TRACE"
+STAGES = ("eval", "toast", "stats", "render", "total")
+EVAL, TOAST, STATS, RENDER, TOTAL = range(len(STAGES))
+CAPACITY = 4096             # ~800 words of spans; older ones are overwritten after that
+LATENCY_BUDGET_MS = 16.0    # one frame at 60 Hz — below anything a typist can notice
+
+now = perf_counter_ns
+
+
+class Tracer:
+    __slots__ = ("stage", "dur", "n", "cap")
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self.cap = capacity
+        self.stage = array("B", bytes(capacity))
+        self.dur = array("q", bytes(8 * capacity))
+        self.n = 0
+
+    def end(self, stage: int, t0: int) -> int:
+        """Close a span started at *t0* (from now()); returns the end time to chain the next one."""
+        t = perf_counter_ns()
+        i = self.n % self.cap
+        self.stage[i] = stage
+        self.dur[i] = t - t0
+        self.n += 1
+        return t
+
+    def add(self, stage: int, ns: int) -> None:
+        """Record a span measured elsewhere (e.g. "total", which spans several stages)."""
+        i = self.n % self.cap
+        self.stage[i] = stage
+        self.dur[i] = ns
+        self.n += 1
+
+    def durations(self, stage: int) -> List[int]:
+        k = min(self.n, self.cap)
+        st = self.stage
+        return sorted(d for i, d in enumerate(self.dur[:k]) if st[i] == stage)
+
+    def summary(self) -> Dict[str, Tuple[int, float, float, float, float]]:
+        """stage -> (count, p50, p95, p99, max) in milliseconds; stages never seen are left out."""
+        out = {}
+        for sid, name in enumerate(STAGES):
+            d = self.durations(sid)
+            if d:
+                out[name] = (len(d), _pct(d, 50) / 1e6, _pct(d, 95) / 1e6, _pct(d, 99) / 1e6, d[-1] / 1e6)
+        return out
+
+
+def _pct(sorted_vals: List[int], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    k = max(1, ceil(p / 100 * len(sorted_vals)))
+    return sorted_vals[k - 1]
+
+
+def enabled(store: Dict[str, Any]) -> bool:
+    if os.environ.get(ENV_VAR, "").strip() not in ("", "0"):
+        return True
+    return bool(store.get("settings", {}).get("trace", False))
+
+
+def over_budget(summary: Dict[str, Tuple[int, float, float, float, float]]) -> bool:
+    total = summary.get("total")
+    return total is not None and total[3] > LATENCY_BUDGET_MS
+
+
+def summary_lines(summary: Dict[str, Tuple[int, float, float, float, float]]) -> List[str]:
+    lines = [f"{'stage':<7} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)"]
+    for name, (n, p50, p95, p99, mx) in summary.items():
+        lines.append(f"{name:<7} {n:>5} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {mx:>8.3f}")
+    return lines
@@ -0,0 +1,320 @@
+"""
+transfer.py — move a whole class's progress between machines in one file.
+
+  python run_timed_typer.py --export-profiles class.jsonl.gz [--root DIR]
+  python run_timed_typer.py --import-profiles class.jsonl.gz [--root DIR] [--workers N]
+
+One learner per line (".gz" = gzip), the same folders kiosk mode uses:
+
+  {"name": "alice", "profile": {"pbs": {...}, "unlocks": {...}, ...}}
+
+Both directions stream: export writes a line per profile as it reads it,
+import reads a batch of lines at a time, so memory does not grow with the
+size of the class.
+
+Import runs one worker process per partition. The parent only pulls the
+name out of each line, settles its spelling (names are case-insensitive, as
+in kiosk mode: "Alice" in the file merges into an existing "alice") and
+hashes it to a partition; the same learner always lands on the same worker,
+so two lines for one learner can never be saved over each other. Workers
+send back the names they actually imported, and only those enter the kiosk
+index. Batches travel over bounded queues — a slow disk makes the
+parent wait instead of piling lines up in memory.
+
+Every incoming profile goes through storage.normalize_store (defaults
+merged in, legacy "acc" PBs upgraded), then into what is already on disk:
+
+  pbs       best wpm and best accuracy per level (storage.record_pb rules)
+  unlocks   union — a level unlocked on either machine stays unlocked
+  ghosts    the faster ghost per level
+  the rest  settings, srs, typos: the local copy wins; keys it lacks come in
+
+so importing the same file twice changes nothing the second time.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import multiprocessing as mp
+import os
+import queue
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from . import storage
+from .kiosk import ProfileIndex, _valid_name, default_root
+
+BATCH_LINES = 500
+QUEUE_DEPTH = 4                 # batches in flight per worker
+POLL_S = 1.0                    # how often a waiting parent checks that its workers are alive
+_NAME_FIELD = re.compile(rb'\s*\{\s*"name"\s*:\s*"([A-Za-z0-9_.-]{1,32})"')     # how export_profiles writes it
+
+
+def _open(path: Path, mode: str, gz: Optional[bool] = None) -> IO[bytes]:
+    if path.suffix == ".gz" if gz is None else gz:
+        return gzip.open(path, mode + "b", compresslevel=5)
+    return open(path, mode + "b")
+
+
+# ---------- merge ----------
+
+def merge_profiles(local: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a normalized *incoming* store into *local* (in place) and return it."""
+    for lvl, pb in incoming.get("pbs", {}).items():
+        if isinstance(pb, dict) and lvl.isdigit():
+            storage.record_pb(local, int(lvl), float(pb.get("wpm", 0.0)), float(pb.get("accuracy", 0.0)))
+    unlocks = local.setdefault("unlocks", {})
+    for lvl, on in incoming.get("unlocks", {}).items():
+        if on:
+            unlocks[lvl] = True
+    ghosts = local.setdefault("ghosts", {})
+    for lvl, g in incoming.get("ghosts", {}).items():
+        mine = ghosts.get(lvl)
+        if isinstance(g, dict) and (not isinstance(mine, dict) or g.get("wpm", 0) > mine.get("wpm", 0)):
+            ghosts[lvl] = g
+    for key in ("settings", "srs", "typos"):
+        mine, theirs = local.get(key), incoming.get(key)
+        if isinstance(mine, dict) and isinstance(theirs, dict):
+            for k, v in theirs.items():
+                mine.setdefault(k, v)
+    return local
+
+
+def _pb_ok(pb: Any) -> bool:
+    return (isinstance(pb, dict) and all(isinstance(pb.get(k), (int, float)) and not isinstance(pb.get(k), bool)
+                                         for k in ("wpm", "accuracy")))
+
+
+def _import_line(root: Path, line: bytes, folder: Optional[str]) -> str:
+    """
+    One JSONL line -> "new" / "merged" / "bad". *folder* is the learner's
+    settled spelling (from the parent), used instead of the line's own casing.
+    """
+    if folder is None:
+        return "bad"
+    try:
+        rec = json.loads(line)
+        name = rec["name"]
+        profile = rec["profile"]
+    except Exception:               # incl. RecursionError from [[[[...]]]]
+        return "bad"
+    if (not isinstance(name, str) or not _valid_name(name) or name.lower() != folder.lower()
+            or not isinstance(profile, dict)):
+        return "bad"
+    path = root / folder / "profile.json"
+    try:
+        incoming = storage.normalize_store(profile)
+        if not isinstance(incoming["pbs"], dict) or not all(map(_pb_ok, incoming["pbs"].values())):
+            return "bad"
+        if path.exists():
+            store = merge_profiles(storage.load_store(path), incoming)
+            how = "merged"
+        else:
+            store, how = incoming, "new"
+        storage.save_store(store, path, pretty=False)
+    except Exception:
+        return "bad"        # e.g. "wpm": "fast" or a read-only folder; a worker must never die mid-file
+    return how
+
+
+def _worker(root: str, inbox: "mp.Queue", outbox: "mp.Queue") -> None:
+    counts = {"new": 0, "merged": 0, "bad": 0}
+    accepted: List[str] = []
+    base = Path(root)
+    try:
+        while True:
+            batch = inbox.get()
+            if batch is None:
+                break
+            for folder, line in batch:
+                how = _import_line(base, line, folder)
+                counts[how] += 1
+                if how != "bad":
+                    accepted.append(folder)
+    finally:
+        outbox.put((counts, accepted))      # the parent waits for exactly one of these per worker
+
+
+# ---------- import ----------
+
+def _send(q: "mp.Queue", item: Any, proc: Any) -> None:
+    """q.put that gives up (RuntimeError) instead of waiting forever on a dead worker."""
+    while True:
+        try:
+            q.put(item, timeout=POLL_S)
+            return
+        except queue.Full:
+            if not proc.is_alive():
+                raise RuntimeError("import worker died") from None
+
+
+def _collect(outbox: "mp.Queue", procs: List[Any]) -> Iterator[Tuple[Dict[str, int], List[str]]]:
+    """One (counts, accepted names) per worker; stops early when the remaining workers are gone."""
+    pending = len(procs)
+    while pending:
+        try:
+            yield outbox.get(timeout=POLL_S)
+            pending -= 1
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                while pending:          # results may still be in the pipe after the exit
+                    try:
+                        yield outbox.get(timeout=POLL_S)
+                    except queue.Empty:
+                        return
+                    pending -= 1
+
+
+def _lines(path: Path) -> Iterator[bytes]:
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def _name_of(line: bytes) -> Optional[str]:
+    m = _NAME_FIELD.match(line)        # cheap: the workers do the real parse
+    if m:
+        return m.group(1).decode("ascii")
+    try:                                # hand-made file with the keys in another order
+        name = json.loads(line).get("name")
+    except Exception:                   # not JSON, not an object, nested too deep...
+        return None
+    return name if isinstance(name, str) and _valid_name(name) else None
+
+
+def import_profiles(src: Path, root: Optional[Path] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    """Merge every profile in *src* into *root*. Returns counts: new / merged / bad / total."""
+    root = root or default_root()
+    root.mkdir(parents=True, exist_ok=True)
+    index = ProfileIndex(root)
+    workers = max(1, workers or os.cpu_count() or 1)
+    counts = {"new": 0, "merged": 0, "bad": 0}
+    seen: Dict[str, str] = {}       # lower-case -> spelling, for names not in the index yet
+
+    def _settle(name: Optional[str]) -> Optional[str]:
+        # one folder per learner however the file spells them; the index's spelling wins
+        if name is None:
+            return None
+        return index.find(name) or seen.setdefault(name.lower(), name)
+
+    def _accept(names: List[str]) -> None:
+        for name in names:
+            if index.find(name) is None:
+                index.add(name)
+
+    if workers == 1:
+        for line in _lines(src):
+            folder = _settle(_name_of(line))
+            how = _import_line(root, line, folder)
+            counts[how] += 1
+            if how != "bad":
+                _accept([folder])
+    else:
+        ctx = mp.get_context("spawn")      # same behaviour on Windows and Linux
+        inboxes = [ctx.Queue(QUEUE_DEPTH) for _ in range(workers)]
+        outbox = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(str(root), q, outbox), daemon=True) for q in inboxes]
+        for p in procs:
+            p.start()
+        batches: List[List[Tuple[Optional[str], bytes]]] = [[] for _ in range(workers)]
+        try:
+            for line in _lines(src):
+                folder = _settle(_name_of(line))
+                # crc32, not hash(): str hashes are salted per process
+                part = zlib.crc32(folder.lower().encode("ascii")) % workers if folder else 0
+                b = batches[part]
+                b.append((folder, line))
+                if len(b) >= BATCH_LINES:
+                    _send(inboxes[part], b, procs[part])   # waits while that worker is QUEUE_DEPTH behind
+                    batches[part] = []
+        finally:
+            dead = 0
+            for q, b, p in zip(inboxes, batches, procs):
+                try:
+                    if b:
+                        _send(q, b, p)
+                    _send(q, None, p)
+                except RuntimeError:
+                    dead += 1
+            for part, accepted in _collect(outbox, procs):
+                for k, v in part.items():
+                    counts[k] += v
+                _accept(accepted)
+            for p in procs:
+                p.join(POLL_S)
+        if dead or any(p.exitcode for p in procs):
+            raise RuntimeError("an import worker died; some lines may not have been imported")
+    index.save()
+    counts["total"] = counts["new"] + counts["merged"] + counts["bad"]
+    return counts
+
+
+# ---------- export ----------
+
+def export_profiles(dst: Path, root: Optional[Path] = None) -> int:
+    """Write every learner under *root* (names from the kiosk index) to *dst*. Returns the count."""
+    root = root or default_root()
+    index = ProfileIndex(root)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".part")
+    n = 0
+    with _open(tmp, "w", gz=dst.suffix == ".gz") as f:
+        for name in sorted(index.entries):
+            path = root / name / "profile.json"
+            if not path.is_file():
+                continue
+            store = storage.load_store(path)        # normalized on the way out too
+            f.write(json.dumps({"name": name, "profile": store}, ensure_ascii=False,
+                               separators=(",", ":")).encode("utf-8") + b"\n")
+            n += 1
+    os.replace(tmp, dst)
+    index.save()        # keeps a freshly rebuilt index
+    return n
+
+
+# ---------- CLI ----------
+
+def _parser(prog: str, what: str) -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog=f"TimedTyper {prog}", description=what)
+    ap.add_argument("file", type=Path, help=".jsonl or .jsonl.gz")
+    ap.add_argument("--root", type=Path, default=None, help="learner folders (default: <profile dir>/kiosk)")
+    return ap
+
+
+def export_main(argv: Optional[List[str]] = None) -> int:
+    """`--export-profiles` entry point."""
+    args = _parser("--export-profiles", "Write every learner profile to one JSONL file.").parse_args(argv)
+    t0 = time.perf_counter()
+    try:
+        n = export_profiles(args.file, args.root)
+    except OSError as e:
+        print(f"Error: {e}")
+        return 2
+    dt = time.perf_counter() - t0
+    print(f"Exported {n:,} profiles to {args.file} in {dt:.2f}s ({n / max(dt, 1e-9):,.0f}/s)")
+    return 0
+
+
+def import_main(argv: Optional[List[str]] = None) -> int:
+    """`--import-profiles` entry point. Exit 1 if some lines could not be used."""
+    ap = _parser("--import-profiles", "Merge learner profiles from a JSONL file (best PBs, union of unlocks).")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = ap.parse_args(argv)
+    if not args.file.is_file():
+        print(f"Error: not a file: {args.file}")
+        return 2
+    t0 = time.perf_counter()
+    try:
+        c = import_profiles(args.file, args.root, args.workers)
+    except (OSError, EOFError, zlib.error, RuntimeError) as e:
+        print(f"Error: {e}")
+        return 2
+    dt = time.perf_counter() - t0
+    print(f"Imported {c['total']:,} lines in {dt:.2f}s ({c['total'] / max(dt, 1e-9):,.0f}/s): "
+          f"{c['new']:,} new, {c['merged']:,} merged, {c['bad']:,} skipped")
+    return 1 if c["bad"] else 0
@@ -0,0 +1,147 @@
+"""
+typo_stats.py — which characters get confused, and where in the word.
+
+For every missed attempt we look at the FIRST wrong character (the one
+check_input reports) and count the pair (expected, typed) in a 96 x 96
+matrix: printable ASCII 32..126 plus one slot NONE for "nothing there"
+(word cut short, or extra letters past the end). A second small array
+counts errors by position in the word. Both are flat array('I') counters,
+so an update is one index computation and one increment.
+
+The profile keeps the lifetime totals sparsely (only non-zero pairs):
+
+  "typos": {"attempts": 812, "misses": 64,
+            "pairs": [["e", "r", 9], ["t", "", 4], ...],   # expected, typed ("" = NONE), count
+            "pos": [12, 20, 9, ...]}               # misses by letter position
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+_FIRST = 32                 # " "
+_N_PRINT = 95               # " " .. "~"
+NONE = _N_PRINT             # index for "no character"
+N = _N_PRINT + 1
+MAX_POS = 16                # positions >= 16 share the last bucket
+
+
+def _idx(ch: Optional[str]) -> int:
+    if ch is None:
+        return NONE
+    i = ord(ch) - _FIRST
+    return i if 0 <= i < _N_PRINT else NONE
+
+
+def _ch(i: int) -> str:
+    return "" if i == NONE else chr(i + _FIRST)
+
+
+def _cell_of(row: Any) -> Optional[int]:
+    """["e", "r", 9] -> matrix cell, None if the row is malformed."""
+    if not (isinstance(row, list) and len(row) == 3 and isinstance(row[0], str)
+            and isinstance(row[1], str) and isinstance(row[2], int)
+            and len(row[0]) <= 1 and len(row[1]) <= 1):
+        return None
+    return _idx(row[0] or None) * N + _idx(row[1] or None)
+
+
+class TypoStats:
+    __slots__ = ("matrix", "pos", "attempts", "misses", "_touched")
+
+    def __init__(self) -> None:
+        self.matrix = array("I", bytes(4 * N * N))
+        self._touched: set = set()      # non-zero cells, so merges/summaries skip the zeros
+        self.pos = array("I", bytes(4 * MAX_POS))
+        self.attempts = 0
+        self.misses = 0
+
+    def add_ok(self) -> None:
+        self.attempts += 1
+
+    def add_miss(self, target: str, typed: str, first_err: int) -> None:
+        """first_err from check_input (-1 = typed is a short prefix of target)."""
+        self.attempts += 1
+        self.misses += 1
+        p = first_err if first_err >= 0 else len(typed)
+        exp = target[p] if p < len(target) else None
+        got = typed[p] if p < len(typed) else None
+        cell = _idx(exp) * N + _idx(got)
+        self.matrix[cell] += 1
+        self._touched.add(cell)
+        self.pos[p if p < MAX_POS else MAX_POS - 1] += 1
+
+    # ---- summaries ----
+
+    def top_pairs(self, n: int = 5) -> List[Tuple[str, str, int]]:
+        """Most common (expected, typed, count), biggest first."""
+        m = self.matrix
+        nz = sorted(((m[i], i) for i in self._touched), reverse=True)
+        return [(_ch(i // N), _ch(i % N), c) for c, i in nz[:n]]
+
+    # ---- profile (sparse) ----
+
+    def merge_into(self, store: Dict[str, Any]) -> None:
+        """Add this run's counts to store["typos"]; only touched pairs are written."""
+        t = store.get("typos")
+        if not isinstance(t, dict):
+            t = store["typos"] = {}
+        t["attempts"] = int(t.get("attempts", 0)) + self.attempts
+        t["misses"] = int(t.get("misses", 0)) + self.misses
+        counts: Dict[int, int] = {}
+        for row in t.get("pairs") or []:
+            cell = _cell_of(row)
+            if cell is not None:
+                counts[cell] = counts.get(cell, 0) + int(row[2])
+        for i in self._touched:
+            counts[i] = counts.get(i, 0) + self.matrix[i]
+        t["pairs"] = [[_ch(i // N), _ch(i % N), c] for i, c in sorted(counts.items())]
+        old = t.get("pos") if isinstance(t.get("pos"), list) else []
+        t["pos"] = [(old[i] if i < len(old) else 0) + self.pos[i] for i in range(MAX_POS)]
+
+    @classmethod
+    def from_store(cls, store: Dict[str, Any]) -> "TypoStats":
+        ts = cls()
+        t = store.get("typos")
+        if not isinstance(t, dict):
+            return ts
+        ts.attempts = int(t.get("attempts", 0))
+        ts.misses = int(t.get("misses", 0))
+        for row in t.get("pairs") or []:
+            cell = _cell_of(row)
+            if cell is not None:
+                ts.matrix[cell] += int(row[2])
+                ts._touched.add(cell)
+        for i, c in enumerate((t.get("pos") or [])[:MAX_POS]):
+            ts.pos[i] += int(c)
+        return ts
+
+
+def _show(ch: str) -> str:
+    return "(nothing)" if ch == "" else ("(space)" if ch == " " else f"'{ch}'")
+
+
+def describe_pair(exp: str, got: str) -> str:
+    if exp == "":
+        return f"extra {_show(got)} past the end"
+    if got == "":
+        return f"stopping before {_show(exp)}"
+    return f"{_show(got)} instead of {_show(exp)}"
+
+
+def coaching_tips(run: TypoStats, lifetime: Optional[TypoStats] = None, n: int = 2) -> List[str]:
+    """A few short tips from this run (falling back to lifetime data)."""
+    src = run if run.misses else lifetime
+    if src is None or not src.misses:
+        return []
+    tips = []
+    pairs = src.top_pairs(n)
+    if pairs:
+        tips.append("Most common slip: " + "; ".join(f"{describe_pair(e, g)} ×{c}" for e, g, c in pairs))
+    total = sum(src.pos)
+    early = src.pos[0] + src.pos[1]
+    if total >= 3 and early / total >= 0.5:
+        tips.append("Most misses are in the first two letters — settle your start before speeding up.")
+    elif total >= 3 and sum(src.pos[4:]) / total >= 0.5:
+        tips.append("Most misses are late in the word — keep your eyes on the whole word to the end.")
+    return tips
@@ -1,9 +1,20 @@
 """
 Console HUD + results display with color.
 """
+from __future__ import annotations
+from typing import Optional
+
 from colorama import Fore, Style
 from .scoring import RunStats
 
+
+def _out(io, text: str) -> None:
+    # io is a backend from io_backend.py; None means plain print()
+    if io is None:
+        print(text)
+    else:
+        io.print(text)
+
 def _color_val(val: float, good_thresh: float, mid_thresh: float, invert: bool = False) -> str:
     """
     Color helper. If invert=True, lower is better.
@@ -17,7 +28,9 @@ def _color_val(val: float, good_thresh: float, mid_thresh: float, invert: bool =
         return Fore.YELLOW
     return Fore.RED
 
-def render_hud(level_name: str, remaining_s: int, wpm_live: float, acc: float, streak: int) -> None:
+def render_hud(level_name: str, remaining_s: int, wpm_live: float, acc: float, streak: int, io=None,
+               ghost: Optional[int] = None) -> None:
+    """ghost = chars ahead (+) / behind (-) of your best run; None hides it."""
     acc_pct = acc * 100.0
     # thresholds tuned for readability; you can tweak per level if you want
     c_wpm = _color_val(wpm_live, good_thresh=20, mid_thresh=12, invert=False)
@@ -31,9 +44,13 @@ def render_hud(level_name: str, remaining_s: int, wpm_live: float, acc: float, s
         f"{c_acc}Acc:{acc_pct:>5.1f}%{Style.RESET_ALL} | "
         f"{c_stk}Streak:{streak}{Style.RESET_ALL}"
     )
-    print(line)
+    if ghost is not None:
+        c_gh = Fore.GREEN if ghost > 0 else (Fore.RED if ghost < 0 else Fore.RESET)
+        word = "ahead" if ghost >= 0 else "behind"
+        line += f" | {c_gh}Ghost: {word} {abs(ghost)}ch{Style.RESET_ALL}"
+    _out(io, line)
 
-def render_hud_practice(elapsed_s: int, wpm_live: float, acc: float, streak: int) -> None:
+def render_hud_practice(elapsed_s: int, wpm_live: float, acc: float, streak: int, io=None) -> None:
     acc_pct = acc * 100.0
     c_wpm = _color_val(wpm_live, good_thresh=20, mid_thresh=12, invert=False)
     c_acc = _color_val(acc_pct,  good_thresh=90, mid_thresh=80, invert=False)
@@ -46,15 +63,21 @@ def render_hud_practice(elapsed_s: int, wpm_live: float, acc: float, streak: int
         f"{c_acc}Acc:{acc_pct:>5.1f}%{Style.RESET_ALL} | "
         f"{c_stk}Streak:{streak}{Style.RESET_ALL}"
     )
-    print(line)
+    _out(io, line)
 
-def toast(msg: str) -> None:
-    print(f"{Fore.CYAN} >> {msg}{Style.RESET_ALL}")
+def toast(msg: str, io=None) -> None:
+    _out(io, f"{Fore.CYAN} >> {msg}{Style.RESET_ALL}")
 
-def results_card(level_name: str, stats: RunStats, wpm_final: float) -> None:
+def results_card(level_name: str, stats: RunStats, wpm_final: float, io=None,
+                 rank: Optional[tuple] = None) -> None:
+    """rank = (place, total runs, percentile beaten) from leaderboard.py, or None."""
     header = f"{Fore.MAGENTA}\n=== RESULTS ==={Style.RESET_ALL}"
-    print(header)
-    print(f"Level: {level_name}")
-    print(f"WPM:   {Fore.GREEN if wpm_final>=20 else Fore.YELLOW if wpm_final>=12 else Fore.RED}{wpm_final:.1f}{Style.RESET_ALL}")
-    print(f"Acc:   {Fore.GREEN if stats.accuracy>=0.9 else Fore.YELLOW if stats.accuracy>=0.8 else Fore.RED}{stats.accuracy*100:.1f}%{Style.RESET_ALL}")
-    print(f"OK/All:{stats.words_ok}/{stats.words_total}  Typos:{stats.typos}")
+    _out(io, header)
+    _out(io, f"Level: {level_name}")
+    _out(io, f"WPM:   {Fore.GREEN if wpm_final>=20 else Fore.YELLOW if wpm_final>=12 else Fore.RED}{wpm_final:.1f}{Style.RESET_ALL}")
+    _out(io, f"Acc:   {Fore.GREEN if stats.accuracy>=0.9 else Fore.YELLOW if stats.accuracy>=0.8 else Fore.RED}{stats.accuracy*100:.1f}%{Style.RESET_ALL}")
+    _out(io, f"OK/All:{stats.words_ok}/{stats.words_total}  Typos:{stats.typos}")
+    if rank is not None:
+        place, total, pct = rank
+        c_rk = Fore.GREEN if place <= 3 else (Fore.YELLOW if pct >= 50 else Fore.RESET)
+        _out(io, f"Rank:  {c_rk}#{place:,} of {total:,}{Style.RESET_ALL}  (faster than {pct:.1f}% of runs)")
@@ -0,0 +1,96 @@
+"""
+vocab.py — one interned word table for the whole game.
+
+Every vocabulary word (the built-in lists in words.py, level-pack words,
+mined words) gets a small integer id the first time it is seen, and keeps it
+for the rest of the process. Ids count up from 0 in the order words are
+first seen, and word sequences are plain array('H') of ids:
+
+  v = Vocab()
+  ids = v.encode(["ping", "host", "ping"])   # array('H', [0, 1, 0])
+  v[ids[0]]                                   # "ping"
+  v.lens[ids[0]]                              # 4, without touching the str
+
+(In the shared VOCAB, words.py seeds the built-in lists first, so there
+"net" is 0, "ping" 1 and "host" 2.)
+
+Two bytes per word instead of an 8-byte pointer (plus a list header), the
+same word is stored once however many level lists and sequences hold it,
+and "is this the target?" is an int comparison. Strings come back only at
+the edge: the prompt, the HUD, a recording, an error message.
+
+The table only grows, so it can fill up (MAX_IDS words). packs.py caps the
+words a pack may bring, and fit() lets callers use what fits instead of
+failing when reloaded packs have pushed it to the limit.
+
+Ids are only stable inside one process. Anything written to disk keeps its
+own string table (see recording.py), so a new word list never breaks an old
+file.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List
+
+MAX_IDS = 0xFFFF        # ids must fit an array('H')
+
+
+class Vocab:
+    """Append-only string table: word <-> id, plus each word's length."""
+    __slots__ = ("words", "lens", "_ids")
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self.words: List[str] = []
+        self.lens = array("H")
+        self._ids: Dict[str, int] = {}
+        for w in words:
+            self.intern(w)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, w: object) -> bool:
+        return w in self._ids
+
+    def __getitem__(self, i: int) -> str:
+        return self.words[i]
+
+    def intern(self, w: str) -> int:
+        """Id of *w*, adding it if it is new. Raises OverflowError when the table is full."""
+        i = self._ids.get(w)
+        if i is None:
+            if len(self.words) >= MAX_IDS:
+                raise OverflowError(f"vocabulary is full ({MAX_IDS} words)")
+            i = self._ids[w] = len(self.words)
+            self.words.append(w)
+            self.lens.append(min(len(w), 0xFFFF))
+        return i
+
+    def get(self, w: str, default: int = -1) -> int:
+        """Id of *w* without adding it (for player input, which must not grow the table)."""
+        return self._ids.get(w, default)
+
+    def encode(self, words: Iterable[str]) -> array:
+        intern = self.intern
+        return array("H", [intern(w) for w in words])
+
+    def fit(self, words: Iterable[str]) -> array:
+        """Like encode, but words that no longer fit in a full table are left out."""
+        out = array("H")
+        ids, room = self._ids, len(self.words) < MAX_IDS
+        for w in words:
+            i = ids.get(w)
+            if i is None and room:
+                i = self.intern(w)
+                room = len(self.words) < MAX_IDS
+            if i is not None:
+                out.append(i)
+        return out
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        words = self.words
+        return [words[i] for i in ids]
+
+
+# the process-wide table; words.py seeds it with the built-in lists
+VOCAB = Vocab()
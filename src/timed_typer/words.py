@@ -3,8 +3,10 @@ Word pools and generator per level (no immediate repeats).
 """
 from __future__ import annotations
 import random
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from .levels import LevelConfig
+from .difficulty import filter_band
+from .vocab import VOCAB
 
 # Base pool everyone can see (short, easy)
 BASE_WORDS = [
@@ -21,10 +23,21 @@ L5_FIREWALL = ["rule", "allow", "deny", "proto", "src", "dst", "port=443", "allo
 
 SYMBOL_TOKENS = ["/api", "GET", "POST", "port=443", "allow[udp]", "deny[tcp]"]
 
+# the lists above overlap a lot; the shared table keeps one id per distinct word,
+# built-ins first so their ids are the same in every run (see vocab.py)
+for _lst in (BASE_WORDS, L1_PING, L2_TRACEROUTE, L3_DNS, L4_HTTP, L5_FIREWALL, SYMBOL_TOKENS):
+    VOCAB.encode(_lst)
 
-def _pool_for_level(cfg: LevelConfig) -> List[str]:
-    if cfg.id == 1:
-        pool = L1_PING
+
+def _pool_for_level(cfg: LevelConfig, band: Optional[Sequence[float]] = None) -> List[str]:
+    """
+    The level's word pool. *band* (lo, hi) overrides cfg.difficulty; words
+    outside it are dropped via the cached difficulty index (no scoring here).
+    """
+    if cfg.words:
+        pool = list(cfg.words)  # level pack: its own word list
+    elif cfg.id == 1:
+        pool = list(L1_PING)  # copy: the += below must not grow L1_PING itself
     elif cfg.id == 2:
         pool = L2_TRACEROUTE + L1_PING
     elif cfg.id == 3:
@@ -41,32 +54,41 @@ def _pool_for_level(cfg: LevelConfig) -> List[str]:
     filtered = [w for w in pool if len(w) <= cfg.max_word_len or w in SYMBOL_TOKENS]
     # Make sure we have variety
     if len(filtered) < 10:
-        filtered = list(set(filtered + BASE_WORDS))
-    return filtered
+        # dict.fromkeys = de-dupe but keep order, so a seed always gives the same words
+        filtered = list(dict.fromkeys(filtered + BASE_WORDS))
+    return filter_band(filtered, band if band is not None else cfg.difficulty)
 
 
-def _next_word(pool: List[str], prev: Optional[str]) -> str:
+def _next_word(pool: List[str], prev: Optional[str], rng: Optional[random.Random] = None) -> str:
     """Pick a word different from the previous one (avoid immediate repeats)."""
-    choice = random.choice(pool)
+    rng = rng or random
+    choice = rng.choice(pool)
     if prev is None:
         return choice
     # simple re-roll
     tries = 0
     while choice == prev and tries < 10:
-        choice = random.choice(pool)
+        choice = rng.choice(pool)
         tries += 1
+    if choice == prev:
+        # unlucky streak of re-rolls: pick straight from the other words
+        others = [w for w in pool if w != prev]
+        if others:
+            choice = rng.choice(others)
     return choice
 
 
-def words_for_level(cfg: LevelConfig, n: int) -> List[str]:
+def words_for_level(cfg: LevelConfig, n: int, rng: Optional[random.Random] = None) -> List[str]:
     """
     Build a word sequence of length n with no immediate repeats.
+    Pass rng (a random.Random) for a private, reproducible stream;
+    otherwise the global random module is used (seeded in app.main).
     """
     pool = _pool_for_level(cfg)
     out: List[str] = []
     prev: Optional[str] = None
     for _ in range(n):
-        w = _next_word(pool, prev)
+        w = _next_word(pool, prev, rng)
         out.append(w)
         prev = w
     return out
@@ -76,10 +98,11 @@ def check_input(target: str, typed: str) -> tuple[bool, int]:
     """
     Returns (complete_correct, first_error_index or -1).
     complete_correct=True only if typed == target.
+    If typed runs past the end of target, the first error is the first extra char.
     """
     if not target.startswith(typed):
         for i, (a, b) in enumerate(zip(target, typed)):
             if a != b:
                 return (False, i)
-        return (False, len(typed))
+        return (False, len(target))
     return (typed == target, -1)